@@ -93,8 +93,8 @@ class MockedTimedExecutor:
     def time(self) -> float:
         return self._time
 
-    def submit(self, fn: tp.Callable[..., tp.Any], *args: tp.Any, **kwargs: tp.Any) -> MockedTimedJob:
-        job = MockedTimedJob(fn, args, kwargs, self)
+    def submit(self, __fn: tp.Callable[..., tp.Any], *args: tp.Any, **kwargs: tp.Any) -> MockedTimedJob:
+        job = MockedTimedJob(__fn, args, kwargs, self)
         self._to_be_processed.append(job)  # save for later processing
         return job
 
@@ -5,6 +5,7 @@
 
 import sys
 import contextlib
+from pathlib import Path
 from unittest.mock import patch
 import numpy as np
 import nevergrad.common.typing as tp
@@ -43,6 +44,17 @@ def test_run_artificial_function() -> None:
     np.testing.assert_equal(summary["pseudotime"], 12)  # defaults to 1 unit per eval ( /2 because 2 workers)
 
 
+def test_run_artificial_function_with_cache(tmp_path: Path) -> None:
+    func = ArtificialFunction(name="sphere", block_dimension=2)
+    summaries = []
+    for _ in range(2):
+        xp = xpbase.Experiment(func, optimizer="OnePlusOne", budget=24, seed=12, cache_path=tmp_path / "c.db")
+        summaries.append(xp.run())
+    np.testing.assert_almost_equal(summaries[0]["loss"], summaries[1]["loss"])
+    assert summaries[0]["pseudotime"] == 24
+    assert summaries[1]["pseudotime"] == 0  # all evaluations were cached
+
+
 def test_run_packed_artificial_function() -> None:
     func = MultiExperiment(
         [ArtificialFunction(name="sphere", block_dimension=2) for _ in range(2)], [100, 100]
@@ -10,6 +10,7 @@ import numbers
 import warnings
 import traceback
 import typing as tp
+from pathlib import Path
 import numpy as np
 from nevergrad.parametrization import parameter as p
 from nevergrad.common import decorators
@@ -17,6 +18,7 @@ from nevergrad.common import errors
 from ..functions.rl.agents import torch  # import includes pytorch fix
 from ..functions import base as fbase
 from ..optimization import base as obase
+from ..optimization import cache as ocache
 from ..optimization.optimizerlib import (
     registry as optimizer_registry,
 )  # import from optimizerlib so as to fill it
@@ -131,6 +133,12 @@ class Experiment:
     function: ExperimentFunction
         the function to run the experiment on. It must inherit from ExperimentFunction to implement
         necessary functionalities (parametrization, descriptors, evaluation_function, pseudotime etc)
+    cache_path: optional str or Path
+        path of a SQLite database in which evaluations are cached (see optimization.cache.CachedObjective).
+        This is only used for seeded experiments on deterministic functions, since otherwise the function
+        may differ from one run to another. The function is then initialized before the optimization (its random
+        structure, if any, is drawn at that time instead of upon the first evaluation), so results may differ from
+        uncached runs.
 
     Note
     ----
@@ -148,6 +156,7 @@ class Experiment:
         num_workers: int = 1,
         batch_mode: bool = True,
         seed: tp.Optional[int] = None,
+        cache_path: tp.Optional[tp.Union[str, Path]] = None,
     ) -> None:
         assert isinstance(function, fbase.ExperimentFunction), (
             "All experiment functions should " "derive from ng.functions.ExperimentFunction"
@@ -160,6 +169,7 @@ class Experiment:
         self.optimsettings = OptimizerSettings(
             optimizer=optimizer, num_workers=num_workers, budget=budget, batch_mode=batch_mode
         )
+        self.cache_path = cache_path
         self.result = {"loss": np.nan, "elapsed_budget": np.nan, "elapsed_time": np.nan, "error": ""}
         self._optimizer: tp.Optional[
             obase.Optimizer
@@ -254,6 +264,18 @@ class Experiment:
             for name, func in callbacks.items():
                 self._optimizer.register_callback(name, func)
         assert self._optimizer.budget is not None, "A budget must be provided"
+        objective: tp.Callable[..., tp.Any] = pfunc
+        if (
+            self.cache_path is not None
+            and self.seed is not None
+            and pfunc.parametrization.function.deterministic
+        ):
+            # some functions (eg: ArtificialFunction) lazily draw their structure from the random state
+            # they share with the optimizer upon first call, which would then depend on the cache hits:
+            # initializing explicitly makes sure this happens at the same time in all runs
+            pfunc.initialize()
+            namespace = f"{self.function!r}#seed={self.seed}"
+            objective = ocache.CachedObjective(pfunc, path=self.cache_path, namespace=namespace)
         t0 = time.time()
         executor = self.optimsettings.executor
         with warnings.catch_warnings():
@@ -265,7 +287,7 @@ class Experiment:
                 # and provide unfair comparisons  (especially for parallelized settings)
                 obase.Optimizer.minimize(
                     self._optimizer,
-                    pfunc,
+                    objective,
                     batch_mode=executor.batch_mode,
                     executor=executor,
                 )
@@ -5,6 +5,7 @@
 
 import typing as tp
 import functools
+import importlib
 
 
 X = tp.TypeVar("X")
@@ -19,6 +20,7 @@ class Registry(tp.MutableMapping[str, X]):
         super().__init__()
         self.data: tp.Dict[str, X] = {}
         self._information: tp.Dict[str, tp.Dict[tp.Hashable, tp.Any]] = {}
+        self._lazy: tp.Dict[str, str] = {}
 
     def register(self, obj: X, info: tp.Optional[tp.Dict[tp.Hashable, tp.Any]] = None) -> X:
         """Decorator method for registering functions/classes
@@ -33,8 +35,9 @@ class Registry(tp.MutableMapping[str, X]):
         self, name: str, obj: X, info: tp.Optional[tp.Dict[tp.Hashable, tp.Any]] = None
     ) -> None:
         """Register an object with a provided name"""
-        if name in self:
+        if name in self.data:
             raise RuntimeError(f'Encountered a name collision "{name}"')
+        self._lazy.pop(name, None)  # registered by its owning module
         self[name] = obj
         if info is not None:
             assert isinstance(info, dict)
@@ -47,6 +50,14 @@ class Registry(tp.MutableMapping[str, X]):
         if name in self:
             del self[name]
 
+    def register_lazy(self, name: str, module: str) -> None:
+        """Register a name whose object is registered by a module which is only
+        imported when the object is first accessed (for modules with heavy dependencies)
+        """
+        if name in self:
+            raise RuntimeError(f'Encountered a name collision "{name}"')
+        self._lazy[name] = module
+
     def register_with_info(self, **info: tp.Any) -> tp.Callable[[X], X]:
         """Decorator for registering a function and information about it"""
         return functools.partial(self.register, info=info)
@@ -57,16 +68,25 @@ class Registry(tp.MutableMapping[str, X]):
         return self._information.setdefault(name, {})
 
     def __getitem__(self, key: str) -> X:
+        if key not in self.data and key in self._lazy:
+            importlib.import_module(self._lazy[key])  # registers the object
         return self.data[key]
 
     def __setitem__(self, key: str, value: X) -> None:
         self.data[key] = value
 
     def __delitem__(self, key: str) -> None:
-        del self.data[key]
+        if key in self._lazy:
+            del self._lazy[key]
+        else:
+            del self.data[key]
+
+    def __contains__(self, key: tp.Any) -> bool:
+        return key in self.data or key in self._lazy
 
     def __iter__(self) -> tp.Iterator[str]:
-        return iter(self.data)
+        yield from self.data
+        yield from list(self._lazy)  # accessing lazy names modifies the dict
 
     def __len__(self) -> int:
-        return len(self.data)
+        return len(self.data) + len(self._lazy)
@@ -44,3 +44,21 @@ class DecoratorTests(TestCase):
             return 12
 
         np.testing.assert_raises(RuntimeError, functions.register, dummy)
+
+    def test_lazy_registry(self) -> None:
+        functions: decorators.Registry[tp.Any] = decorators.Registry()
+        functions.register_lazy("lazy_dummy", "json")  # json does not register anything
+        assert "lazy_dummy" in functions
+        np.testing.assert_array_equal(list(functions.keys()), ["lazy_dummy"])
+        np.testing.assert_raises(KeyError, functions.__getitem__, "lazy_dummy")
+        np.testing.assert_raises(RuntimeError, functions.register_lazy, "lazy_dummy", "json")
+
+        def lazy_dummy() -> int:
+            return 12
+
+        functions.register(lazy_dummy)  # as the owning module would do
+        np.testing.assert_equal(functions["lazy_dummy"](), 12)
+        np.testing.assert_equal(len(functions), 1)
+        functions.register_lazy("other_dummy", "json")
+        functions.unregister("other_dummy")
+        np.testing.assert_array_equal(list(functions.keys()), ["lazy_dummy"])
@@ -37,6 +37,7 @@ from typing import ItemsView as ItemsView
 from typing import Callable as Callable
 from typing import Hashable as Hashable
 from typing import Match as Match
+from typing import BinaryIO as BinaryIO
 from typing import cast as cast
 from pathlib import Path as Path
 from typing_extensions import Protocol
@@ -71,5 +72,6 @@ class JobLike(Protocol[X]):
 class ExecutorLike(Protocol):
     # pylint: disable=pointless-statement, unused-argument
 
-    def submit(self, fn: Callable[..., X], *args: Any, **kwargs: Any) -> JobLike[X]:
+    # the function is positional-only (double underscore), as in concurrent.futures.Executor
+    def submit(self, __fn: Callable[..., X], *args: Any, **kwargs: Any) -> JobLike[X]:
         ...
@@ -6,27 +6,39 @@
 # This code is based on a code and ideas by Emmanuel Centeno and Antoine Moreau,
 # University Clermont Auvergne, CNRS, SIGMA Clermont, Institut Pascal
 
-from math import sqrt, tan, pi
+from math import sqrt, pi
 import numpy as np
 import nevergrad.common.typing as tp
 import nevergrad as ng
 from .. import base
 
 
-def impedance_pix(x: tp.ArrayLike, dpix: float, lam: float, ep0: float, epf: float) -> float:
+def impedance_pix(
+    x: tp.ArrayLike, dpix: float, lam: tp.Union[float, np.ndarray], ep0: float, epf: float
+) -> tp.Union[float, np.ndarray]:
     """Normalized impedance Z/Z0
     ep0, epf:  epsilons in et out
-    lam: lambda in nanometers
+    lam: lambda in nanometers (float or array of wavelengths, computed at once)
     dpix: pixel width
+    x: permittivities of the slabs, along the last axis (other axes are a batch of structures)
+
+    Returns
+    -------
+    float or np.ndarray
+        reflection in %, with shape x.shape[:-1] + lam.shape
     """
+    lam = np.asarray(lam)
+    index = np.sqrt(np.asarray(x, dtype=float))  # refraction index slab
+    index = index.reshape(index.shape[:-1] + (1,) * lam.ndim + index.shape[-1:])
     k0d = 2 * pi * dpix / lam
     Z = 1 / sqrt(epf)
-    # refraction index slab
-    for n in reversed(np.sqrt(x)):  # type: ignore
+    for k in reversed(range(index.shape[-1])):
+        n = index[..., k]
         etha = 1 / n  # bulk impedance slab
-        Z = etha * (Z + 1j * etha * tan(k0d * n)) / (etha + 1j * Z * tan(k0d * n))
+        tan_ = np.tan(k0d * n)
+        Z = etha * (Z + 1j * etha * tan_) / (etha + 1j * Z * tan_)
     R = abs((Z - 1 / sqrt(ep0)) / (Z + 1 / sqrt(ep0))) ** 2 * 100  # reflection in %
-    return R
+    return R if isinstance(R, np.ndarray) and R.ndim else float(R)
 
 
 class ARCoating(base.ExperimentFunction):
@@ -77,11 +89,9 @@ class ARCoating(base.ExperimentFunction):
         assert len(x) == self.dimension, f"Expected dimension {self.dimension}, got {len(x)}"
         if np.min(x) < self.epmin or np.max(x) > self.epf:  # acceptability
             return float("inf")
-        value = 0.0
-        for lam in self.lambdas:
-            RE = impedance_pix(x, self.dpix, lam, self.ep0, self.epf)  # only normal incidence
-            value = value + RE / len(self.lambdas)
-        return value
+        # all wavelengths at once, only normal incidence
+        RE = impedance_pix(x, self.dpix, self.lambdas, self.ep0, self.epf)
+        return float(np.sum(RE / len(self.lambdas)))
 
     def evaluation_function(self, *recommendations: ng.p.Parameter) -> float:
         assert len(recommendations) == 1, "Should not be a pareto set for a singleobjective function"
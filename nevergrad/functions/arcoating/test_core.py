@@ -19,6 +19,16 @@ def test_impedence_pix() -> None:
     np.testing.assert_almost_equal(output, 46.64, decimal=2)
 
 
+def test_impedence_pix_batch() -> None:
+    x = np.array([[3.0, 5.0, 1.0, 9.0], [2.0, 4.0, 6.0, 8.0]])
+    lambdas = np.array([400, 500, 600])
+    output = core.impedance_pix(x, 37, lambdas, 1, 9)
+    assert output.shape == (2, 3)  # type: ignore
+    np.testing.assert_almost_equal(output[0, 0], 46.64, decimal=2)  # type: ignore
+    expected = [[core.impedance_pix(y, 37, lam, 1, 9) for lam in lambdas] for y in x]
+    np.testing.assert_almost_equal(output, expected)  # type: ignore
+
+
 def test_arcoating_reflexion_function() -> None:
     func = core.ARCoating(nbslab=4)
     output = func._get_minimum_average_reflexion(np.array([4.56386701, 5.65210553, 6.24006888, 7.18400555]))
@@ -191,6 +191,12 @@ class ExperimentFunction:
         )  # TODO not sure why this is needed
         return output
 
+    def initialize(self) -> None:
+        """Performs the lazy initialization of the function, if any (eg: drawing its random
+        structure), which would otherwise happen upon the first call.
+        This does nothing by default and can be overriden by functions with lazy initialization.
+        """
+
     def compute_pseudotime(  # pylint: disable=unused-argument
         self, input_parameter: tp.ArgsKwargs, loss: tp.Loss
     ) -> float:
@@ -376,6 +382,10 @@ class MultiExperiment(ExperimentFunction):
         self._descriptors.update(name=",".join(xp._descriptors.get("name", "#unknown#") for xp in xps))
         self._experiments = xps
 
+    def initialize(self) -> None:
+        for xp in self._experiments:
+            xp.initialize()
+
     def _multi_func(self, *args: tp.Any, **kwargs: tp.Any) -> np.ndarray:
         outputs = [f(*args, **kwargs) for f in self._experiments]
         return np.array(outputs)
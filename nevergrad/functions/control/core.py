@@ -97,9 +97,9 @@ class BaseFunction(base.ExperimentFunction):
         #    self.parametrization.function.deterministic = False
         self._descriptors.pop("random_state", None)  # remove it from automatically added descriptors
 
-    def _simulate(self, x: tp.Tuple) -> float:
+    def _make_env(self) -> GenericMujocoEnv:
         try:
-            env = GenericMujocoEnv(
+            return GenericMujocoEnv(
                 env_name=self.env_name,
                 state_mean=self.state_mean if self.states_normalization else None,
                 state_std=self.state_std if self.states_normalization else None,
@@ -113,13 +113,27 @@ class BaseFunction(base.ExperimentFunction):
             raise base.UnsupportedExperiment(
                 "MuJoCo not installed (Linux/OSX support only). If you need it, please follow this installation guide: https://github.com/openai/mujoco-py#install-mujoco"
             ) from e
-        env.env.seed(
+
+    def _seed(self) -> tp.Optional[int]:
+        return (
             self.random_state if self.deterministic_sim else self.parametrization.random_state.randint(10000)
         )
+
+    def _simulate(self, x: tp.Tuple) -> float:
+        env = self._make_env()
+        env.env.seed(self._seed())
         loss = env(x)
         # base.update_leaderboard(f'{self.env_name},{self.parametrization.dimension}', loss, x, verbose=True)
         return loss
 
+    def simulate_population(self, xs: tp.Sequence[tp.Tuple]) -> tp.List[float]:
+        """Computes the losses of a population of policies (values of the parametrization) at once,
+        by stepping one environment per policy in lockstep and computing all actions with batched matmuls.
+        This is equivalent to calling the function on each policy (up to the order of the random draws).
+        """
+        env = self._make_env()
+        return env.evaluate_population(xs, seeds=[self._seed() for _ in xs])
+
     def evaluation_function(self, *recommendations: p.Parameter) -> float:
         assert len(recommendations) == 1, "Should not be a pareto set for a singleobjective function"
         x = recommendations[0].value
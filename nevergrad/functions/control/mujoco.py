@@ -39,9 +39,12 @@ class GenericMujocoEnv:
         noise_level,
         random_state,
     ):
-        self.mean = state_mean
-        self.std = state_std
+        # converted once, rather than at each step
+        self.mean = None if state_mean is None else np.asarray(state_mean, dtype=float)
+        self.std = None if state_std is None else np.asarray(state_std, dtype=float)
+        self.env_name = env_name
         self.env = gym.make(env_name)
+        self._envs = [self.env]  # one environment per policy of a population
         self.num_rollouts = num_rollouts
         self.random_state = random_state
         self.activation = activation
@@ -56,26 +59,56 @@ class GenericMujocoEnv:
         else:
             raise NotImplementedError(r"Activation {self.activation} not implemented.")
 
+    def _actions(self, obs, layers):
+        """Computes the actions of a population of policies, with one batched matmul per layer.
+        obs has shape (k, state_dim) and each layer has shape (k, input_dim, output_dim).
+        """
+        action = obs if self.mean is None else (obs - self.mean) / self.std
+        action = np.matmul(action[:, None, :], layers[0])[:, 0, :] * self.layer_rescaling_coef[0]
+        for x, r_coef in zip(layers[1:], self.layer_rescaling_coef[1:]):
+            action = np.matmul(self._activation(action)[:, None, :] + 1.0e-3, x)[:, 0, :] * r_coef
+        if self.noise_level > 0.0:
+            action += action * self.noise_level * self.random_state.normal(size=action.shape)
+        return action
+
     def __call__(self, layers):
         """Compute loss (average cumulative negative reward) of a given policy."""
-        returns = []
-        for _ in range(self.num_rollouts):
-            obs = self.env.reset()
-            done = False
-            totalr = 0.0
-            while not done:
-                action = (
-                    np.matmul(obs, layers[0])
-                    if (self.mean is None)
-                    else (np.matmul((obs - self.mean) / self.std, layers[0]))
-                )
-                action = action * self.layer_rescaling_coef[0]
-                for x, r_coef in zip(layers[1:], self.layer_rescaling_coef[1:]):
-                    action = np.matmul(self._activation(action) + 1.0e-3, x) * r_coef
-                if self.noise_level > 0.0:
-                    action += action * self.noise_level * self.random_state.normal(size=action.shape)
-                obs, r, done, _ = self.env.step(action)
-                totalr += r
-            returns.append(totalr)
+        return self.evaluate_population([layers])[0]
+
+    def evaluate_population(self, policies, seeds=None):
+        """Compute the losses (average cumulative negative reward) of several policies at once.
+        Each policy runs in its own environment, and all environments are stepped in lockstep
+        so that the actions of all policies are computed together.
 
-        return -np.mean(returns)
+        Parameters
+        ----------
+        policies: list
+            the policies (sequences of layers), which must all have the same shapes
+        seeds: list or None
+            seeds of the environments (one per policy), environments are not reseeded if not provided
+        """
+        num = len(policies)
+        while len(self._envs) < num:
+            self._envs.append(gym.make(self.env_name))
+        envs = self._envs[:num]
+        if seeds is not None:
+            for env, seed in zip(envs, seeds):
+                env.seed(seed)
+        layers = [np.stack([np.asarray(policy[k]) for policy in policies]) for k in range(len(policies[0]))]
+        returns = np.zeros((self.num_rollouts, num))
+        for rollout in range(self.num_rollouts):
+            obs = np.stack([np.asarray(env.reset(), dtype=float) for env in envs])
+            indices = list(range(num))  # policies whose episode is not over
+            active_layers = layers
+            while indices:
+                active_obs = obs if len(indices) == num else obs[indices]
+                finished = []
+                for action, i in zip(self._actions(active_obs, active_layers), indices):
+                    obs[i], r, done, _ = envs[i].step(action)
+                    returns[rollout, i] += r
+                    if done:
+                        finished.append(i)
+                if finished:  # only keep computing the actions of the policies which are still running
+                    indices = [i for i in indices if i not in finished]
+                    active_layers = [layer[indices] for layer in layers]
+        return (-np.mean(returns, axis=0)).tolist()
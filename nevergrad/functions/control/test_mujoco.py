@@ -40,6 +40,15 @@ def test_gym(intermediate_layer_dim, noise_level, deterministic_sim, states_norm
         assert func(x) != func(x)
 
 
+@pytest.mark.parametrize("intermediate_layer_dim", [None, (3, 3)])
+def test_simulate_population(intermediate_layer_dim) -> None:
+    func = MountainCarContinuous(
+        num_rollouts=2, intermediate_layer_dim=intermediate_layer_dim, random_state=42
+    )
+    xs = [func.parametrization.sample().value for _ in range(5)]
+    np.testing.assert_almost_equal(func.simulate_population(xs), [func(x) for x in xs])  # type: ignore
+
+
 @pytest.mark.parametrize("module", ["Ant", "Swimmer", "HalfCheetah", "Hopper", "Walker2d", "Humanoid"])
 @pytest.mark.parametrize("intermediate_layer_dim", [None, (50,)])
 @pytest.mark.parametrize("noise_level", [0.0, 0.9])
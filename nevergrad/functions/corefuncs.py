@@ -413,3 +413,95 @@ def st10(x: np.ndarray) -> float:
 def st100(x: np.ndarray) -> float:
     """Styblinksitang function with noise 100."""
     return _styblinksitang(x, 100)
+
+
+# # # # # batched versions # # # # #
+# These functions take a (num_points, dimension) array and return the (num_points,) values.
+# They are used for evaluating many points at once (see ArtificialFunction.evaluate_batch)
+# and fall back to a loop on the standard functions when not available (see call_batch).
+
+batch_registry: Registry[tp.Callable[[np.ndarray], np.ndarray]] = Registry()
+
+
+def call_batch(name: str, x: np.ndarray) -> np.ndarray:
+    """Evaluates the core function with the given name on each row of a (num_points, dimension) array,
+    using the batched version if available
+    """
+    if name in batch_registry:
+        return batch_registry[name](x)
+    func = registry[name]
+    return np.array([func(row) for row in x], dtype=float)
+
+
+def _sphere_batch(x: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", x, x)  # type: ignore
+
+
+def _ellipsoid_batch(x: np.ndarray) -> np.ndarray:
+    weights = 10 ** np.linspace(0, 6, x.shape[1])
+    return (x**2).dot(weights)  # type: ignore
+
+
+def _deceptive_batch(x: np.ndarray) -> np.ndarray:
+    return 3 * x**2 - (2 / (3 ** (x - 2) ** 2 + 0.1))  # type: ignore
+
+
+def _rastrigin_batch(x: np.ndarray) -> np.ndarray:
+    cosi = np.sum(np.cos(2 * np.pi * x), axis=1)
+    return 10 * (x.shape[1] - cosi) + _sphere_batch(x)  # type: ignore
+
+
+def _rosenbrock_batch(x: np.ndarray) -> np.ndarray:
+    x_m_1 = x[:, :-1] - 1
+    x_diff = x[:, :-1] ** 2 - x[:, 1:]
+    return 100 * _sphere_batch(x_diff) + _sphere_batch(x_m_1)  # type: ignore
+
+
+def _ackley_batch(x: np.ndarray) -> np.ndarray:
+    dim = x.shape[1]
+    sum_cos = np.sum(np.cos(2 * np.pi * x), axis=1)
+    return -20.0 * np.exp(-0.2 * np.sqrt(_sphere_batch(x) / dim)) - np.exp(sum_cos / dim) + 20 + exp(1)  # type: ignore
+
+
+def _griewank_batch(x: np.ndarray) -> np.ndarray:
+    part2 = np.prod(np.cos(x / np.sqrt(1 + np.arange(x.shape[1]))), axis=1)
+    return 1 + _sphere_batch(x) / 4000.0 - part2  # type: ignore
+
+
+def _lunacek_batch(x: np.ndarray) -> np.ndarray:
+    dim = x.shape[1]
+    s = 1.0 - (1.0 / (2.0 * np.sqrt(dim + 20.0) - 8.2))
+    mu1 = 2.5
+    mu2 = -np.sqrt(abs((mu1**2 - 1.0) / s))
+    first = np.sum((x - mu1) ** 2, axis=1)
+    second = np.sum((x - mu2) ** 2, axis=1)
+    third = np.sum(1.0 - np.cos(2 * np.pi * (x - mu1)), axis=1)
+    return np.minimum(first, 1.0 * dim + second) + 10 * third  # type: ignore
+
+
+for _name, _func in [
+    ("sphere", _sphere_batch),
+    ("sphere1", lambda x: _sphere_batch(x - 1.0)),
+    ("sphere2", lambda x: _sphere_batch(x - 2.0)),
+    ("sphere4", lambda x: _sphere_batch(x - 4.0)),
+    ("maxdeceptive", lambda x: np.max(_deceptive_batch(x), axis=1)),
+    ("sumdeceptive", lambda x: np.sum(_deceptive_batch(x), axis=1)),
+    ("altcigar", lambda x: x[:, -1] ** 2 + 1000000.0 * _sphere_batch(x[:, :-1])),
+    ("discus", lambda x: _sphere_batch(x[:, 1:]) + 1000000.0 * x[:, 0] ** 2),
+    ("cigar", lambda x: x[:, 0] ** 2 + 1000000.0 * _sphere_batch(x[:, 1:])),
+    ("ellipsoid", _ellipsoid_batch),
+    ("altellipsoid", lambda x: _ellipsoid_batch(x[:, ::-1])),
+    ("rastrigin", _rastrigin_batch),
+    ("doublelinearslope", lambda x: np.abs(np.sum(x, axis=1))),
+    ("hm", lambda x: np.sum(x**2 * (1.1 + np.cos(1.0 / x)), axis=1)),
+    ("rosenbrock", _rosenbrock_batch),
+    ("ackley", _ackley_batch),
+    ("schwefel_1_2", lambda x: _sphere_batch(np.cumsum(x, axis=1))),
+    ("griewank", _griewank_batch),
+    ("lunacek", _lunacek_batch),
+    ("genzgaussianpeakintegral", lambda x: np.exp(-_sphere_batch(x) / 4.0)),
+    ("minusgenzgaussianpeakintegral", lambda x: -np.exp(-_sphere_batch(x) / 4.0)),
+    ("slope", lambda x: np.sum(x, axis=1)),
+    ("linear", lambda x: np.tanh(x[:, 0])),
+]:
+    batch_registry.register_name(_name, _func)
@@ -80,6 +80,22 @@ class ArtificialVariable:
             output.append(data[transform.indices] if self.only_index_transform else transform(data))
         return np.array(output)
 
+    def process_batch(self, data: tp.ArrayLike) -> np.ndarray:
+        """Batched version of process, for a (num_points, dimension) array.
+        Returns an array of shape (num_points, num_blocks, block_dimension)
+        """
+        if not self._transforms:
+            self._initialize()
+        data = np.array(data, copy=False, dtype=None if self.hashing else float)
+        if self.hashing:
+            return np.array([self.process(x) for x in data])
+        output = []
+        for transform in self._transforms:
+            output.append(
+                data[:, transform.indices] if self.only_index_transform else transform.apply_batch(data)
+            )
+        return np.stack(output, axis=1)  # num_points x num_blocks x block_dimension
+
     def _short_repr(self) -> str:
         return "Photonics"
 
@@ -227,6 +243,10 @@ class ArtificialFunction(ExperimentFunction):
         """Returns a sorted list of function names that can be used for the blocks"""
         return sorted(corefuncs.registry)
 
+    def initialize(self) -> None:
+        if not self.transform_var._transforms:
+            self.transform_var._initialize()
+
     def _transform(self, x: tp.ArrayLike) -> np.ndarray:
         data = self.transform_var.process(x)
         return np.array(data)
@@ -243,6 +263,57 @@ class ArtificialFunction(ExperimentFunction):
         except OverflowError:
             return float("inf")
 
+    def _function_from_transform_batch(self, x: np.ndarray) -> np.ndarray:
+        num_points, num_blocks, block_dimension = x.shape
+        try:
+            results = corefuncs.call_batch(
+                self._parameters["name"], x.reshape(num_points * num_blocks, block_dimension)
+            )
+        except OverflowError:  # only overflowing points must be mapped to inf, evaluate them separately
+            return np.array([self._function_from_transform_or_inf(point) for point in x], dtype=float)
+        aggregated = self._aggregator(results.reshape(num_points, num_blocks), axis=1)  # type: ignore
+        return np.array(aggregated, dtype=float)
+
+    def _function_from_transform_or_inf(self, x: np.ndarray) -> float:
+        try:
+            return self.function_from_transform(x)
+        except OverflowError:
+            return float("inf")
+
+    def evaluate_batch(self, x: tp.ArrayLike) -> np.ndarray:
+        """Evaluates the (noisy) function on each row of a (num_points, dimension) array.
+        This is equivalent to calling the function on each point, but the transforms and
+        the core function are applied to the whole batch at once.
+
+        Note
+        ----
+        With noise, the random draws do not happen in the same order as with sequential calls,
+        hence the noise realizations differ.
+        """
+        data = np.array(x, copy=False, dtype=None if self._parameters["hashing"] else float)
+        if data.ndim != 2:
+            raise ValueError(f"Expected an array of shape (num_points, dimension) but got {data.shape}")
+        x_transf = self.transform_var.process_batch(data)
+        fx = self._function_from_transform_batch(x_transf)
+        noise_level = self._parameters["noise_level"]
+        if not noise_level:
+            return fx
+        random_state = self._parametrization.random_state
+        noisy = np.ones(len(data), dtype=bool)
+        levels = np.full(len(data), float(noise_level))
+        if self._parameters["noise_dissymmetry"]:
+            first = x_transf.reshape(len(data), -1)[:, 0]
+            noisy = first <= 0
+            levels *= 1.0 + first * 100.0
+        if not noisy.any():
+            return fx
+        side_points = self.transform_var.process_batch(
+            data[noisy] + random_state.normal(0, 1, size=data[noisy].shape)
+        )
+        noise = levels[noisy] * random_state.normal(0, 1, size=int(noisy.sum()))
+        fx[noisy] += noise * (self._function_from_transform_batch(side_points) - fx[noisy])
+        return fx
+
     def evaluation_function(self, *recommendations: ng.p.Parameter) -> float:
         """Implements the call of the function.
         Under the hood, __call__ delegates to oracle_call + add some noise if noise_level > 0.
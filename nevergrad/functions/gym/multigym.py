@@ -5,6 +5,8 @@
 
 import os
 import copy
+import weakref
+from concurrent import futures
 import scipy.stats
 import typing as tp
 import numpy as np
@@ -80,6 +82,29 @@ CONTROLLERS = [
 NO_LENGTH = ["ANM", "Blackjack", "CliffWalking", "Cube", "Memorize", "ompiler", "llvm"]
 
 
+# GymMulti instance used by the rollout workers (set by the initializer of the process pool).
+_ROLLOUT_FUNCTION: tp.Optional["GymMulti"] = None
+
+
+def _init_rollout_worker(func: "GymMulti") -> None:
+    global _ROLLOUT_FUNCTION  # pylint: disable=global-statement
+    _ROLLOUT_FUNCTION = func
+
+
+def _rollout(
+    args: tp.Tuple[np.ndarray, int, tp.Dict[str, tp.Any], tp.Dict[str, tp.Any]]
+) -> tp.Tuple[float, tp.Dict[str, tp.Any]]:
+    """Single simulation in a rollout worker, starting from the provided state of the parent function.
+    Returns the loss and the updates of the state, to be merged by the parent (see GymMulti.simulate_seeds).
+    """
+    assert _ROLLOUT_FUNCTION is not None, "Rollout worker was not initialized"
+    x, seed, kwargs, state = args
+    func = _ROLLOUT_FUNCTION
+    func.__dict__.update(state, _archived=[])
+    loss = func.gym_simulate(x, seed=seed, **kwargs)
+    return loss, {"archived": func._archived, "extended_input": func.extended_input}
+
+
 # Environment used for CompilerGym: this class proposes a small ActionSpace.
 class SmallActionSpaceLlvmEnv(gym.ActionWrapper):
     """A wrapper for the LLVM compiler environment that exposes a tiny subset of
@@ -429,10 +454,14 @@ class GymMulti(ExperimentFunction):
         sparse_limit: tp.Optional[
             int
         ] = None,  # if not None, we penalize solutions with more than sparse_limit weights !=0
+        rollout_workers: int = 1,  # number of processes for running the simulations of different seeds
     ) -> None:
         # limited_compiler_gym: bool or None.
         #        whether we work with the limited version
         self.num_calls = 0
+        self.rollout_workers = rollout_workers
+        self._executor: tp.Optional[futures.ProcessPoolExecutor] = None
+        self._descriptors.pop("rollout_workers", None)  # runtime setting, which does not change the problem
         self.limited_compiler_gym = limited_compiler_gym
         self.compilergym_index = compiler_gym_pb_index
         self.optimization_scale = optimization_scale
@@ -621,8 +650,52 @@ class GymMulti(ExperimentFunction):
         self.greedy_coefficient = 0.0
         self.parametrization.function.deterministic = not self.uses_compiler_gym
         self.archive: tp.List[tp.Any] = []
+        self._archive_keys: tp.Dict[bytes, tp.Any] = {}  # hashed observations -> trace of the archive
         self.mean_loss = 0.0
         self.num_losses = 0
+        self._archived: tp.Optional[tp.List[tp.Any]] = None  # traces archived in a rollout worker
+        # Warm environments, reset and reused by the simulations (CompilerGym creates its own environments).
+        self._env_pool: tp.List[tp.Any] = [] if self.uses_compiler_gym else [env]
+
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        state = dict(self.__dict__)
+        state.update(_env_pool=[], _executor=None)  # environments and processes are not transferred
+        return state
+
+    def acquire_env(self) -> tp.Any:
+        """Returns a warm environment from the pool, or a new one if the pool is empty."""
+        if self._env_pool:
+            return self._env_pool.pop()
+        return self.create_env()
+
+    def release_env(self, env: tp.Any) -> None:
+        """Puts an environment back into the pool (it is reset before being used again)."""
+        if not self.uses_compiler_gym:
+            self._env_pool.append(env)
+
+    def simulate_seeds(self, x: np.ndarray, seeds: tp.List[int], **kwargs: tp.Any) -> tp.List[float]:
+        """Runs one simulation per seed, in the rollout worker processes if rollout_workers > 1.
+
+        Simulations which share state (CompilerGym and greedy bias) are always run sequentially. With stacking
+        memory, each worker starts from the current archive and the traces it archives are merged afterwards,
+        in the order of the seeds.
+        """
+        independent = not (self.uses_compiler_gym or self.greedy_bias)
+        if self.rollout_workers <= 1 or len(seeds) <= 1 or not independent:
+            return [self.gym_simulate(x, seed=seed, **kwargs) for seed in seeds]
+        if self._executor is None:
+            self._executor = futures.ProcessPoolExecutor(
+                max_workers=self.rollout_workers, initializer=_init_rollout_worker, initargs=(self,)
+            )
+            weakref.finalize(self, self._executor.shutdown, wait=False)
+        keys = ["archive", "_archive_keys", "mean_loss", "num_losses", "extended_input"]
+        state = {key: getattr(self, key) for key in keys} if "stacking" in self.control else {}
+        results = list(self._executor.map(_rollout, [(x, seed, kwargs, state) for seed in seeds]))
+        for _, updates in results:
+            for trace in updates["archived"]:
+                self.archive_observations(*trace)
+        self.extended_input = results[-1][1]["extended_input"]
+        return [loss for loss, _ in results]
 
     def evaluation_function(self, *recommendations) -> float:
         """Averages multiple evaluations if necessary."""
@@ -644,15 +717,12 @@ class GymMulti(ExperimentFunction):
             # hence the line below:
             num = max(self.num_calls // 5, 23)
             # Pb_index >= 0 refers to the test set.
-            return (
-                np.sum(
-                    [
-                        self.gym_multi_function(x, limited_fidelity=False)
-                        for compiler_gym_pb_index in range(num)
-                    ]
-                )
-                / num  # This is not compiler_gym but we keep this 23 constant.
-            )
+            # Each of these evaluations is a single randomized simulation, so we draw the seeds
+            # (in the same order as gym_multi_function would) and simulate them all at once.
+            self.num_calls += num
+            seeds = [self.parametrization.random_state.randint(500000) for _ in range(num)]
+            losses = self.simulate_seeds(x, seeds, limited_fidelity=False, test_set=True)
+            return np.sum(losses) / num  # This is not compiler_gym but we keep this 23 constant.
         assert self.uses_compiler_gym
         rewards = [
             np.log(
@@ -843,20 +913,20 @@ class GymMulti(ExperimentFunction):
         # The deterministic case consists in considering the average of 7 fixed seeds.
         # The conformant case is using 1 randomized seed (unlesss we requested !randomized).
         num_simulations = 7 if self.control != "conformant" and not self.randomized else 1
-        loss = 0
         if "directcompilergym" in self.name:
             assert compiler_gym_pb_index is not None
-        for simulation_index in range(num_simulations):
-            loss += self.gym_simulate(
-                x,
-                seed=simulation_index
-                if not self.randomized
-                else self.parametrization.random_state.randint(500000),
-                limited_fidelity=limited_fidelity,
-                compiler_gym_pb_index=compiler_gym_pb_index,
-                test_set=True,
-            )
-        return loss / num_simulations
+        seeds = [
+            simulation_index if not self.randomized else self.parametrization.random_state.randint(500000)
+            for simulation_index in range(num_simulations)
+        ]
+        losses = self.simulate_seeds(
+            x,
+            seeds,
+            limited_fidelity=limited_fidelity,
+            compiler_gym_pb_index=compiler_gym_pb_index,
+            test_set=True,
+        )
+        return sum(losses) / num_simulations
 
     def action_cast(self, a, env):
         """Transforms an action into an action of type as expected by the gym step function."""
@@ -918,16 +988,19 @@ class GymMulti(ExperimentFunction):
                current observations up to the present time step.
         """
         current_observations = np.asarray(current_observations + [o], dtype=np.float32)
+        num_traces = len(self.archive)
         self.archive = [
             self.archive[i] for i in range(len(self.archive)) if self.archive[i][2] <= self.mean_loss
         ]
+        if len(self.archive) != num_traces:
+            self._archive_keys = {key: t for key, t in self._archive_keys.items() if t[2] <= self.mean_loss}
         self.archive = sorted(self.archive, key=lambda trace: -len(trace[0]))
         for trace in self.archive:
             to, ta, _ = trace
             assert len(to) == len(ta)
             if len(current_observations) > len(to) and "extrapolate" not in self.control:
                 continue
-            to = np.asarray(to[(-len(current_observations)) :], dtype=np.float32)
+            to = to[(-len(current_observations)) :]  # already a float32 array
             # if all((_to - _o) for _to, _o in zip(to, current_observations)) <= 1e-7:
             if np.array_equal(to, current_observations):
                 return np.asarray(ta[len(current_observations) - 1], dtype=np.float32)
@@ -942,17 +1015,39 @@ class GymMulti(ExperimentFunction):
         limited_fidelity: bool = True,
     ):
         """Single simulation with parametrization x."""
-        current_time_index = 0
-        current_reward = 0.0
-        current_observations: tp.List[tp.Any] = []
-        current_actions: tp.List[tp.Any] = []
         try:
             if self.policy_shape is not None:
                 x = x.reshape(self.policy_shape)
         except:
             assert False, f"x has shape {x.shape} and needs {self.policy_shape} for control {self.control}"
         assert seed == 0 or self.control != "conformant" or self.randomized
-        env = self.create_env()
+        env = self.acquire_env()
+        try:
+            return self._simulate_env(
+                x,
+                env,
+                seed=seed,
+                test_set=test_set,
+                compiler_gym_pb_index=compiler_gym_pb_index,
+                limited_fidelity=limited_fidelity,
+            )
+        finally:
+            self.release_env(env)
+
+    def _simulate_env(
+        self,
+        x: np.ndarray,
+        env: tp.Any,
+        seed: int,
+        test_set: bool,
+        compiler_gym_pb_index: tp.Optional[int],
+        limited_fidelity: bool,
+    ) -> float:
+        """Single simulation with parametrization x, in the provided environment."""
+        current_time_index = 0
+        current_reward = 0.0
+        current_observations: tp.List[tp.Any] = []
+        current_actions: tp.List[tp.Any] = []
         env.seed(seed=seed)
         if self.uses_compiler_gym:
             if self.stochastic_problem:
@@ -1047,6 +1142,8 @@ class GymMulti(ExperimentFunction):
         return -reward
 
     def archive_observations(self, current_actions, current_observations, current_reward):
+        if self._archived is not None:  # in a rollout worker
+            self._archived.append((list(current_actions), list(current_observations), current_reward))
         self.num_losses += 1
         tau = 1.0 / self.num_losses
         self.mean_loss = (
@@ -1054,15 +1151,11 @@ class GymMulti(ExperimentFunction):
             if self.mean_loss is not None
             else current_reward
         )
-        found = False
-        for trace in self.archive:
-            to, _, _ = trace
-            if np.array_equal(
-                np.asarray(current_observations, dtype=np.float32),
-                np.asarray(to, dtype=np.float32),
-            ):
-                found = True
-                break
-        if not found:
+        observations = np.asarray(current_observations, dtype=np.float32)
+        # hashing the observations instead of comparing them to all the traces (+ 0.0 merges -0.0 and 0.0)
+        key = str(observations.shape).encode() + (observations + 0.0).tobytes()
+        if key not in self._archive_keys:
             # Risky: this code assumes that the object is used only in a single run.
-            self.archive += [(current_observations, current_actions, current_reward)]
+            trace = (observations, current_actions, current_reward)
+            self.archive += [trace]
+            self._archive_keys[key] = trace
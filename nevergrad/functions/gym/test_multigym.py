@@ -90,6 +90,31 @@ def test_run_multigym(name: str) -> None:
         np.testing.assert_almost_equal(func(y.value), 1720.39, decimal=2)
 
 
+def test_env_pool_and_rollout_workers() -> None:
+    func = multigym.GymMulti(
+        name="Acrobot-v1", control="stackingmemory_neural", neural_factor=1, randomized=False
+    )
+    x = np.random.normal(size=func.dimension)
+    results = [func(x) for _ in range(3)]
+    assert all(0 <= r <= 500 for r in results)  # type: ignore
+    assert len(func._env_pool) == 1, "Environments should be reused"
+    assert len(func.archive) == len(func._archive_keys)
+    func = multigym.GymMulti(name="CartPole-v0", control="neural", neural_factor=1, rollout_workers=2)
+    assert "rollout_workers" not in func.descriptors
+    candidate = func.parametrization.sample()
+    assert -200 <= func.evaluation_function(candidate) < 0
+    assert func.num_calls == 23
+    # traces archived by the workers are sent back to the parent
+    func = multigym.GymMulti(
+        name="CartPole-v0", control="stackingmemory_neural", neural_factor=1, rollout_workers=2
+    )
+    losses = func.simulate_seeds(np.random.normal(size=func.dimension), [1, 2, 3], test_set=True)
+    assert len(losses) == 3
+    assert func.num_losses == 3
+    assert func.mean_loss == pytest.approx(-np.mean(losses))
+    assert 0 < len(func.archive) == len(func._archive_keys)
+
+
 gym.envs.register(
     id="TupleActionSpace-v0", entry_point="nevergrad.functions.gym:TupleActionSpace", max_episode_steps=168
 )
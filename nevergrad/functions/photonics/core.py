@@ -165,6 +165,7 @@ class Photonics(base.ExperimentFunction):
         self.name = name + ("_as_tuple" if as_tuple else "")
         self._as_tuple = as_tuple
         self._base_func: tp.Callable[[np.ndarray], float] = getattr(photonics, name)
+        self._batch_func: tp.Callable[[np.ndarray], np.ndarray] = getattr(photonics, "_" + name)
         param = _make_parametrization(
             name=name,
             dimension=dimension,
@@ -189,6 +190,19 @@ class Photonics(base.ExperimentFunction):
         base.update_leaderboard(f"{self.name},{self.parametrization.dimension}", loss, x, verbose=True)
         return loss
 
+    def compute_population(self, values: tp.Sequence[tp.Any]) -> np.ndarray:
+        """Computes the losses of several parametrization values at once,
+        the structures being stacked along with the wavelengths in the photonics solver.
+        """
+        inputs = [value if self._as_tuple else ((value,), {}) for value in values]
+        data = np.array([self.to_array(*args, **kwargs) for args, kwargs in inputs])
+        try:
+            output = np.array(self._batch_func(data), dtype=float)
+        except Exception:  # pylint: disable=broad-except
+            output = np.array([self._compute(*args, **kwargs) for args, kwargs in inputs])
+        output[np.isnan(output)] = float("inf")
+        return output
+
     def _compute(self, *args: tp.Any, **kwargs: tp.Any) -> float:
         x = self.to_array(*args, **kwargs)
         try:
@@ -18,11 +18,36 @@
 import typing as tp
 from pathlib import Path
 import numpy as np
-from scipy.linalg import toeplitz
 
 # pylint: disable=blacklisted-name,too-many-locals,too-many-arguments
 
 
+def _impedance(index: np.ndarray, tangent: np.ndarray, substrate: tp.Any) -> np.ndarray:
+    """Impedance of a stack of layers, seen from the top layer, given the substrate impedance.
+    index and tangent have the layers along their last axis, and all other axes (wavelengths,
+    structures...) are computed at once.
+    """
+    index, tangent = (np.moveaxis(a, -1, 0) for a in np.broadcast_arrays(index, tangent))  # layers first
+    Z = substrate
+    for k in range(index.shape[0] - 1, 0, -1):
+        Z = (Z - 1j * index[k] * tangent[k]) / (1 - 1j * tangent[k] * Z / index[k])
+    return Z  # type: ignore
+
+
+def _bragg(X: np.ndarray) -> np.ndarray:
+    lam = 600
+    bar = int(X.shape[-1] / 2)
+    ones = np.ones(X.shape[:-1] + (1,))
+    n = np.concatenate((ones, np.sqrt(X[..., 0:bar]), 1.7320508075688772 * ones), axis=-1)
+    hauteur = np.concatenate((0 * ones, X[..., bar : 2 * bar], 0 * ones), axis=-1)
+    tmp = np.tan(2 * np.pi * n * hauteur / lam)
+    # Specific to this substrate.
+    Z = _impedance(n, tmp, n[..., -1])
+    # Specific to air.
+    r = (1 - Z) / (1 + Z)
+    return np.real(1 - r * np.conj(r))  # type: ignore
+
+
 def bragg(X: np.ndarray) -> float:
     """
     Cost function for the Bragg mirror problem: maximizing the reflection
@@ -31,111 +56,93 @@ def bragg(X: np.ndarray) -> float:
     layer.
     https://hal.archives-ouvertes.fr/hal-02613161
     """
-    lam = 600
-    bar = int(np.size(X) / 2)
-    n = np.concatenate(([1], np.sqrt(X[0:bar]), [1.7320508075688772]))
-    type_ = np.arange(0, bar + 2)
-    hauteur = np.concatenate(([0], X[bar : 2 * bar], [0]))
-    tmp = np.tan(2 * np.pi * n[type_] * hauteur / lam)
+    return float(_bragg(X))
+
+
+def _chirped(X: np.ndarray) -> np.ndarray:
+    lam = np.linspace(500, 800, 50)
+    n = np.array([1, 1.4142135623730951, 1.7320508075688772])
+    type_ = np.concatenate(([0], np.tile([2, 1], int(X.shape[-1] / 2)), [2]))
+    zeros = np.zeros(X.shape[:-1] + (1,))
+    hauteur = np.concatenate((zeros, X, zeros), axis=-1)
+    # all wavelengths at once: (..., n_lambda, n_layers)
+    tmp = np.tan(2 * np.pi * n[type_] * hauteur[..., None, :] / lam[:, None])
     # Specific to this substrate.
-    Z = n[-1]
-    for k in range(np.size(type_) - 1, 0, -1):
-        Z = (Z - 1j * n[type_[k]] * tmp[k]) / (1 - 1j * tmp[k] * Z / n[type_[k]])
+    Z = _impedance(n[type_], tmp, 1.7320508075688772)
     # Specific to air.
     r = (1 - Z) / (1 + Z)
-    c = np.real(1 - r * np.conj(r))
-    return float(c)
+    # c=1-np.mean(abs(r)**2)
+    return 1 - np.real(np.sum(r * np.conj(r), axis=-1) / np.size(lam))  # type: ignore
 
 
 def chirped(X: np.ndarray) -> float:
-    lam = np.linspace(500, 800, 50)
-    n = np.array([1, 1.4142135623730951, 1.7320508075688772])
-    type_ = np.concatenate(([0], np.tile([2, 1], int(np.size(X) / 2)), [2]))
-    hauteur = np.concatenate(([0], X, [0]))
-    r = np.zeros(np.size(lam)) + 0j
-    for m in range(0, np.size(lam)):
-        # Specific to this substrate.
-        tmp = np.tan(2 * np.pi * n[type_] * hauteur / lam[m])
-        Z = 1.7320508075688772
-        for k in range(np.size(type_) - 1, 0, -1):
-            Z = (Z - 1j * n[type_[k]] * tmp[k]) / (1 - 1j * tmp[k] * Z / n[type_[k]])
-        # Specific to air.
-        r[m] = (1 - Z) / (1 + Z)
-    # c=1-np.mean(abs(r)**2)
-    c = 1 - np.real(np.sum(r * np.conj(r)) / np.size(lam))
-    return float(c)
+    return float(_chirped(X))
+
+
+# The following scattering matrix helpers act on the two last axes, so that stacks of
+# matrices (eg: one per wavelength) are processed at once.
 
 
 def cascade(T: np.ndarray, U: np.ndarray) -> np.ndarray:
-    n = int(T.shape[1] / 2)
-    J = np.linalg.inv(np.eye(n) - np.matmul(U[0:n, 0:n], T[n : 2 * n, n : 2 * n]))
-    K = np.linalg.inv(np.eye(n) - np.matmul(T[n : 2 * n, n : 2 * n], U[0:n, 0:n]))
+    n = int(T.shape[-1] / 2)
+    T11, T12, T21, T22 = T[..., :n, :n], T[..., :n, n:], T[..., n:, :n], T[..., n:, n:]
+    U11, U12, U21, U22 = U[..., :n, :n], U[..., :n, n:], U[..., n:, :n], U[..., n:, n:]
+    # with K = inv(I - T22 U11), inv(I - U11 T22) = I + U11 K T22 so that a single solve is needed
+    KT = np.linalg.solve(np.eye(n) - np.matmul(T22, U11), np.concatenate([T21, np.matmul(T22, U12)], axis=-1))
+    KT21, KT22U12 = KT[..., :n], KT[..., n:]
     S = np.block(
         [
-            [
-                T[0:n, 0:n]
-                + np.matmul(
-                    np.matmul(np.matmul(T[0:n, n : 2 * n], J), U[0:n, 0:n]),
-                    T[n : 2 * n, 0:n],
-                ),
-                np.matmul(np.matmul(T[0:n, n : 2 * n], J), U[0:n, n : 2 * n]),
-            ],
-            [
-                np.matmul(np.matmul(U[n : 2 * n, 0:n], K), T[n : 2 * n, 0:n]),
-                U[n : 2 * n, n : 2 * n]
-                + np.matmul(
-                    np.matmul(np.matmul(U[n : 2 * n, 0:n], K), T[n : 2 * n, n : 2 * n]),
-                    U[0:n, n : 2 * n],
-                ),
-            ],
+            [T11 + np.matmul(T12, np.matmul(U11, KT21)), np.matmul(T12, U12 + np.matmul(U11, KT22U12))],
+            [np.matmul(U21, KT21), U22 + np.matmul(U21, KT22U12)],
         ]
     )
     return S  # type: ignore
 
 
-def c_bas(A: np.ndarray, V: np.ndarray, h: float) -> np.ndarray:
-    n = int(A.shape[1] / 2)
-    D = np.diag(np.exp(1j * V * h))
+def c_bas(A: np.ndarray, V: np.ndarray, h: tp.Any) -> np.ndarray:
+    n = int(A.shape[-1] / 2)
+    D = np.exp(1j * V * np.asarray(h)[..., None])  # diagonal of the propagation matrix
     S = np.block(
         [
-            [A[0:n, 0:n], np.matmul(A[0:n, n : 2 * n], D)],
+            [A[..., 0:n, 0:n], A[..., 0:n, n : 2 * n] * D[..., None, :]],
             [
-                np.matmul(D, A[n : 2 * n, 0:n]),
-                np.matmul(np.matmul(D, A[n : 2 * n, n : 2 * n]), D),
+                D[..., :, None] * A[..., n : 2 * n, 0:n],
+                D[..., :, None] * A[..., n : 2 * n, n : 2 * n] * D[..., None, :],
             ],
         ]
     )
     return S  # type: ignore
 
 
-def marche(a: float, b: float, p: float, n: int, x: float) -> np.ndarray:
-    l = np.zeros(n, dtype=np.complex_)  # noqa
-    m = np.zeros(n, dtype=np.complex_)
+def marche(a: float, b: float, p: tp.Any, n: int, x: tp.Any) -> np.ndarray:
+    p = np.asarray(p)[..., None]
+    x = np.asarray(x)[..., None]
     tmp = (
         1
         / (2 * np.pi * np.arange(1, n))
         * (np.exp(-2 * 1j * np.pi * p * np.arange(1, n)) - 1)
         * np.exp(-2 * 1j * np.pi * np.arange(1, n) * x)
     )
-    l[1:n] = 1j * (a - b) * tmp
-    l[0] = p * a + (1 - p) * b
-    m[0] = l[0]
-    m[1:n] = 1j * (b - a) * np.conj(tmp)
-    T = toeplitz(l, m)
+    l = np.concatenate([p * a + (1 - p) * b, 1j * (a - b) * tmp], axis=-1)  # noqa
+    m = np.concatenate([l[..., :1], 1j * (b - a) * np.conj(tmp)], axis=-1)
+    # toeplitz matrix with first column l and first row m
+    diff = np.arange(n)[:, None] - np.arange(n)[None, :]
+    T = np.where(diff >= 0, l[..., np.abs(diff)], m[..., np.abs(diff)])
     return T  # type: ignore
 
 
 def creneau(
-    k0: float, a0: float, pol: float, e1: float, e2: float, a: float, n: int, x0: float
+    k0: tp.Any, a0: float, pol: float, e1: float, e2: float, a: tp.Any, n: int, x0: tp.Any
 ) -> tp.Tuple[np.ndarray, np.ndarray]:
     nmod = int(n / 2)
     alpha = np.diag(a0 + 2 * np.pi * np.arange(-nmod, nmod + 1))
+    k2 = np.asarray(k0)[..., None, None] ** 2
     if pol == 0:
-        M = alpha * alpha - k0 * k0 * marche(e1, e2, a, n, x0)
+        M = alpha * alpha - k2 * marche(e1, e2, a, n, x0)
         L, E = np.linalg.eig(M)
         L = np.sqrt(-L + 0j)
         L = (1 - 2 * (np.imag(L) < -1e-15)) * L
-        P = np.block([[E], [np.matmul(E, np.diag(L))]])
+        P = np.concatenate([E, E * L[..., None, :]], axis=-2)
     else:
         U = marche(1 / e1, 1 / e2, a, n, x0)
         T = np.linalg.inv(U)
@@ -144,33 +151,45 @@ def creneau(
                 np.matmul(np.matmul(T, alpha), np.linalg.inv(marche(e1, e2, a, n, x0))),
                 alpha,
             )
-            - k0 * k0 * T
+            - k2 * T
         )
         L, E = np.linalg.eig(M)
         L = np.sqrt(-L + 0j)
         L = (1 - 2 * (np.imag(L) < -1e-15)) * L
-        P = np.block([[E], [np.matmul(np.matmul(U, E), np.diag(L))]])
+        P = np.concatenate([E, np.matmul(U, E) * L[..., None, :]], axis=-2)
     return P, L
 
 
-def homogene(k0: float, a0: float, pol: float, epsilon: float, n: int) -> tp.Tuple[np.ndarray, np.ndarray]:
+def homogene(k0: tp.Any, a0: float, pol: float, epsilon: float, n: int) -> tp.Tuple[np.ndarray, np.ndarray]:
     nmod = int(n / 2)
+    k0 = np.asarray(k0)[..., None]
     valp = np.sqrt(epsilon * k0 * k0 - (a0 + 2 * np.pi * np.arange(-nmod, nmod + 1)) ** 2 + 0j)
     valp = valp * (1 - 2 * (valp < 0)) * (pol / epsilon + (1 - pol))
-    P = np.block([[np.eye(n)], [np.diag(valp)]])
+    eye = np.broadcast_to(np.eye(n), valp.shape[:-1] + (n, n))
+    P = np.concatenate([eye, eye * valp[..., None, :]], axis=-2)
     return P, valp
 
 
 def interface(P: np.ndarray, Q: np.ndarray) -> np.ndarray:
-    n = int(P.shape[1])
-    S = np.matmul(
-        np.linalg.inv(np.block([[P[0:n, 0:n], -Q[0:n, 0:n]], [P[n : 2 * n, 0:n], Q[n : 2 * n, 0:n]]])),
-        np.block([[-P[0:n, 0:n], Q[0:n, 0:n]], [P[n : 2 * n, 0:n], Q[n : 2 * n, 0:n]]]),
+    n = int(P.shape[-1])
+    S = np.linalg.solve(
+        np.block(
+            [
+                [P[..., 0:n, 0:n], -Q[..., 0:n, 0:n]],
+                [P[..., n : 2 * n, 0:n], Q[..., n : 2 * n, 0:n]],
+            ]
+        ),
+        np.block(
+            [
+                [-P[..., 0:n, 0:n], Q[..., 0:n, 0:n]],
+                [P[..., n : 2 * n, 0:n], Q[..., n : 2 * n, 0:n]],
+            ]
+        ),
     )
     return S  # type: ignore
 
 
-def morpho(X: np.ndarray) -> float:
+def _morpho(X: np.ndarray) -> np.ndarray:
     lam = 449.5897
     pol = 1.0
     d = 600.521475
@@ -178,51 +197,42 @@ def morpho(X: np.ndarray) -> float:
     # nmod=1
     e2 = 2.4336
     n = 2 * nmod + 1
-    n_motifs = int(X.size / 4)
+    n_motifs = int(X.shape[-1] / 4)
     X = X / d
-    h = X[0:n_motifs]
-    x0 = X[n_motifs : 2 * n_motifs]
-    a = X[2 * n_motifs : 3 * n_motifs]
-    spacers = X[3 * n_motifs : 4 * n_motifs]
-    l = lam / d  # noqa
-    k0 = 2 * np.pi / l
+    h = X[..., 0:n_motifs]
+    x0 = X[..., n_motifs : 2 * n_motifs]
+    a = X[..., 2 * n_motifs : 3 * n_motifs]
+    spacers = X[..., 3 * n_motifs : 4 * n_motifs]
+    # the first wavelength is used for the reflection cost, and the others for the absorption cost
+    lams = (np.array([400, 500, 600, 700, 800]) + 0.24587) / d
+    l = np.concatenate([[lam / d], lams])  # noqa
+    k0 = np.broadcast_to(2 * np.pi / l, X.shape[:-1] + l.shape)
     P, V = homogene(k0, 0, pol, 1, n)
-    S = np.block([[np.zeros([n, n]), np.eye(n, dtype=np.complex_)], [np.eye(n), np.zeros([n, n])]])
+    S = np.block(
+        [
+            [np.zeros([n, n], dtype=np.complex_), np.eye(n)],
+            [np.eye(n), np.zeros([n, n])],
+        ]
+    )
+    S = np.broadcast_to(S, k0.shape + S.shape)
     for j in range(0, n_motifs):
-        Pc, Vc = creneau(k0, 0, pol, e2, 1, a[j], n, x0[j])
+        # the structure does not depend on the wavelength (axis -1 of k0)
+        Pc, Vc = creneau(k0, 0, pol, e2, 1, a[..., j, None], n, x0[..., j, None])
         S = cascade(S, interface(P, Pc))
-        S = c_bas(S, Vc, h[j])
+        S = c_bas(S, Vc, h[..., j, None])
         S = cascade(S, interface(Pc, P))
-        S = c_bas(S, V, spacers[j])
+        S = c_bas(S, V, spacers[..., j, None])
     Pc, Vc = homogene(k0, 0, pol, e2, n)
     S = cascade(S, interface(P, Pc))
-    R = np.zeros(3, dtype=np.float_)
-    for j in range(-1, 2):
-        R[j] = abs(S[j + nmod, nmod]) ** 2 * np.real(V[j + nmod]) / k0
-    cost: float = 1 - (R[-1] + R[1]) / 2 + R[0] / 2
-
-    lams = (np.array([400, 500, 600, 700, 800]) + 0.24587) / d
-    bar = 0
-    for lo in lams:
-        k0 = 2 * np.pi / lo
-        P, V = homogene(k0, 0, pol, 1, n)
-        S = np.block(
-            [
-                [np.zeros([n, n], dtype=np.complex_), np.eye(n)],
-                [np.eye(n), np.zeros([n, n])],
-            ]
-        )
-        for j in range(0, n_motifs):
-            Pc, Vc = creneau(k0, 0, pol, e2, 1, a[j], n, x0[j])
-            S = cascade(S, interface(P, Pc))
-            S = c_bas(S, Vc, h[j])
-            S = cascade(S, interface(Pc, P))
-            S = c_bas(S, V, spacers[j])
-        Pc, Vc = homogene(k0, 0, pol, e2, n)
-        S = cascade(S, interface(P, Pc))
-        bar += abs(S[nmod, nmod]) ** 2 * np.real(V[nmod]) / k0
+    R = abs(S[..., 0, nmod - 1 : nmod + 2, nmod]) ** 2 * np.real(V[..., 0, nmod - 1 : nmod + 2]) / k0[..., :1]
+    cost = 1 - (R[..., 0] + R[..., 2]) / 2 + R[..., 1] / 2
+    bar = np.sum(abs(S[..., 1:, nmod, nmod]) ** 2 * np.real(V[..., 1:, nmod]) / k0[..., 1:], axis=-1)
     cost += bar / lams.size
-    return cost
+    return cost  # type: ignore
+
+
+def morpho(X: np.ndarray) -> float:
+    return float(_morpho(X))
 
 
 i = complex(0, 1)
@@ -233,7 +243,8 @@ def epscSi(lam: np.ndarray) -> np.ndarray:
     e = np.load(
         Path(__file__).with_name("epsilon_epscSi.npy")
     )  # saved with np.save(filename, e) and dumped in this folder
-    y = np.argmin(np.sign(lam - a)) - 1
+    lam = np.asarray(lam)
+    y = np.argmin(np.sign(lam[..., None] - a), axis=-1) - 1
     epsilon = (e[y + 1] - e[y]) / (a[y + 1] - a[y]) * (lam - a[y]) + e[y]
     return epsilon  # type: ignore
 
@@ -242,14 +253,15 @@ def cascade2(A: np.ndarray, B: np.ndarray) -> np.ndarray:
     """
     This function takes two 2x2 matrices A and B, that are assumed to be scattering matrices
     and combines them assuming A is the "upper" one, and B the "lower" one, physically.
-    The result is a 2x2 scattering matrix.
+    The result is a 2x2 scattering matrix (stacks of matrices along the first axes are
+    combined at once).
     """
-    t = 1 / (1 - B[0, 0] * A[1, 1])
-    S = np.zeros((2, 2), dtype=complex)
-    S[0, 0] = A[0, 0] + A[0, 1] * B[0, 0] * A[1, 0] * t
-    S[0, 1] = A[0, 1] * B[0, 1] * t
-    S[1, 0] = B[1, 0] * A[1, 0] * t
-    S[1, 1] = B[1, 1] + A[1, 1] * B[0, 1] * B[1, 0] * t
+    t = 1 / (1 - B[..., 0, 0] * A[..., 1, 1])
+    S = np.zeros(np.broadcast_shapes(A.shape, B.shape), dtype=complex)
+    S[..., 0, 0] = A[..., 0, 0] + A[..., 0, 1] * B[..., 0, 0] * A[..., 1, 0] * t
+    S[..., 0, 1] = A[..., 0, 1] * B[..., 0, 1] * t
+    S[..., 1, 0] = B[..., 1, 0] * A[..., 1, 0] * t
+    S[..., 1, 1] = B[..., 1, 1] + A[..., 1, 1] * B[..., 0, 1] * B[..., 1, 0] * t
     return S
 
 
@@ -262,7 +274,7 @@ def solar(lam: np.ndarray) -> np.ndarray:
 
 
 def absorption(
-    lam: float,
+    lam: tp.Any,
     epsilon: np.ndarray,
     mu: np.ndarray,
     type_: np.ndarray,
@@ -270,107 +282,127 @@ def absorption(
     pol: int,
     theta: float,
 ) -> np.ndarray:
+    """Absorption in each layer of the structure.
+    The materials (epsilon and mu) and the layers (hauteur) are along the last axis,
+    and all other axes are broadcast together with lam, so that several wavelengths
+    and structures are computed at once with stacks of 2x2 scattering matrices.
+    """
+    lam = np.asarray(lam)
     f = mu if not pol else epsilon
     k0 = 2 * np.pi / lam
     g = type_.size
-    alpha = np.sqrt(epsilon[type_[0]] * mu[type_[0]]) * k0 * np.sin(theta)
-    gamma = np.sqrt(epsilon[type_] * mu[type_] * k0**2 - np.ones(g) * alpha**2)
-    if np.real(epsilon[type_[0]]) < 0 and np.real(mu[type_[0]]) < 0:
-        gamma[0] = -gamma[0]
+    eps = epsilon[..., type_]
+    mut = mu[..., type_]
+    alpha = np.sqrt(eps[..., 0] * mut[..., 0]) * k0 * np.sin(theta)
+    gamma = np.sqrt(eps * mut * k0[..., None] ** 2 - np.ones(g) * alpha[..., None] ** 2)
+    gamma[..., 0] = np.where((np.real(eps[..., 0]) < 0) & (np.real(mut[..., 0]) < 0), -1, 1) * gamma[..., 0]
     if g > 2:
-        gamma[1 : g - 2] = gamma[1 : g - 2] * (1 - 2 * (np.imag(gamma[1 : g - 2]) < 0))
-    if (
-        np.real(epsilon[type_[g - 1]]) < 0
-        and np.real(mu[type_[g - 1]]) < 0
-        and np.real(np.sqrt(epsilon[type_[g - 1]] * mu[type_[g - 1]] * k0**2 - alpha**2)) != 0
-    ):
-        gamma[g - 1] = -np.sqrt(epsilon[type_[g - 1]] * mu[type_[g - 1]] * k0**2 - alpha**2)
-    else:
-        gamma[g - 1] = np.sqrt(epsilon[type_[g - 1]] * mu[type_[g - 1]] * k0**2 - alpha**2)
-    T = np.zeros(((2 * g, 2, 2)), dtype=complex)
-    T[0] = [[0, 1], [1, 0]]
-    for k2 in range(g - 1):
-        t = np.exp(i * gamma[k2] * hauteur[k2])
-        T[2 * k2 + 1] = [[0, t], [t, 0]]
-        # Interface scattering matrix
-        b1 = gamma[k2] / f[type_[k2]]
-        b2 = gamma[k2 + 1] / f[type_[k2 + 1]]
-        T[2 * k2 + 2] = [
-            [(b1 - b2) / (b1 + b2), 2 * b2 / (b1 + b2)],
-            [2 * b1 / (b1 + b2), (b2 - b1) / (b1 + b2)],
-        ]
-        t = np.exp(i * gamma[g - 1] * hauteur[g - 1])
-        T[2 * g - 1] = [[0, t], [t, 0]]
-    H = np.zeros(((2 * g - 1, 2, 2)), dtype=complex)
-    A = np.zeros(((2 * g - 1, 2, 2)), dtype=complex)
-    H[0] = T[2 * g - 1]
-    A[0] = T[0]
+        gamma[..., 1 : g - 2] = gamma[..., 1 : g - 2] * (1 - 2 * (np.imag(gamma[..., 1 : g - 2]) < 0))
+    last = np.sqrt(eps[..., g - 1] * mut[..., g - 1] * k0**2 - alpha**2)
+    reverse = (np.real(eps[..., g - 1]) < 0) & (np.real(mut[..., g - 1]) < 0) & (np.real(last) != 0)
+    gamma[..., g - 1] = np.where(reverse, -last, last)
+    shape = np.broadcast_shapes(gamma.shape[:-1], hauteur.shape[:-1])
+    T = np.zeros(shape + (2 * g, 2, 2), dtype=complex)
+    T[..., 0, :, :] = [[0, 1], [1, 0]]
+    # Layer propagation matrices
+    t = np.exp(i * gamma[..., : g - 1] * hauteur[..., : g - 1])
+    T[..., 1 : 2 * g - 2 : 2, 0, 1] = t
+    T[..., 1 : 2 * g - 2 : 2, 1, 0] = t
+    # Interface scattering matrices
+    b = gamma / f[..., type_]
+    b1 = b[..., : g - 1]
+    b2 = b[..., 1:]
+    T[..., 2 : 2 * g - 1 : 2, 0, 0] = (b1 - b2) / (b1 + b2)
+    T[..., 2 : 2 * g - 1 : 2, 0, 1] = 2 * b2 / (b1 + b2)
+    T[..., 2 : 2 * g - 1 : 2, 1, 0] = 2 * b1 / (b1 + b2)
+    T[..., 2 : 2 * g - 1 : 2, 1, 1] = (b2 - b1) / (b1 + b2)
+    if g > 1:
+        t = np.exp(i * gamma[..., g - 1] * hauteur[..., g - 1])
+        T[..., 2 * g - 1, 0, 1] = t
+        T[..., 2 * g - 1, 1, 0] = t
+    H = np.zeros(shape + (2 * g - 1, 2, 2), dtype=complex)
+    A = np.zeros(shape + (2 * g - 1, 2, 2), dtype=complex)
+    H[..., 0, :, :] = T[..., 2 * g - 1, :, :]
+    A[..., 0, :, :] = T[..., 0, :, :]
     for j in range(2 * g - 2):
-        A[j + 1] = cascade2(A[j], T[j + 1])
-        H[j + 1] = cascade2(T[2 * g - 2 - j], H[j])
-    # r = A[len(A) - 1][0, 0]  # TODO: unused
-    t = A[len(A) - 1][1, 0]
-    I = np.zeros(((2 * g, 2, 2)), dtype=complex)  # noqa
-    for j in range(len(T) - 1):
-        I[j][0, 0] = A[j][1, 0] / (1 - A[j][1, 1] * H[len(T) - 2 - j][0, 0])
-        I[j][0, 1] = A[j][1, 1] * H[len(T) - 2 - j][0, 1] / (1 - A[j][1, 1] * H[len(T) - 2 - j][0, 0])
-        I[j][1, 0] = A[j][1, 0] * H[len(T) - 2 - j][0, 0] / (1 - A[j][1, 1] * H[len(T) - 2 - j][0, 0])
-        I[j][1, 1] = H[len(T) - 2 - j][0, 1] / (1 - A[j][1, 1] * H[len(T) - 2 - j][0, 0])
-    I[2 * g - 1][0, 0] = I[2 * g - 2][0, 0] * np.exp(i * gamma[g - 1] * hauteur[g - 1])
-    I[2 * g - 1][0, 1] = I[2 * g - 2][0, 1] * np.exp(i * gamma[g - 1] * hauteur[g - 1])
-    I[2 * g - 1][1, 0] = 0
-    I[2 * g - 1][1, 1] = 0
-    w = 0
-    poynting = np.zeros(2 * g, dtype=complex)
-    if pol == 0:  # TE
-        for j in range(2 * g):
-            poynting[j] = np.real(
-                (I[j][0, 0] + I[j][1, 0])
-                * np.conj((I[j][0, 0] - I[j][1, 0]) * gamma[w] / mu[type_[w]])
-                * mu[type_[0]]
-                / (gamma[0])
-            )
-            w = w + 1 - np.mod(j + 1, 2)
-    else:  # TM
-        for j in range(2 * g):
-            poynting[j] = np.real(
-                (I[j][0, 0] - I[j][1, 0])
-                * np.conj((I[j][0, 0] + I[j][1, 0]) * gamma[w] / epsilon[type_[w]])
-                * epsilon[type_[0]]
-                / (gamma[0])
-            )
-            w = w + 1 - np.mod(j + 1, 2)
-    tmp = abs(-np.diff(poynting))
-    absorb = tmp[np.arange(0, 2 * g, 2)]
+        A[..., j + 1, :, :] = cascade2(A[..., j, :, :], T[..., j + 1, :, :])
+        H[..., j + 1, :, :] = cascade2(T[..., 2 * g - 2 - j, :, :], H[..., j, :, :])
+    # r = A[..., -1, 0, 0]  # TODO: unused
+    H = H[..., ::-1, :, :]  # H[..., j] now matches A[..., j]
+    denom = 1 - A[..., 1, 1] * H[..., 0, 0]
+    I = np.zeros(shape + (2 * g, 2, 2), dtype=complex)  # noqa
+    I[..., : 2 * g - 1, 0, 0] = A[..., 1, 0] / denom
+    I[..., : 2 * g - 1, 0, 1] = A[..., 1, 1] * H[..., 0, 1] / denom
+    I[..., : 2 * g - 1, 1, 0] = A[..., 1, 0] * H[..., 0, 0] / denom
+    I[..., : 2 * g - 1, 1, 1] = H[..., 0, 1] / denom
+    I[..., 2 * g - 1, 0, 0] = I[..., 2 * g - 2, 0, 0] * np.exp(i * gamma[..., g - 1] * hauteur[..., g - 1])
+    I[..., 2 * g - 1, 0, 1] = I[..., 2 * g - 2, 0, 1] * np.exp(i * gamma[..., g - 1] * hauteur[..., g - 1])
+    w = np.arange(2 * g) // 2  # layer of each interface side
+    f0 = f[..., type_[0]]
+    incoming = (I[..., 0, 0] + I[..., 1, 0]) if pol == 0 else (I[..., 0, 0] - I[..., 1, 0])
+    outgoing = (I[..., 0, 0] - I[..., 1, 0]) if pol == 0 else (I[..., 0, 0] + I[..., 1, 0])
+    # TE if pol == 0 else TM
+    poynting = np.real(
+        incoming * np.conj(outgoing * gamma[..., w] / f[..., type_[w]]) * f0[..., None] / gamma[..., :1]
+    )
+    tmp = abs(-np.diff(poynting, axis=-1))
+    absorb = tmp[..., np.arange(0, 2 * g, 2)]
     return absorb  # type: ignore
 
 
+def _cf_photosic(lam: np.ndarray, epsilon: np.ndarray, type_: np.ndarray, hauteur: np.ndarray) -> np.ndarray:
+    """Cost of a solar cell stack given its materials per wavelength (..., n_lambda, n_materials)
+    and its layers (..., n_layers), computed for all wavelengths at once.
+    """
+    theta = 0.0
+    mu = np.ones(epsilon.shape[-1])
+    pol = 0
+    absorb = absorption(lam, epsilon, mu, type_, hauteur[..., None, :], pol, theta)
+    scc = solar(lam)
+    Ab = absorb[..., -1]
+    max_scc = np.trapz(scc, lam)
+    j_sc = np.trapz(scc * Ab, lam, axis=-1)
+    CE = j_sc / max_scc
+    cost = 1 - CE
+    return cost  # type: ignore
+
+
+def _cf_photosic_reference(X: np.ndarray) -> np.ndarray:
+    lam_min = 375
+    lam_max = 750
+    n_lam = 100
+    vlam = np.linspace(lam_min, lam_max, n_lam)
+    epsilon = np.array(
+        [np.ones(n_lam), 2 * np.ones(n_lam), 3 * np.ones(n_lam), epscSi(vlam)], dtype=complex
+    ).T
+    type_ = np.append(0, np.append(np.tile(np.array([1, 2]), int(X.shape[-1] / 2)), 3))
+    ones = np.ones(X.shape[:-1] + (1,))
+    hauteur = np.concatenate([0 * ones, X, 30000 * ones], axis=-1)
+    return _cf_photosic(vlam, epsilon, type_, hauteur)
+
+
 def cf_photosic_reference(X: np.ndarray) -> float:
     """vector X is only the thicknesses of each layers, because the materials (so the epislon)
     are imposed by the function. This is similar in the chirped function.
     """
+    return float(_cf_photosic_reference(X))
+
+
+def _cf_photosic_realistic(eps_and_d: np.ndarray) -> np.ndarray:
+    dimension = int(eps_and_d.shape[-1] / 2)
+    eps = eps_and_d[..., 0:dimension]
+    d = eps_and_d[..., dimension : dimension * 2]
     lam_min = 375
     lam_max = 750
     n_lam = 100
-    theta = 0 * np.pi / 180
     vlam = np.linspace(lam_min, lam_max, n_lam)
-    scc = np.zeros(n_lam)
-    Ab = np.zeros(n_lam)
-    for k in range(n_lam):
-        lam = vlam[k]
-        epsilon = np.array([1, 2, 3, epscSi(lam)], dtype=complex)
-        mu = np.ones(epsilon.size)
-        type_ = np.append(0, np.append(np.tile(np.array([1, 2]), int(X.size / 2)), 3))
-        hauteur = np.append(0, np.append(X, 30000))
-        pol = 0
-        absorb = absorption(lam, epsilon, mu, type_, hauteur, pol, theta)
-        scc[k] = solar(lam)
-        Ab[k] = absorb[len(absorb) - 1]
-    max_scc = np.trapz(scc, vlam)
-    j_sc = np.trapz(scc * Ab, vlam)
-    CE = j_sc / max_scc
-    cost = 1 - CE
-    return cost  # type: ignore
+    epsilon = np.ones(eps.shape[:-1] + (n_lam, dimension + 2), dtype=complex)
+    epsilon[..., 1:-1] = eps[..., None, :]
+    epsilon[..., -1] = epscSi(vlam)
+    type_ = np.arange(0, dimension + 2)
+    ones = np.ones(d.shape[:-1] + (1,))
+    hauteur = np.concatenate([0 * ones, d, 30000 * ones], axis=-1)
+    return _cf_photosic(vlam, epsilon, type_, hauteur)
 
 
 def cf_photosic_realistic(eps_and_d: np.ndarray) -> float:
@@ -381,31 +413,4 @@ def cf_photosic_realistic(eps_and_d: np.ndarray) -> float:
     and the best results are generally obtained when the structure has between 10 and 20 layers.
     The epsilon values are generally comprised between 1.00 and 9.00.
     """
-    dimension = int(eps_and_d.size / 2)
-    eps = eps_and_d[0:dimension]
-    d = eps_and_d[dimension : dimension * 2]
-    epsd = np.array([eps, d])
-    lam_min = 375
-    lam_max = 750
-    n_lam = 100
-    theta = 0 * 180 / np.pi
-    vlam = np.linspace(lam_min, lam_max, n_lam)
-    scc = np.zeros(n_lam)
-    Ab = np.zeros(n_lam)
-    # spectrum=np.zeros(n_lam)
-    for k in range(n_lam):
-        # absorb=absorption(epsd,theta*pi/180,lam[k])
-        lam = vlam[k]
-        epsilon = np.append(1, np.append(epsd[0], epscSi(lam)))
-        mu = np.ones(epsilon.size)
-        type_ = np.arange(0, epsd[0].size + 2)
-        hauteur = np.append(0, np.append(epsd[1], 30000))
-        pol = 0
-        absorb = absorption(lam, epsilon, mu, type_, hauteur, pol, theta)
-        scc[k] = solar(lam)
-        Ab[k] = absorb[len(absorb) - 1]
-    max_scc = np.trapz(scc, vlam)
-    j_sc = np.trapz(scc * Ab, vlam)
-    CE = j_sc / max_scc
-    cost = 1 - CE
-    return cost  # type: ignore
+    return float(_cf_photosic_realistic(eps_and_d))
@@ -200,3 +200,19 @@ def test_photosic_reference() -> None:
 def test_photosic_realist() -> None:
     cf_test = photonics.cf_photosic_realistic(np.array(EPS_AND_D))
     np.testing.assert_almost_equal(cf_test, 0.08602574254532869)
+
+
+@pytest.mark.parametrize("as_tuple", [False, True])  # type: ignore
+@pytest.mark.parametrize(  # type: ignore
+    "name", ["bragg", "chirped", "morpho", "cf_photosic_reference", "cf_photosic_realistic"]
+)
+def test_compute_population(name: str, as_tuple: bool) -> None:
+    func = core.Photonics(name, 16 if name != "morpho" else 4, as_tuple=as_tuple)
+    rng = np.random.RandomState(12)
+    params = [
+        func.parametrization.spawn_child().set_standardized_data(rng.normal(0, 1, size=func.dimension))
+        for _ in range(3)
+    ]
+    values = [p.value for p in params]
+    expected = [func(*p.args) for p in params]
+    np.testing.assert_almost_equal(func.compute_population(values), expected)  # type: ignore
@@ -7,7 +7,7 @@
 # University Clermont Auvergne, CNRS, SIGMA Clermont, Institut Pascal
 
 import typing as tp
-from math import pi, cos, sin
+from math import pi
 import matplotlib.pyplot as plt
 import numpy as np
 from nevergrad.parametrization import parameter as p
@@ -49,6 +49,29 @@ class Agent:
         return self.layers[-1] @ data  # type: ignore
 
 
+class AgentStack:
+    """Stacks the layers of agents with a same architecture, so that the outputs of all
+    agents are computed at once, with one batched matmul per layer.
+
+    Note
+    ----
+    The layers are copied: the stack must be created again if the parameters of the agents are updated.
+    """
+
+    def __init__(self, agents: tp.Sequence[Agent]) -> None:
+        self.layers = [np.stack(layers) for layers in zip(*(a.layers for a in agents))]
+
+    def get_outputs(self, data: np.ndarray) -> np.ndarray:
+        """Returns the outputs of all agents (one row per agent), for an input shared by all
+        agents (1d array) or for one input per agent (2d array, one row per agent)
+        """
+        data = np.asarray(data)
+        out = data[None, :, None] if data.ndim == 1 else data[:, :, None]
+        for l in self.layers[:-1]:
+            out = np.tanh(l @ out)
+        return (self.layers[-1] @ out)[:, :, 0]  # type: ignore
+
+
 # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-statements,too-many-locals
 class PowerSystem(ExperimentFunction):
     """Very simple model of a power system.
@@ -127,8 +150,7 @@ class PowerSystem(ExperimentFunction):
         dam_agents = self.dam_agents
         for agent, array in zip(dam_agents, arrays):
             agent.set_parameters(array)
-
-        self.marginal_costs = []
+        agent_stack = AgentStack(dam_agents)
 
         num_dams = int(self.num_dams)
         # Assume empty initial stocks.
@@ -138,96 +160,95 @@ class PowerSystem(ExperimentFunction):
         cost = 0.0
         # Loop on time steps.
         num_time_steps = int(365 * 24 * self.number_of_years)
-        consumption = 0.0
-        hydro_prod_per_time_step: tp.List[tp.Any] = []
-        consumption_per_time_step: tp.List[float] = []
+        times = np.arange(num_time_steps)
+        # Random draws, in the same order as when drawing them at each time step:
+        # rain for all dams, then consumption noise (except at the first time step).
+        draws = np.random.rand(num_time_steps * (num_dams + 1) - 1)
+        draws = np.insert(draws, num_dams, 0.0).reshape(num_time_steps, num_dams + 1)
+        # Rain
+        rain = 0.5 * (1.0 + np.cos(2 * pi * times[:, None] / (24 * 365) + delay)) * draws[:, :num_dams]
+        # Consumption model.
+        base_consumption = (
+            self.constant_to_year_ratio * self.year_to_day_ratio
+            + 0.5 * self.year_to_day_ratio * (1.0 + np.cos(2 * pi * times / (24 * 365)))
+            + 0.5 * (1.0 + np.cos(2 * pi * times / 24))
+        )
+        consumption = np.zeros(num_time_steps)
         for t in range(num_time_steps):
-
-            # Rain
-            stocks += 0.5 * (1.0 + np.cos(2 * pi * t / (24 * 365) + delay)) * np.random.rand(num_dams)
-            # Consumption model.
-            base_consumption = (
-                self.constant_to_year_ratio * self.year_to_day_ratio
-                + 0.5 * self.year_to_day_ratio * (1.0 + cos(2 * pi * t / (24 * 365)))
-                + 0.5 * (1.0 + cos(2 * pi * t / 24))
-            )
-
             if t == 0:
-                consumption = base_consumption
+                consumption[t] = base_consumption[t]
             else:
-                consumption = max(
+                consumption[t] = max(
                     0.0,
-                    consumption
-                    + self.consumption_noise * (np.random.rand() - 0.5)
-                    + self.back_to_normal * (base_consumption - consumption),
+                    consumption[t - 1]
+                    + self.consumption_noise * (draws[t, num_dams] - 0.5)
+                    + self.back_to_normal * (base_consumption[t] - consumption[t - 1]),
                 )
-            consumption_per_time_step += [consumption]
-            # "Needed" stores what we need, and will decrease as we use various power plants for producing.
-            needed = consumption
-
-            # Setting inputs for all agents.
-            base_x = [
-                cos(2 * pi * t / 24.0),
-                sin(2 * pi * t / 24.0),
-                cos(2 * pi * t / (365 * 24)),
-                sin(2 * pi * t / (365 * 24)),
-                needed,
-                self.average_consumption,
-                self.year_to_day_ratio,
-                self.constant_to_year_ratio,
-                self.back_to_normal,
-                self.consumption_noise,
+        hydro_prod = np.zeros((num_time_steps, num_dams))
+        marginal_costs = np.zeros(num_time_steps)
+
+        # Setting inputs for all agents: the first 10 inputs depend on the time step,
+        # and the last ones are the stocks. "Needed" is the consumption.
+        x = np.concatenate((np.zeros(10), self.thermal_power_capacity, self.thermal_power_prices, stocks))
+        base_x = np.stack(
+            [
+                np.cos(2 * pi * times / 24.0),
+                np.sin(2 * pi * times / 24.0),
+                np.cos(2 * pi * times / (365 * 24)),
+                np.sin(2 * pi * times / (365 * 24)),
+                consumption,
             ]
-
-            x = np.concatenate((base_x, self.thermal_power_capacity, self.thermal_power_prices, stocks))
-
+            + [
+                np.full(num_time_steps, val)
+                for val in (
+                    self.average_consumption,
+                    self.year_to_day_ratio,
+                    self.constant_to_year_ratio,
+                    self.back_to_normal,
+                    self.consumption_noise,
+                )
+            ],
+            axis=1,
+        )
+        price = np.concatenate((np.zeros(num_dams), self.thermal_power_prices))
+        capacity = np.concatenate((stocks, self.thermal_power_capacity))
+        for t in range(num_time_steps):
+            stocks += rain[t]
+            x[:10] = base_x[t]
+            x[-num_dams:] = stocks
             # Prices as a decomposition tool!
-            price: np.ndarray = np.asarray([a.get_output(x)[0] for a in dam_agents])
-            dam_index = np.arange(num_dams)
-            price = np.concatenate((price, self.thermal_power_prices))
-            capacity = np.concatenate((stocks, self.thermal_power_capacity))
-            dam_index = np.concatenate((dam_index, -1 * np.ones(len(price), dtype=int)))
-
-            assert len(price) == num_dams + self.num_thermal_plants
-            hydro_prod: np.ndarray = np.zeros(num_dams)
-
-            # Let us rank power plants by production cost.
-            order = sorted(range(len(price)), key=lambda x: price[x])  # pylint: disable=cell-var-from-loop
-            price = price[order]
-            capacity = capacity[order]
-            dam_index = dam_index[order]
-
-            # Using power plants in their cost order, so that we use cheap power plants first.
-            marginal_cost = 0.0
-            for i, _ in enumerate(price):
-                if needed <= 0:
-                    break
-                production = min(capacity[i], needed)
-                # If this is a dam, producing will reduce the stock.
-                if dam_index[i] >= 0:
-                    hydro_prod[dam_index[i]] += production  # Let us log the hydro prod for this dam.
-                    stocks[dam_index[i]] -= production
-                    assert stocks[dam_index[i]] >= -1e-7
-                else:
-                    # If this is not a dam, we pay for using thermal plants.
-                    cost += production * price[i]
-                    if production > 1e-7:
-                        marginal_cost = price[i]
-
-                needed -= production
+            price[:num_dams] = agent_stack.get_outputs(x)[:, 0]
+            capacity[:num_dams] = stocks
+
+            # Let us rank power plants by production cost, and use them in this order,
+            # so that we use cheap power plants first (until the needs are satisfied).
+            order = price.argsort(kind="stable")
+            sorted_capacity = capacity[order]
+            remaining = consumption[t] - (sorted_capacity.cumsum() - sorted_capacity)
+            production = np.where(remaining > 0, np.minimum(sorted_capacity, remaining), 0.0)
+            dam = order < num_dams
+            # If this is a dam, producing will reduce the stock (and we log the hydro prod for this dam).
+            hydro_prod[t, order[dam]] = production[dam]
+            stocks -= hydro_prod[t]
+            assert stocks.min() >= -1e-7
+            # If this is not a dam, we pay for using thermal plants.
+            thermal = ~dam
+            sorted_price = price[order]
+            cost += float(production[thermal] @ sorted_price[thermal])
+            used = np.flatnonzero(thermal & (production > 1e-7))
+            if used.size:
+                marginal_costs[t] = sorted_price[used[-1]]
+            needed = consumption[t] - production.sum()
             # Cost in case of failures -- this is
             # harming industries and hospitals, so it can be penalized.
-            cost += failure_cost * needed
+            if needed > 0:
+                cost += failure_cost * needed
             if needed > 1e-7:
-                marginal_cost = failure_cost
-            self.marginal_costs += [marginal_cost]
-
-            hydro_prod_per_time_step += [hydro_prod]
+                marginal_costs[t] = failure_cost
         # Other data of interest: , hydro_prod, hydro_prod_per_time_step, consumption_per_time_step
-        assert len(hydro_prod_per_time_step) == num_time_steps  # Each time steps has 1 value per dam.
-        assert len(consumption_per_time_step) == num_time_steps
-        self.hydro_prod_per_time_step = hydro_prod_per_time_step
-        self.consumption_per_time_step = consumption_per_time_step
+        self.marginal_costs = marginal_costs.tolist()
+        self.hydro_prod_per_time_step = list(hydro_prod)  # Each time steps has 1 value per dam.
+        self.consumption_per_time_step = consumption.tolist()
         self.losses += [cost]
         return cost
 
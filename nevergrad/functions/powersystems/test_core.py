@@ -18,6 +18,32 @@ def test_powersystem_small() -> None:
     np.testing.assert_almost_equal(value, 4266.8177479)
 
 
+def test_powersystem_logs() -> None:
+    np.random.seed(3)
+    dams = 3
+    func = core.PowerSystem(num_dams=dams, num_years=0.1)
+    x = [np.random.normal(0, 1, size=func.dimension // dams) for _ in range(dams)]
+    value = func.function(*x)
+    num_time_steps = int(365 * 24 * 0.1)
+    hydro = np.array(func.hydro_prod_per_time_step)
+    assert hydro.shape == (num_time_steps, dams)
+    assert len(func.consumption_per_time_step) == len(func.marginal_costs) == num_time_steps
+    assert np.all(hydro >= 0) and np.sum(hydro) > 0
+    # hydro production never exceeds the consumption
+    assert np.all(np.sum(hydro, axis=1) <= np.array(func.consumption_per_time_step) + 1e-7)
+    assert func.losses == [value]
+
+
+def test_agent_stack() -> None:
+    agents = [core.Agent(5, 2, layers=3, layer_width=4) for _ in range(3)]
+    for agent in agents:
+        agent.set_parameters(np.random.normal(size=agent.dimension))
+    stack = core.AgentStack(agents)
+    data = np.random.normal(size=(3, 5))
+    np.testing.assert_almost_equal(stack.get_outputs(data[0]), [a.get_output(data[0]) for a in agents])
+    np.testing.assert_almost_equal(stack.get_outputs(data), [a.get_output(d) for a, d in zip(agents, data)])
+
+
 @patch(f"{__name__}.core.plt")
 def test_make_plots(mock_plt: tp.Any) -> None:
     func = core.PowerSystem()
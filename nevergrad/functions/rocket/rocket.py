@@ -9,10 +9,10 @@ Based on
 https://raw.githubusercontent.com/purdue-orbital/rocket-simulation/master/Simulation2.py
 """
 
-
 import math
 import pyproj
 import numpy as np
+import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter
 from ..base import ArrayExperimentFunction
 
@@ -23,79 +23,94 @@ class Rocket(ArrayExperimentFunction):
     def __init__(self, symmetry: int = 0) -> None:
         super().__init__(rocket, parametrization=parameter.Array(shape=(24,)), symmetry=symmetry)
 
+    def compute_population(self, values: tp.Sequence[np.ndarray]) -> np.ndarray:
+        """Computes the losses of several thrust biases at once, their flights being simulated together"""
+        x = self.threshold_coefficients + self.slope_coefficients * np.array(values, dtype=float)
+        return simulate(x)
 
-def rocket(thrust_bias: np.ndarray):
 
+def rocket(thrust_bias: np.ndarray) -> float:
     assert len(thrust_bias) == 24, "Bad guide length."
-    # Covert ang to rads
-
-    def rad(ang):
-        return (ang / 360) * 2 * (3.1415926)
-
-    # air density (simple model based on nasa function online)
-    def air_density(alt):
-        if alt <= 11000:
-            T = 15.04 - (0.00649 * alt)
-            p = 101.29 * math.pow((T + 273.1) / 288.08, 5.256)
-        elif alt <= 25000:
-            T = -56.46
-            p = float(22.65 * (math.exp(1.73 - 0.000157 * alt))).real
-        else:
-            T = -131.21 + (0.00299 * alt)
-            p = 2.488 * (((T + 273.1) / 216.6) ** -11.388).real
-        d = p / (0.2869 * (T + 273.1))
-        return d
-
-    def alt(Ex, Ey, Ez):
-        ecef = pyproj.Proj(proj="geocent", ellps="WGS84", datum="WGS84")
-        lla = pyproj.Proj(proj="latlong", ellps="WGS84", datum="WGS84")
-        transformer = pyproj.Transformer.from_proj(ecef, lla)
-        _, _, alt = transformer.transform(Ex, Ey, Ez, radians=True)
-        return alt
-
-    def grav_force(Ex, Ey, Ez, m):
-        # lat = rad(lat)
-        G = -6.67408 * (1 / (10**11))  # Gravitational Constant (m^3 kg^-1 s^-2)
-        M = 5.972 * (10**24)  # Earth Mass (kg)
-        # a = 6398137  # equatoral radius
-        # b = 6356752  # polar radius
-        # R = math.sqrt((math.pow(math.pow(a, 2) * math.cos(lat), 2) + (math.pow(math.pow(b, 2) * math.sin(lat), 2))) / (
-        #            math.pow(a * math.cos(lat), 2) + (math.pow(b * math.sin(lat), 2))))  # Radius of earth (m)
-        r = (Ex**2 + Ey**2 + Ez**2) ** 0.5
-        F = (G * M * m) / (r**2)  # Force of gravity (N)
-        F_z = F * Ez / r
-        F_x = F * (Ex / ((Ex**2 + Ey**2) ** 0.5))
-        F_y = F * (Ey / ((Ex**2 + Ey**2) ** 0.5))
-        return F_x, F_y, F_z  # in the -r direction
-
-    def drag_force(Ex, Ey, Ez, Evx, Evy, Evz):
-        cd = 0.94  # coefficent of drag
-        a = 0.00487  # cross sectional area m^2
-        p = air_density(alt(Ex, Ey, Ez))  # air density with respect to alt
-        # drag = (1/2)*p*v_sqrd*cd*a*(vy/(math.sqrt(v)))
-        v_sqrd = (Evx**2) + (Evy**2) + (Evz**2)
-        if Evx == 0:
-            Ex_drag = 0
-        else:
-            Ex_drag = (1 / 2) * p * v_sqrd * cd * a * (-Evx / (math.sqrt(v_sqrd)))
-        if Evy == 0:
-            Ey_drag = 0
-        else:
-            Ey_drag = (1 / 2) * p * v_sqrd * cd * a * (-Evy / (math.sqrt(Evx**2 + Evy**2)))
-        if Evz == 0:
-            Ez_drag = 0
-        else:
-            Ez_drag = (1 / 2) * p * v_sqrd * cd * a * (-Evz / (math.sqrt(Evx**2 + Evy**2)))
-        return Ex_drag, Ey_drag, Ez_drag
-
-    # Net Force
-    def net_force(Ex, Ey, Ez, Evx, Evy, Evz, m):
-        Fx_drag, Fy_drag, Fz_drag = drag_force(Ex, Ey, Ez, Evx, Evy, Evz)
-        Fx_grav, Fy_grav, Fz_grav = grav_force(Ex, Ey, Ez, m)
-        Fx = Fx_drag + Fx_grav
-        Fy = Fy_drag + Fy_grav
-        Fz = Fz_drag + Fz_grav
-        return Fx, Fy, Fz
+    return float(simulate(np.asarray(thrust_bias, dtype=float)[None, :])[0])
+
+
+# Covert ang to rads
+def _rad(ang: float) -> float:
+    return (ang / 360) * 2 * (3.1415926)
+
+
+# The functions below act on arrays, with one item per simulated rocket.
+# Positions and velocities are (3, n) arrays (x, y and z components in the inertial Earth frame).
+
+
+# air density (simple model based on nasa function online)
+def _air_density(alt: np.ndarray) -> np.ndarray:
+    low = alt <= 11000
+    high = alt > 25000
+    mid = ~(low | high)
+    T = np.where(low, 15.04 - (0.00649 * alt), np.where(high, -131.21 + (0.00299 * alt), -56.46))
+    p = np.zeros_like(alt)
+    p[low] = 101.29 * np.power((T[low] + 273.1) / 288.08, 5.256)
+    p[mid] = 22.65 * np.exp(1.73 - 0.000157 * alt[mid])
+    p[high] = 2.488 * ((T[high] + 273.1) / 216.6) ** -11.388
+    d = p / (0.2869 * (T + 273.1))
+    return d  # type: ignore
+
+
+def _grav_force(E: np.ndarray, m: tp.Any) -> np.ndarray:
+    # lat = rad(lat)
+    G = -6.67408 * (1 / (10**11))  # Gravitational Constant (m^3 kg^-1 s^-2)
+    M = 5.972 * (10**24)  # Earth Mass (kg)
+    # a = 6398137  # equatoral radius
+    # b = 6356752  # polar radius
+    # R = math.sqrt((math.pow(math.pow(a, 2) * math.cos(lat), 2) + (math.pow(math.pow(b, 2) * math.sin(lat), 2))) / (
+    #            math.pow(a * math.cos(lat), 2) + (math.pow(b * math.sin(lat), 2))))  # Radius of earth (m)
+    Ex, Ey, Ez = E
+    r = (Ex**2 + Ey**2 + Ez**2) ** 0.5
+    F = (G * M * m) / (r**2)  # Force of gravity (N)
+    F_z = F * Ez / r
+    F_x = F * (Ex / ((Ex**2 + Ey**2) ** 0.5))
+    F_y = F * (Ey / ((Ex**2 + Ey**2) ** 0.5))
+    return np.array([F_x, F_y, F_z])  # in the -r direction
+
+
+def _drag_force(E: np.ndarray, Ev: np.ndarray, transformer: tp.Any) -> np.ndarray:
+    cd = 0.94  # coefficent of drag
+    a = 0.00487  # cross sectional area m^2
+    # pyproj converts size-1 arrays to scalars (deprecated in numpy), so single rockets use floats
+    _, _, alt = transformer.transform(*(E[:, 0].tolist() if E.shape[1] == 1 else E), radians=True)
+    p = _air_density(np.asarray(alt))  # air density with respect to alt
+    # drag = (1/2)*p*v_sqrd*cd*a*(vy/(math.sqrt(v)))
+    Evx, Evy, Evz = Ev
+    v_sqrd = (Evx**2) + (Evy**2) + (Evz**2)
+    drag = (1 / 2) * p * v_sqrd * cd * a
+    # components with null velocity have no drag
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Ex_drag = np.where(Evx == 0, 0.0, drag * (-Evx / np.sqrt(v_sqrd)))
+        Ey_drag = np.where(Evy == 0, 0.0, drag * (-Evy / np.sqrt(Evx**2 + Evy**2)))
+        Ez_drag = np.where(Evz == 0, 0.0, drag * (-Evz / np.sqrt(Evx**2 + Evy**2)))
+    return np.array([Ex_drag, Ey_drag, Ez_drag])
+
+
+# Net Force
+def _net_force(E: np.ndarray, Ev: np.ndarray, m: tp.Any, transformer: tp.Any) -> np.ndarray:
+    return _drag_force(E, Ev, transformer) + _grav_force(E, m)  # type: ignore
+
+
+def simulate(thrust_bias: np.ndarray) -> np.ndarray:
+    """Simulates the flights of a batch of rockets with a fixed time step integrator,
+    and returns their losses (based on their maximum Ez)
+
+    Parameter
+    ---------
+    thrust_bias: np.ndarray
+        (n, 24) array of log-multipliers of the thrust curve, one row per rocket
+    """
+    assert thrust_bias.ndim == 2 and thrust_bias.shape[1] == 24, "Bad guide length."
+    num = thrust_bias.shape[0]
+    ecef = pyproj.Proj(proj="geocent", ellps="WGS84", datum="WGS84")
+    lla = pyproj.Proj(proj="latlong", ellps="WGS84", datum="WGS84")
+    to_lla = pyproj.Transformer.from_proj(ecef, lla)  # built once for the whole flight
 
     # def lift_force        lift -> pitching moment by reference length
 
@@ -138,8 +153,8 @@ def rocket(thrust_bias: np.ndarray):
 
     # This is not the same as in the original code (just minor modifications).
     altitude = float(0)
-    latitude = rad(float(28.5729))
-    longitude = rad(float(80.659))
+    latitude = _rad(float(28.5729))
+    longitude = _rad(float(80.659))
     # Altitude,Latitude,Longitude
     # 0,28.5729,80.659
 
@@ -147,12 +162,9 @@ def rocket(thrust_bias: np.ndarray):
     # latitude = rad(28.5729)  # N. Latitude
     # longitude = rad(80.6490)  # W. Longitude
     # altitude = 0    # Altitude of rocket in meters
-    ecef = pyproj.Proj(proj="geocent", ellps="WGS84", datum="WGS84")
-    lla = pyproj.Proj(proj="latlong", ellps="WGS84", datum="WGS84")
     transformer = pyproj.Transformer.from_proj(lla, ecef)
-    Ex, Ey, Ez = transformer.transform(longitude, latitude, altitude, radians=True)
-    Evx, Evy, Evz = 0, 0, 0
-    r_initial = (Ex**2 + Ey**2 + Ez**2) ** 0.5
+    E0 = transformer.transform(longitude, latitude, altitude, radians=True)
+    r_initial = (E0[0] ** 2 + E0[1] ** 2 + E0[2] ** 2) ** 0.5
     # print(Ex, Ey, Ez, r_initial, sep="\t")
 
     # Rocket specs
@@ -200,97 +212,76 @@ def rocket(thrust_bias: np.ndarray):
         ]
     )
 
-    thrust_list = np.asarray([thrust[int(i)][0] for i in range(len(thrust) - 1)])
-    thrust_time_list = np.asarray([thrust[i + 1][1] - thrust[i][1] for i in range(0, len(thrust) - 1)])
+    thrust_list = thrust[:-1, 0]
+    thrust_time_list = np.diff(thrust[:, 1])
     total_thrust = np.sum(np.multiply(thrust_list, thrust_time_list))
 
     # We moodify the thrust while preserving the sum (this is an adaptation to Nevergrad).
     # 1: we modify.
     thrust_list = np.multiply(thrust_list, np.exp(thrust_bias))
     # 2: we normalize.
-    thrust_list = thrust_list * total_thrust / np.sum(np.multiply(thrust_list, thrust_time_list))
+    thrust_list = (
+        thrust_list * total_thrust / np.sum(np.multiply(thrust_list, thrust_time_list), axis=1)[:, None]
+    )
 
-    for i in range(len(thrust) - 1):
-        thrust[i][0] = thrust_list[i]
     # total_mass vs time curve
     # this is used to represent the mass loss while the rocket burns fuel
-    mass_time = []
+    # (last row of the thrust curve has no thrust)
+    thrust_values = np.concatenate([thrust_list, np.zeros((num, 1))], axis=1)
+    mass_list = np.zeros((num, len(thrust)))
     # total_thrust = 0
     # for row in thrust:
     #    total_thrust += row[0]
 
-    mass_loss = eng_mass_initial - eng_mass_final
-    mass_reman = eng_mass_initial
-    for row in thrust:
+    mass_reman = eng_mass_initial * np.ones(num)
+    for i in range(len(thrust)):
         # Equation below weird to me: this is not normalized by time ? the mass which is lost should be proportional
         # to thrust x delta-time, right ?
         # percentage = row[0] / total_thrust   # percentage of total thrust to find percentage of mass lost
-        percentage = row[0] / np.sum(
-            thrust_list
+        percentage = thrust_values[:, i] / np.sum(
+            thrust_list, axis=1
         )  # percentage of total thrust to find percentage of mass lost
-        assert percentage >= 0.0
-        assert percentage <= 1.0
+        assert np.all(percentage >= 0.0)
+        assert np.all(percentage <= 1.0)
         mass_loss = mass_reman * percentage
-        mass_reman -= mass_loss
-        total_mass = roc_mass + mass_reman
-        mass_time.append([total_mass, row[1]])
-    mass_list = [mass_time[i][0] for i in range(0, len(thrust))]
-
-    # Lists used to store data and later import data to excel
-    Ex_list, Ey_list, Ez_list = np.asarray([Ex]), np.asarray([Ey]), np.asarray([Ez])
-    Evx_list, Evy_list, Evz_list = np.asarray([Evx]), np.asarray([Evy]), np.asarray([Evz])
-    time_list = np.asarray([0])
-    r_list = np.asarray([(Ex**2 + Ey**2 + Ez**2) ** 0.5])
-
-    # Initializing variables
-    time = 0.0  # time in seconds
+        mass_reman = mass_reman - mass_loss
+        mass_list[:, i] = roc_mass + mass_reman
+
+    # Position and velocity of each rocket. Instead of recording the whole trajectory,
+    # we only keep track of the running maximum of Ez.
+    E = np.array(E0)[:, None] * np.ones(num)
+    Ev = np.zeros((3, num))
+    max_Ez = E[2].copy()
+    r = (E[0] ** 2 + E[1] ** 2 + E[2] ** 2) ** 0.5
+    # thrust direction
+    direction = np.array([math.sin(theta) * math.cos(phi), math.sin(theta) * math.sin(phi), math.cos(theta)])
 
     # while thrust is greater than zero
     # this is while the rocket engine is firing
     for i in range(len(thrust) - 2):
-        r = (Ex**2 + Ey**2 + Ez**2) ** 0.5
+        r = (E[0] ** 2 + E[1] ** 2 + E[2] ** 2) ** 0.5
         dt = thrust[i][1]
-        Efx, Efy, Efz = net_force(Ex, Ey, Ez, Evx, Evy, Evz, mass_list[i])
-        Ex += Evx * dt
-        Ey += Evy * dt
-        Ez += Evz * dt
+        Ef = _net_force(E, Ev, mass_list[:, i], to_lla)
+        E = E + Ev * dt
         dt = thrust[i + 1][1] - thrust[i][1]
-        Evz += (((thrust[i][0] * math.cos(theta)) + Efz) * dt) / mass_list[i]
-        Evx += (((thrust[i][0] * math.sin(theta) * math.cos(phi)) + Efx) * dt) / mass_list[i]
-        Evy += (((thrust[i][0] * math.sin(theta) * math.sin(phi)) + Efy) * dt) / mass_list[i]
-        time += dt
-        Ex_list = np.append(Ex_list, (round(Ex, 6)))
-        Ey_list = np.append(Ey_list, (round(Ey, 6)))
-        Ez_list = np.append(Ez_list, (round(Ez, 6)))
-        Evx_list = np.append(Evx_list, (round(Evx, 6)))
-        Evy_list = np.append(Evy_list, (round(Evy, 6)))
-        Evz_list = np.append(Evz_list, (round(Evz, 6)))
-        time_list = np.append(time_list, (round(time, 6)))
-        r_list = np.append(r_list, (round(r, 6)))
+        Ev = Ev + (((thrust_values[:, i] * direction[:, None]) + Ef) * dt) / mass_list[:, i]
+        max_Ez = np.maximum(max_Ez, E[2])
 
     # After thrust
     # This is when the engine is out of fuel and there is no longer a thrust force
     time_step = 0.05  # time time_step in seconds
     dt = time_step
-    while r > r_initial:
-        r = (Ex**2 + Ey**2 + Ez**2) ** 0.5
-        Efx, Efy, Efz = net_force(Ex, Ey, Ez, Evx, Evy, Evz, final_roc_mass)
-        Ex += Evx * dt
-        Ey += Evy * dt
-        Ez += Evz * dt
-        Evx += (Efx * dt) / final_roc_mass
-        Evy += (Efy * dt) / final_roc_mass
-        Evz += (Efz * dt) / final_roc_mass
-        # print(Evx, Evy, Evz, r, sep='\t')
-        time += dt
-        # update(Ex, Ey, Ez, Evx, Evy, Evz, time, r)
-        Ex_list = np.append(Ex_list, (round(Ex, 6)))
-        Ey_list = np.append(Ey_list, (round(Ey, 6)))
-        Ez_list = np.append(Ez_list, (round(Ez, 6)))
-        Evx_list = np.append(Evx_list, (round(Evx, 6)))
-        Evy_list = np.append(Evy_list, (round(Evy, 6)))
-        Evz_list = np.append(Evz_list, (round(Evz, 6)))
-        time_list = np.append(time_list, (round(time, 6)))
-        r_list = np.append(r_list, (round(r, 6)))
-
-    return 1.0 - max(Ez_list) / 3032708.353202  # Should be 0 for input (0.,....,0.)
+    # rockets which have landed are removed from the simulation
+    active = np.flatnonzero(r > r_initial)
+    E, Ev = E[:, active], Ev[:, active]
+    while active.size:
+        r = (E[0] ** 2 + E[1] ** 2 + E[2] ** 2) ** 0.5
+        Ef = _net_force(E, Ev, final_roc_mass, to_lla)
+        E = E + Ev * dt
+        Ev = Ev + (Ef * dt) / final_roc_mass
+        max_Ez[active] = np.maximum(max_Ez[active], E[2])
+        flying = r > r_initial
+        if not np.all(flying):
+            active, E, Ev = active[flying], E[:, flying], Ev[:, flying]
+
+    return 1.0 - max_Ez / 3032708.353202  # type: ignore  # Should be 0 for input (0.,....,0.)
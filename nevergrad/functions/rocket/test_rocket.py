@@ -12,3 +12,10 @@ def test_rocket() -> None:
     x = 0 * np.random.rand(func.dimension)
     value = func(x)  # should not touch boundaries, so value should be < np.inf
     np.testing.assert_almost_equal(value, 0.0)
+
+
+def test_rocket_population() -> None:
+    func = rocket.Rocket(symmetry=3)
+    x = np.random.RandomState(12).normal(0, 1, size=(3, func.dimension))
+    expected = [func(y) for y in x]
+    np.testing.assert_almost_equal(func.compute_population(list(x)), expected)  # type: ignore
@@ -19,6 +19,13 @@ def testcorefuncs_function(name: str, func: tp.Callable[..., tp.Any]) -> None:
     np.testing.assert_equal(outputs[0], outputs[1], f"Function {name} is not deterministic")
 
 
+@testing.parametrized(**{name: (name,) for name in corefuncs.batch_registry})
+def test_batch_corefuncs(name: str) -> None:
+    x = np.random.RandomState(12).normal(0, 1, size=(5, 7))
+    expected = [corefuncs.registry[name](row) for row in x]
+    np.testing.assert_allclose(corefuncs.call_batch(name, x), expected, rtol=1e-10, atol=1e-12)
+
+
 @testing.parametrized(
     index1=(1,),
     index2=(2,),
@@ -141,6 +141,40 @@ def test_test_function(x: tp.Any, hashing: bool) -> None:
     assert outputs[1] != outputs[2]
 
 
+@testing.parametrized(
+    sphere=("sphere", {}),
+    rotation=("rastrigin", dict(rotation=True, num_blocks=2, useless_variables=3)),
+    mean=("rosenbrock", dict(aggregator="mean", num_blocks=3, translation_factor=2.0)),
+    no_batch_version=("bucherastrigin", dict(aggregator="sum", num_blocks=2, rotation=True)),
+    no_transform=("genzcornerpeak", dict(num_blocks=2)),
+)
+def test_evaluate_batch(name: str, config: tp.Dict[str, tp.Any]) -> None:
+    func = functionlib.ArtificialFunction(name, block_dimension=4, **config)
+    func.parametrization.random_state.seed(12)
+    x = np.random.RandomState(12).normal(0, 1, size=(6, func.dimension))
+    expected = [func(row) for row in x]
+    np.testing.assert_allclose(func.evaluate_batch(x), expected, rtol=1e-10)  # type: ignore
+
+
+def test_evaluate_batch_noise() -> None:
+    func = functionlib.ArtificialFunction(
+        "sphere", block_dimension=3, noise_level=1.0, noise_dissymmetry=True
+    )
+    func.parametrization.random_state.seed(12)
+    x = np.random.RandomState(12).normal(0, 1, size=(50, 3))
+    oracle = [func.function_from_transform(func._transform(row)) for row in x]
+    noisy = func.evaluate_batch(x)
+    first = func.transform_var.process_batch(x)[:, 0, 0]
+    np.testing.assert_allclose(noisy[first > 0], np.array(oracle)[first > 0])  # no noise on right side
+    assert np.all(noisy[first <= 0] != np.array(oracle)[first <= 0])
+
+
+def test_evaluate_batch_overflow() -> None:
+    func = functionlib.ArtificialFunction("stepellipsoid", block_dimension=2)
+    x = np.array([[1.0, 2.0], [1e200, 1e200], [3.0, 1.0]])
+    np.testing.assert_array_equal(func.evaluate_batch(x), [func(x[0]), float("inf"), func(x[2])])
+
+
 def test_oracle() -> None:
     func = functionlib.ArtificialFunction("sphere", 5, noise_level=0.1)
     x = np.array([1, 2, 1, 0, 0.5])
@@ -173,6 +207,18 @@ def test_function_transform() -> None:
     np.testing.assert_equal(len(output), 1)
 
 
+def test_function_initialize() -> None:
+    func = functionlib.ArtificialFunction("sphere", 2, num_blocks=3, rotation=True)
+    state = func.parametrization.random_state.get_state()
+    func.initialize()
+    func.initialize()  # no-op once initialized
+    assert len(func.transform_var._transforms) == 3
+    func2 = functionlib.ArtificialFunction("sphere", 2, num_blocks=3, rotation=True)
+    func2.parametrization.random_state.set_state(state)
+    x = np.arange(6.0)
+    assert func(x) == func2(x)  # same structure as with lazy initialization
+
+
 def test_artificial_function_summary() -> None:
     func = functionlib.ArtificialFunction("sphere", 5)
     testing.assert_set_equal(func.descriptors.keys(), DESCRIPTION_KEYS)
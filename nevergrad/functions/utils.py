@@ -35,3 +35,10 @@ class Transform:
         if self.rotation_matrix is not None:
             y = self.rotation_matrix.dot(y)  # type: ignore
         return y
+
+    def apply_batch(self, x: np.ndarray) -> np.ndarray:
+        """Applies the transform to each row of a (num_points, dimension) array"""
+        y: np.ndarray = x[:, self.indices] - self.translation
+        if self.rotation_matrix is not None:
+            y = y.dot(self.rotation_matrix.T)
+        return y
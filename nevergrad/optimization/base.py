@@ -4,10 +4,13 @@
 # LICENSE file in the root directory of this source tree.
 
 import pickle
+import asyncio
 import warnings
+import functools
 from pathlib import Path
 from numbers import Real
 from collections import deque
+from concurrent import futures
 import numpy as np
 import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter as p
@@ -29,6 +32,9 @@ IntOrParameter = tp.Union[int, p.Parameter]
 _PruningCallable = tp.Callable[[utils.Archive[utils.MultiValue]], utils.Archive[utils.MultiValue]]
 
 
+_MISSING = object()  # sentinel for rows which were not provided by ask_batch
+
+
 def _loss(param: p.Parameter) -> float:
     """Returns the loss if available, or inf otherwise.
     Used to simplify handling of losses
@@ -107,9 +113,8 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
             raise ValueError("No variable to optimize in this parametrization.")
         self.name = self.__class__.__name__  # printed name in repr
         # keep a record of evaluations, and current bests which are updated at each new evaluation
-        self.archive: utils.Archive[
-            utils.MultiValue
-        ] = utils.Archive()  # dict like structure taking np.ndarray as keys and Value as values
+        # dict like structure taking np.ndarray as keys and Value as values, mirrored as arrays
+        self.archive: utils.Archive[utils.MultiValue] = utils.ArrayArchive()
         self.current_bests = {
             x: utils.MultiValue(self.parametrization, np.inf, reference=self.parametrization)
             for x in ["optimistic", "pessimistic", "average", "minimum"]
@@ -126,6 +131,9 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
         self._asked: tp.Set[str] = set()
         self._num_objectives = 0
         self._suggestions: tp.Deque[p.Parameter] = deque()
+        # rows provided by ask_batch, with optional optimizer specific information (or the full candidate)
+        # a list is used since a same row can be asked several times
+        self._asked_batch: utils.Archive[tp.List[tp.Any]] = utils.Archive()
         self._num_ask = 0
         self._num_tell = 0  # increases after each successful tell
         self._num_tell_not_asked = 0
@@ -212,7 +220,8 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
         size:  int (optional)
             if provided, selects a subset of the full pareto front with the given maximum size
         subset: str
-            method for selecting the subset ("random, "loss-covering", "domain-covering", "hypervolume")
+            method for selecting the subset ("random, "loss-covering", "domain-covering", "hypervolume",
+            "crowding")
         subset_tentatives: int
             number of random tentatives for finding a better subset
 
@@ -394,8 +403,17 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
             )
         return self._hypervolume_pareto.add(candidate)
 
-    def _update_archive_and_bests(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
-        x = candidate.get_standardized_data(reference=self.parametrization)
+    def _update_archive_and_bests(
+        self, candidate: tp.Optional[p.Parameter], loss: tp.FloatLoss, data: tp.Optional[np.ndarray] = None
+    ) -> None:
+        """Updates the archive and current bests with a new evaluation.
+        If no candidate is provided (batch mode), the standardized data must be provided instead.
+        """
+        if candidate is not None:
+            x = candidate.get_standardized_data(reference=self.parametrization)
+        else:
+            assert data is not None, "Either candidate or data must be provided"
+            x = data
         if not isinstance(
             loss, (Real, float)
         ):  # using "float" along "Real" because mypy does not understand "Real" for now Issue #3186
@@ -406,19 +424,27 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
             self._warn(f"Updating fitness with {loss} value", errors.BadLossWarning)
         mvalue: tp.Optional[utils.MultiValue] = None
         if x not in self.archive:
-            self.archive[x] = utils.MultiValue(candidate, loss, reference=self.parametrization)
+            self.archive[x] = (
+                utils.MultiValue(candidate, loss, reference=self.parametrization)
+                if candidate is not None
+                else utils.MultiValue.from_data(x, loss, reference=self.parametrization)
+            )
         else:
             mvalue = self.archive[x]
             mvalue.add_evaluation(loss)
             # both parameters should be non-None
-            if mvalue.parameter.loss > candidate.loss:  # type: ignore
+            if candidate is not None and mvalue.parameter.loss > candidate.loss:  # type: ignore
                 mvalue.parameter = candidate  # keep best candidate
+            self.archive[x] = mvalue  # updates the array mirror if any
         # update current best records
         # this may have to be improved if we want to keep more kinds of best losss
 
         for name in self.current_bests:
             if mvalue is self.current_bests[name]:  # reboot
-                best = min(self.archive.values(), key=lambda mv, n=name: mv.get_estimation(n))  # type: ignore
+                if isinstance(self.archive, utils.ArrayArchive):
+                    best = self.archive.best(name)
+                else:
+                    best = min(self.archive.values(), key=lambda mv, n=name: mv.get_estimation(n))  # type: ignore
                 # rebuild best point may change, and which value did not track the updated value anyway
                 self.current_bests[name] = best
             else:
@@ -505,6 +531,142 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
         candidate.freeze()  # make sure it is not modified somewhere
         return candidate
 
+    def ask_batch(self, n: int) -> np.ndarray:
+        """Provides several points to explore at once, as a matrix of standardized data.
+        This avoids the overhead of creating one :code:`Parameter` per point, for optimizers
+        which can generate a whole batch at once (population-based and one-shot optimizers).
+
+        Parameters
+        ----------
+        n: int
+            number of points to provide
+
+        Returns
+        -------
+        np.ndarray
+            array of shape :code:`(n, dimension)` with the standardized data of each point.
+            Use :code:`optimizer.candidates_from_batch(data)` to convert them to :code:`Parameter`
+            instances if needed, and :code:`optimizer.tell_batch(data, losses)` to update the optimizer.
+
+        Note
+        ----
+        Suggestions, cheap constraints and "ask" callbacks are not supported by the vectorized path,
+        the standard :code:`ask` pipeline is used instead when any of them is present.
+        """
+        n = int(n)
+        if n < 0:
+            raise ValueError(f"Number of points to ask must be positive (got {n})")
+        data: tp.Optional[np.ndarray] = None
+        if not (self._suggestions or self._callbacks.get("ask") or self.parametrization._constraint_checkers):
+            current_num_ask = self.num_ask
+            data = self._internal_ask_batch(n)
+            if data is not None:
+                self._num_ask = current_num_ask + n
+        if data is None:  # go through the standard pipeline
+            candidates = [self.ask() for _ in range(n)]
+            data = np.array(
+                [c.get_standardized_data(reference=self.parametrization) for c in candidates], dtype=float
+            ).reshape(n, self.dimension)
+            for x, candidate in zip(data, candidates):
+                self._register_batch_row(x, candidate)
+        else:
+            data = np.array(data, copy=False, dtype=float)
+            if data.shape != (n, self.dimension):
+                raise RuntimeError(
+                    f"{self.__class__.__name__}._internal_ask_batch returned an array of shape {data.shape} "
+                    f"instead of {(n, self.dimension)}"
+                )
+            for x in data:
+                if x not in self._asked_batch:  # optimizers may have registered their own information
+                    self._register_batch_row(x)
+        return data
+
+    def tell_batch(self, data: tp.ArrayLike, losses: tp.ArrayLike) -> None:
+        """Provides the optimizer with the losses of several points at once.
+
+        Parameters
+        ----------
+        data: np.ndarray
+            array of shape :code:`(n, dimension)` of standardized data, typically provided by :code:`ask_batch`
+        losses: np.ndarray
+            array of shape :code:`(n,)` of losses (or :code:`(n, num_objectives)` for multiobjective optimization)
+
+        Note
+        ----
+        Rows which were not provided by :code:`ask_batch` are processed as "tell not asked".
+        Multiobjective losses, cheap constraints and "tell" callbacks require a :code:`Parameter`
+        for each point and therefore go through the standard :code:`tell` pipeline.
+        """
+        data = np.array(data, copy=False, dtype=float)
+        losses = np.array(losses, copy=False, dtype=float)
+        if data.ndim != 2 or data.shape[1] != self.dimension:
+            raise ValueError(f"Expected data of shape (n, {self.dimension}) but got {data.shape}")
+        if len(losses) != len(data):
+            raise ValueError(f"Got {len(losses)} losses for {len(data)} points")
+        infos = [self._pop_batch_row(x) for x in data]
+        vectorized = losses.ndim == 1 and self.num_objectives <= 1
+        vectorized &= not (self._callbacks.get("tell") or self.parametrization._constraint_checkers)
+        if not vectorized or any(isinstance(info, p.Parameter) for info in infos):
+            for x, loss, info in zip(data, losses, infos):
+                if info is _MISSING:
+                    candidate = self.parametrization.spawn_child().set_standardized_data(x)
+                else:
+                    candidate = self._candidate_from_batch(x, info)
+                    self._asked.add(candidate.uid)
+                self.tell(candidate, loss)
+            return
+        self.num_objectives = 1
+        clipped = np.where(losses < 5.0e20, losses, 5.0e20)  # also replaces NaNs
+        if not np.array_equal(clipped, losses):
+            self._warn(
+                "Clipping very high value in tell_batch (rescale the cost function?).",
+                errors.LossTooLargeWarning,
+            )
+        for x, loss in zip(data, clipped):
+            self._update_archive_and_bests(None, float(loss), data=x)
+        asked = np.array([info is not _MISSING for info in infos], dtype=bool)
+        if asked.any():
+            self._internal_tell_batch(data[asked], clipped[asked], [i for i in infos if i is not _MISSING])
+        for x, loss in zip(data[~asked], clipped[~asked]):
+            candidate = self.parametrization.spawn_child().set_standardized_data(x)
+            candidate.loss = float(loss)
+            candidate.freeze()
+            self._internal_tell_not_asked(candidate, float(loss))
+            self._num_tell_not_asked += 1
+        self._num_tell += len(data)
+
+    def candidates_from_batch(self, data: tp.ArrayLike) -> tp.List[p.Parameter]:
+        """Converts a matrix of standardized data (typically provided by :code:`ask_batch`)
+        into a list of :code:`Parameter` instances, for instance to access their values.
+        Points must still be told through :code:`tell_batch`.
+        """
+        candidates = []
+        for x in np.array(data, copy=False, dtype=float):
+            infos = self._asked_batch.get(x, None)
+            candidate = self._candidate_from_batch(x, infos[0] if infos else None)
+            candidate.freeze()
+            candidates.append(candidate)
+        return candidates
+
+    def _register_batch_row(self, x: np.ndarray, info: tp.Any = None) -> None:
+        """Records a row provided by ask_batch, along with optional information
+        which will be provided back at tell_batch time
+        """
+        self._asked_batch.bytesdict.setdefault(utils._tobytes(x), []).append(info)
+
+    def _pop_batch_row(self, x: np.ndarray) -> tp.Any:
+        """Removes a row provided by ask_batch, and returns its information
+        (or _MISSING if it was not asked)
+        """
+        key = utils._tobytes(x)
+        infos = self._asked_batch.bytesdict.get(key, None)
+        if not infos:
+            return _MISSING
+        info = infos.pop(0)
+        if not infos:
+            del self._asked_batch.bytesdict[key]
+        return info
+
     def provide_recommendation(self) -> p.Parameter:
         """Provides the best point to use as a minimum, given the budget that was used
 
@@ -563,6 +725,58 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
         """Override to provide a recommendation in standardized space"""
         return None
 
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        """Override to provide a (n, dimension) array of standardized data in one go
+        (return None if not supported, the standard ask pipeline will then be used).
+        Optimizer specific information about each row can be recorded through :code:`self._register_batch_row`
+        and will be provided back to :code:`_internal_tell_batch`. :code:`num_ask` is updated afterwards.
+        """
+        if type(self)._internal_ask_candidate is not Optimizer._internal_ask_candidate:
+            return None
+        return self._sequential_ask_batch(n)
+
+    def _sequential_ask_batch(self, n: int) -> np.ndarray:
+        """Builds a batch through successive calls to :code:`_internal_ask`"""
+        rows = []
+        for _ in range(n):
+            rows.append(
+                np.array(self._internal_ask(), copy=True, dtype=float)
+            )  # some optimizers reuse arrays
+            self._num_ask += 1  # some optimizers rely on num_ask
+        return np.array(rows, dtype=float).reshape(n, self.dimension)
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        """Called by :code:`tell_batch` on the rows which were provided by :code:`ask_batch`,
+        along with the information which was registered for them.
+        Defaults to telling each row independently.
+        """
+        if type(self)._internal_tell_candidate is Optimizer._internal_tell_candidate:
+            for x, loss in zip(data, losses):
+                self._internal_tell(x, float(loss))
+            return
+        for x, loss, info in zip(data, losses, infos):
+            candidate = self._candidate_from_batch(x, info)
+            candidate.loss = float(loss)
+            candidate.freeze()
+            self._keep_batch_candidate(x, candidate)
+            self._internal_tell_candidate(candidate, float(loss))
+
+    def _keep_batch_candidate(self, x: np.ndarray, candidate: p.Parameter) -> None:
+        """Registers a candidate built from a row at tell_batch time as the parameter of the
+        archived point if it is its best evaluation (tell_batch only archives the data)
+        """
+        mvalue = self.archive.get(x)
+        if mvalue is not None and (mvalue._parameter is None or _loss(mvalue.parameter) > _loss(candidate)):
+            mvalue.parameter = candidate
+
+    def _candidate_from_batch(self, data: np.ndarray, info: tp.Any) -> p.Parameter:
+        """Creates a candidate from a row provided by :code:`ask_batch`, along with the
+        optimizer specific information which was recorded for it (if any)
+        """
+        if isinstance(info, p.Parameter):
+            return info
+        return self.parametrization.spawn_child().set_standardized_data(data)
+
     def enable_pickling(self) -> None:
         """
         Some optimizers are only optionally picklable, because picklability
@@ -592,6 +806,10 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
             with methods :code:`done() -> bool` and :code:`result() -> float`. The executor role is to dispatch the execution of
             the jobs locally/on a cluster/with multithreading depending on the implementation.
             Eg: :code:`concurrent.futures.ProcessPoolExecutor`
+            If the objective function is a :code:`cache.CachedObjective`, cached evaluations are told
+            directly without using the executor.
+            If the executor returns actual :code:`concurrent.futures.Future` instances, the optimization waits
+            for the first job to complete, otherwise it polls the jobs and sleeps in between.
         batch_mode: bool
             when :code:`num_workers = n > 1`, whether jobs are executed by batch (:code:`n` function evaluations are launched,
             we wait for all results and relaunch n evals) or not (whenever an evaluation is finished, we launch
@@ -609,7 +827,9 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
         ----
         for evaluation purpose and with the current implementation, it is better to use batch_mode=True
         """
-        # pylint: disable=too-many-branches
+        # pylint: disable=too-many-branches,import-outside-toplevel
+        from . import cache  # imported lazily since it requires sqlite3
+
         if self.budget is None:
             raise ValueError("Budget must be specified")
         if executor is None:
@@ -639,6 +859,8 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
                 while self._finished_jobs:
                     x, job = self._finished_jobs[0]
                     result = job.result()
+                    if isinstance(objective_function, cache.CachedObjective):
+                        result = objective_function.process_result(x, result, reference=self.parametrization)
                     self.tell(x, result)
                     self._finished_jobs.popleft()  # remove it after the tell to make sure it was indeed "told" (in case of interruption)
                     if verbosity:
@@ -648,22 +870,35 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
                     if verbosity > 1:
                         print("Current pessimistic best is: {}".format(self.current_bests["pessimistic"]))
             elif not first_iteration:
-                sleeper.sleep()
+                jobs = [job for _, job in self._running_jobs]
+                if jobs and all(isinstance(job, futures.Future) for job in jobs):
+                    # actual futures: block until the first one completes instead of polling
+                    futures.wait(jobs, return_when=futures.FIRST_COMPLETED)  # type: ignore
+                else:  # duck-typed jobs: sleep-polling depending on the duration of the jobs
+                    sleeper.sleep()
             # # # # # Start new jobs # # # # #
             if not batch_mode or not self._running_jobs:
                 new_sugg = max(0, min(remaining_budget, self.num_workers - len(self._running_jobs)))
                 if verbosity and new_sugg:
                     print(f"Launching {new_sugg} jobs with new suggestions")
-                for _ in range(new_sugg):
+                launched = 0
+                while launched < new_sugg and self.num_ask < self.budget:
                     try:
                         args = self.ask()
                     except errors.NevergradEarlyStopping:
                         remaining_budget = 0
                         break
-                    self._running_jobs.append(
-                        (args, executor.submit(objective_function, *args.args, **args.kwargs))
-                    )
-                if new_sugg:
+                    if isinstance(objective_function, cache.CachedObjective):
+                        cached = objective_function.lookup(args, reference=self.parametrization)
+                        if cached is not None:  # cache hits do not use a worker
+                            self.tell(args, cached)
+                            continue
+                        job = objective_function.submit(executor, args, reference=self.parametrization)
+                    else:
+                        job = executor.submit(objective_function, *args.args, **args.kwargs)
+                    self._running_jobs.append((args, job))
+                    launched += 1
+                if launched:
                     sleeper.start_timer()
             if remaining_budget > 0:  # early stopping sets it to 0
                 remaining_budget = self.budget - self.num_ask
@@ -676,6 +911,87 @@ class Optimizer:  # pylint: disable=too-many-instance-attributes
             first_iteration = False
         return self.provide_recommendation() if self.num_objectives == 1 else p.Constant(None)
 
+    async def aminimize(
+        self,
+        objective_function: tp.Callable[..., tp.Any],
+        executor: tp.Optional[tp.Any] = None,
+        concurrency: tp.Optional[int] = None,
+        verbosity: int = 0,
+    ) -> p.Parameter:
+        """Asynchronous optimization (minimization) procedure, to be awaited within an asyncio event loop.
+        Evaluations are awaited with :code:`asyncio.wait(..., return_when=FIRST_COMPLETED)` so that each
+        result is told as soon as it is available, and a new candidate is asked as soon as a slot frees.
+
+        Parameters
+        ----------
+        objective_function: callable
+            A callable to optimize (minimize). It can either be a coroutine function (:code:`async def`),
+            or a standard function which is then run through :code:`loop.run_in_executor`.
+        executor: concurrent.futures.Executor
+            executor used for running a standard (non-coroutine) objective function. If None, the
+            default executor of the event loop is used. It is not used for coroutine functions.
+        concurrency: int
+            maximum number of evaluations running at once (defaults to :code:`num_workers`)
+        verbosity: int
+            print information about the optimization (0: None, 1: fitness values, 2: fitness values and recommendation)
+
+        Returns
+        -------
+        ng.p.Parameter
+            The candidate with minimal value.
+
+        Usage
+        -----
+        :code:`recommendation = asyncio.run(optimizer.aminimize(async_objective))`
+        """
+        if self.budget is None:
+            raise ValueError("Budget must be specified")
+        concurrency = self.num_workers if concurrency is None else concurrency
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1 (got {concurrency})")
+        loop = asyncio.get_running_loop()
+        is_coroutine = asyncio.iscoroutinefunction(objective_function) or asyncio.iscoroutinefunction(
+            getattr(objective_function, "__call__", None)  # for callable instances
+        )
+        pending: tp.Dict["asyncio.Future[tp.Any]", p.Parameter] = {}
+        remaining_budget = self.budget - self.num_ask
+        try:
+            while remaining_budget or pending:
+                # # # # # Start new jobs # # # # #
+                while remaining_budget and len(pending) < concurrency:
+                    try:
+                        candidate = self.ask()
+                    except errors.NevergradEarlyStopping:
+                        remaining_budget = 0
+                        break
+                    if is_coroutine:
+                        future = asyncio.ensure_future(
+                            objective_function(*candidate.args, **candidate.kwargs)
+                        )
+                    else:
+                        func = functools.partial(objective_function, *candidate.args, **candidate.kwargs)
+                        future = loop.run_in_executor(executor, func)
+                    pending[future] = candidate
+                    remaining_budget = self.budget - self.num_ask
+                if not pending:
+                    break
+                # # # # # Update optimizer with finished jobs # # # # #
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in [f for f in pending if f in done]:  # tell in order of submission
+                    candidate = pending.pop(future)
+                    result = future.result()
+                    self.tell(candidate, result)
+                    if verbosity:
+                        print(f"Updating fitness with value {result}")
+                if verbosity:
+                    print(f"{remaining_budget} remaining budget and {len(pending)} running jobs")
+                    if verbosity > 1:
+                        print("Current pessimistic best is: {}".format(self.current_bests["pessimistic"]))
+        finally:
+            for future in pending:  # in case of error or cancellation
+                future.cancel()
+        return self.provide_recommendation() if self.num_objectives == 1 else p.Constant(None)
+
     def _info(self) -> tp.Dict[str, tp.Any]:
         """Easy access to debug/benchmark info"""
         return {}
@@ -0,0 +1,198 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import time
+import sqlite3
+import threading
+import hashlib
+from pathlib import Path
+from collections import OrderedDict
+import numpy as np
+import nevergrad.common.typing as tp
+from nevergrad.parametrization import parameter as p
+
+
+class CacheEntry(tp.NamedTuple):
+    """Cached evaluation: loss (float, or array for multiobjective losses)
+    and wall time (in seconds) between the submission of the evaluation and its result
+    """
+
+    loss: tp.Loss
+    wall_time: float
+
+
+class CachedObjective:
+    """Wraps an objective function so that evaluations are cached, in memory (LRU) and
+    optionally on disk in a SQLite database, so that they persist through restarts.
+    Used as objective function of :code:`Optimizer.minimize`, cache hits are told to the
+    optimizer without submitting a job to the executor, and evaluations of a point which is
+    already being evaluated are not submitted twice.
+
+    Parameters
+    ----------
+    function: callable
+        the objective function to cache
+    path: optional str or Path
+        path to the SQLite database file for persistent storage (in memory only if None)
+    memory_size: int
+        maximum number of evaluations kept in the in-memory LRU tier
+    key: str
+        "value" to key the cache on the :code:`get_value_hash()` of the candidates, or
+        "data" to key it on their standardized data (requires the reference parametrization)
+    namespace: str
+        prefix of the keys, for sharing a database between several functions
+
+    Note
+    ----
+    - caching only makes sense for deterministic functions
+    - calling the instance directly calls the function without caching, use :code:`evaluate` for
+      cached evaluations of a candidate
+    """
+
+    def __init__(
+        self,
+        function: tp.Callable[..., tp.Loss],
+        path: tp.Optional[tp.PathLike] = None,
+        memory_size: int = 1024,
+        key: str = "value",
+        namespace: str = "",
+    ) -> None:
+        if key not in ("value", "data"):
+            raise ValueError(f'key must be either "value" or "data" but got {key!r}')
+        self.function = function
+        self.path = None if path is None else Path(path)
+        self.memory_size = memory_size
+        self.key = key
+        self.namespace = namespace
+        self.num_hits = 0
+        self.num_misses = 0
+        self._memory: tp.Dict[str, CacheEntry] = OrderedDict()
+        self._in_flight: tp.Dict[str, tp.Tuple[tp.JobLike[tp.Loss], float]] = {}
+        self._connection: tp.Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # the connection is shared between threads
+
+    def __call__(self, *args: tp.Any, **kwargs: tp.Any) -> tp.Loss:
+        return self.function(*args, **kwargs)
+
+    @property
+    def _db(self) -> tp.Optional[sqlite3.Connection]:
+        if self._connection is None and self.path is not None:
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations "
+                "(key TEXT PRIMARY KEY, loss REAL, losses BLOB, wall_time REAL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get_key(self, candidate: p.Parameter, reference: tp.Optional[p.Parameter] = None) -> str:
+        """Key of the candidate in the cache"""
+        if self.key == "value":
+            raw = repr(candidate.get_value_hash())
+        else:
+            if reference is None:
+                raise ValueError('A reference parametrization is required for key="data"')
+            raw = candidate.get_standardized_data(reference=reference).tobytes().hex()
+        return hashlib.sha1(f"{self.namespace}#{raw}".encode()).hexdigest()
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)  # type: ignore
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)  # type: ignore
+
+    def get(self, key: str) -> tp.Optional[CacheEntry]:
+        """Returns the cache entry for the key if it exists"""
+        with self._lock:
+            entry = self._memory.get(key, None)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT loss, losses, wall_time FROM evaluations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    loss: tp.Loss = row[0] if row[1] is None else np.frombuffer(row[1]).copy()
+                    entry = CacheEntry(loss, row[2])
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def store(self, key: str, loss: tp.Loss, wall_time: float = 0.0) -> None:
+        """Stores an evaluation in the cache"""
+        if not isinstance(loss, (float, int, np.number)):
+            loss = np.array(loss, dtype=float)
+            if loss.size == 1:
+                loss = float(loss.ravel()[0])
+        entry = CacheEntry(loss if isinstance(loss, np.ndarray) else float(loss), wall_time)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                losses = entry.loss.tobytes() if isinstance(entry.loss, np.ndarray) else None
+                scalar = None if losses is not None else entry.loss
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)", (key, scalar, losses, wall_time)
+                )
+                self._db.commit()
+
+    def lookup(
+        self, candidate: p.Parameter, reference: tp.Optional[p.Parameter] = None
+    ) -> tp.Optional[tp.Loss]:
+        """Returns the cached loss of the candidate if available, or None"""
+        entry = self.get(self.get_key(candidate, reference))
+        if entry is None:
+            return None
+        self.num_hits += 1
+        return entry.loss
+
+    def submit(
+        self, executor: tp.ExecutorLike, candidate: p.Parameter, reference: tp.Optional[p.Parameter] = None
+    ) -> tp.JobLike[tp.Loss]:
+        """Submits the evaluation of the candidate to the executor, or returns the job
+        of the ongoing evaluation of the same point if there is one.
+        The result must then be provided through process_result.
+        """
+        key = self.get_key(candidate, reference)
+        if key in self._in_flight:
+            self.num_hits += 1
+            return self._in_flight[key][0]
+        self.num_misses += 1
+        job = executor.submit(self.function, *candidate.args, **candidate.kwargs)
+        self._in_flight[key] = (job, time.time())
+        return job
+
+    def process_result(
+        self, candidate: p.Parameter, loss: tp.Loss, reference: tp.Optional[p.Parameter] = None
+    ) -> tp.Loss:
+        """Stores the result of a submitted evaluation, and returns the loss"""
+        key = self.get_key(candidate, reference)
+        _, start = self._in_flight.pop(key, (None, time.time()))
+        if key not in self._memory:  # duplicated in-flight jobs are processed twice
+            self.store(key, loss, time.time() - start)
+        return loss
+
+    def evaluate(self, candidate: p.Parameter, reference: tp.Optional[p.Parameter] = None) -> tp.Loss:
+        """Returns the cached loss of the candidate, or evaluates and stores it"""
+        loss = self.lookup(candidate, reference)
+        if loss is None:
+            self.num_misses += 1
+            start = time.time()
+            loss = self.function(*candidate.args, **candidate.kwargs)
+            self.store(self.get_key(candidate, reference), loss, time.time() - start)
+        return loss
+
+    def close(self) -> None:
+        """Closes the connection to the database"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        state = dict(self.__dict__)
+        state.update(_connection=None, _in_flight={})
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.__dict__.update(state, _lock=threading.Lock())
@@ -5,10 +5,12 @@
 
 import json
 import time
+import pickle
 import warnings
 import inspect
 import datetime
 import logging
+import zipfile
 from pathlib import Path
 import numpy as np
 import nevergrad.common.typing as tp
@@ -110,6 +112,11 @@ class ParametersLogger:
         whether to append the file (otherwise it replaces it)
     order: int
         order of the internal/model parameters to extract
+    flush_interval_tells: int
+        max number of records kept in memory before writing them to the file
+    flush_interval_seconds: float
+        max number of seconds before writing the records kept in memory to the file
+        (checked at each tell)
 
     Example
     -------
@@ -123,13 +130,32 @@ class ParametersLogger:
 
     Note
     ----
-    Arrays are converted to lists
+    - Arrays are converted to lists
+    - If the file has a ".npz" suffix, records are written in a columnar format: each flush appends
+      a chunk of one array per column to the (zip) file, so that :code:`iter_load` can read only
+      the required columns. Otherwise, records are written as json lines.
+    - Buffered records are written when calling :code:`flush` or :code:`load`, make sure to flush
+      the logger at the end of the optimization when using :code:`flush_interval_tells > 1`.
     """
 
-    def __init__(self, filepath: tp.Union[str, Path], append: bool = True, order: int = 1) -> None:
+    def __init__(
+        self,
+        filepath: tp.Union[str, Path],
+        append: bool = True,
+        order: int = 1,
+        flush_interval_tells: int = 1,
+        flush_interval_seconds: float = 60.0,
+    ) -> None:
+        assert flush_interval_tells > 0
+        assert flush_interval_seconds > 0
         self._session = datetime.datetime.now().strftime("%y-%m-%d %H:%M:%S")
         self._filepath = Path(filepath)
         self._order = order
+        self._columnar = self._filepath.suffix == ".npz"
+        self._flush_interval_tells = int(flush_interval_tells)
+        self._flush_interval_seconds = flush_interval_seconds
+        self._next_flush = time.time() + flush_interval_seconds
+        self._buffer: tp.List[tp.Any] = []  # json lines or records (for columnar format)
         if self._filepath.exists() and not append:
             self._filepath.unlink()  # missing_ok argument added in python 3.8
         self._filepath.parent.mkdir(exist_ok=True, parents=True)
@@ -171,20 +197,67 @@ class ParametersLogger:
                 data[(name if name else "0") + "#sigma"] = (
                     val.tolist() if isinstance(val, np.ndarray) else val
                 )
+        if self._columnar:
+            self._buffer.append(data)
+        else:
+            try:  # avoid bugging as much as possible
+                self._buffer.append(json.dumps(data) + "\n")
+            except Exception as e:  # pylint: disable=broad-except
+                warnings.warn(f"Failing to json data: {e}")
+        if len(self._buffer) >= self._flush_interval_tells or time.time() >= self._next_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the records kept in memory to the log file"""
+        self._next_flush = time.time() + self._flush_interval_seconds
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
         try:  # avoid bugging as much as possible
-            with self._filepath.open("a") as f:
-                f.write(json.dumps(data) + "\n")
+            if self._columnar:
+                _write_columnar_chunk(self._filepath, buffer)
+            else:
+                with self._filepath.open("a") as f:
+                    f.write("".join(buffer))
         except Exception as e:  # pylint: disable=broad-except
-            warnings.warn(f"Failing to json data: {e}")
+            warnings.warn(f"Failing to write data: {e}")
+
+    def __del__(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # pylint: disable=broad-except
+            pass  # the interpreter may be shutting down
+
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        self.flush()  # do not duplicate the buffer when pickling the optimizer
+        return self.__dict__
+
+    def iter_load(self, columns: tp.Optional[tp.Iterable[str]] = None) -> tp.Iterator[tp.Dict[str, tp.Any]]:
+        """Iterates on the records of the log file, without loading them all in memory
+
+        Parameters
+        ----------
+        columns: optional iterable of str
+            names of the fields to extract (all fields are extracted if not provided).
+            With the columnar format, only the required columns are read from the file.
+        """
+        self.flush()
+        if not self._filepath.exists():
+            return
+        selected = None if columns is None else set(columns)
+        if self._columnar:
+            yield from _iter_columnar(self._filepath, selected)
+            return
+        with self._filepath.open("r") as f:
+            for line in f:
+                record = json.loads(line)
+                if selected is not None:
+                    record = {x: y for x, y in record.items() if x in selected}
+                yield record
 
     def load(self) -> tp.List[tp.Dict[str, tp.Any]]:
         """Loads data from the log file"""
-        data: tp.List[tp.Dict[str, tp.Any]] = []
-        if self._filepath.exists():
-            with self._filepath.open("r") as f:
-                for line in f.readlines():
-                    data.append(json.loads(line))
-        return data
+        return list(self.iter_load())
 
     def load_flattened(self, max_list_elements: int = 24) -> tp.List[tp.Dict[str, tp.Any]]:
         """Loads data from the log file, and splits lists (arrays) into multiple arguments
@@ -195,9 +268,8 @@ class ParametersLogger:
             Maximum number of elements displayed from the array, each element is given a
             unique id of type list_name#i0_i1_...
         """
-        data = self.load()
         flat_data: tp.List[tp.Dict[str, tp.Any]] = []
-        for element in data:
+        for element in self.iter_load():
             list_keys = {key for key, val in element.items() if isinstance(val, list)}
             flat_data.append({key: val for key, val in element.items() if key not in list_keys})
             for key in list_keys:
@@ -258,6 +330,74 @@ class ParametersLogger:
         return exp
 
 
+def _numeric_column(values: tp.List[tp.Any]) -> tp.Optional[np.ndarray]:
+    """Returns the values as a numeric array (first axis being the records), or None if they
+    cannot be converted without loss (different types, ragged lists, non-numeric data...)
+    """
+    if len({type(val) for val in values}) != 1 or not isinstance(values[0], (bool, int, float, list)):
+        return None
+    try:
+        array = np.array(values)
+    except ValueError:  # ragged lists
+        return None
+    if array.dtype.kind not in "bif":
+        return None
+    if isinstance(values[0], list) and any(np.asarray(val).dtype != array.dtype for val in values):
+        return None  # eg: mixed ints and floats
+    return array
+
+
+def _write_columnar_chunk(filepath: Path, records: tp.List[tp.Dict[str, tp.Any]]) -> None:
+    """Appends a chunk of records to a zip file, with one .npy member per column.
+    Columns which cannot be stored as numeric arrays are stored as json strings
+    (empty string for missing values).
+    """
+    names = list(dict.fromkeys(name for record in records for name in record))
+    columns: tp.List[tp.Tuple[str, str]] = []
+    arrays: tp.List[np.ndarray] = []
+    for name in names:
+        array = None
+        if all(name in record for record in records):
+            array = _numeric_column([record[name] for record in records])
+        if array is None:
+            strings = [json.dumps(record[name]) if name in record else "" for record in records]
+            array = np.array(strings, dtype=str)
+        columns.append((name, "array" if array.dtype.kind in "bif" else "json"))
+        arrays.append(array)
+    with zipfile.ZipFile(filepath, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        chunk = sum(1 for name in zf.namelist() if name.endswith("/columns.json"))
+        for k, array in enumerate(arrays):
+            with zf.open(f"{chunk:08d}/{k}.npy", "w") as f:
+                np.lib.format.write_array(f, array, allow_pickle=False)
+        zf.writestr(f"{chunk:08d}/columns.json", json.dumps({"size": len(records), "columns": columns}))
+
+
+def _iter_columnar(filepath: Path, selected: tp.Optional[tp.Set[str]]) -> tp.Iterator[tp.Dict[str, tp.Any]]:
+    """Iterates on the records of a file written by _write_columnar_chunk, reading only
+    the selected columns (all if None), one chunk at a time
+    """
+    with zipfile.ZipFile(filepath, "r") as zf:
+        chunks = sorted(
+            name[: -len("columns.json")] for name in zf.namelist() if name.endswith("/columns.json")
+        )
+        for chunk in chunks:
+            info = json.loads(zf.read(chunk + "columns.json"))
+            columns: tp.List[tp.Tuple[str, bool, tp.List[tp.Any]]] = []
+            for k, (name, kind) in enumerate(info["columns"]):
+                if selected is None or name in selected:
+                    with zf.open(f"{chunk}{k}.npy") as f:
+                        array = np.lib.format.read_array(f, allow_pickle=False)
+                    columns.append((name, kind == "json", array.tolist()))
+            for ind in range(info["size"]):
+                record: tp.Dict[str, tp.Any] = {}
+                for name, is_json, values in columns:
+                    if not is_json:
+                        record[name] = values[ind]
+                    elif values[ind]:
+                        record[name] = json.loads(values[ind])
+                yield record
+
+
 class OptimizerDump:
     """Dumps the optimizer to a pickle file at every call.
 
@@ -274,6 +414,152 @@ class OptimizerDump:
         opt.dump(self._filepath)
 
 
+class OptimizerCheckpoint:
+    """Checkpoints the optimizer with a full snapshot (pickle) every few tells, and an append-only
+    journal of the asks and tells (standardized data, loss and heritage) in between. This is much
+    cheaper than dumping the optimizer at every tell, while :code:`OptimizerCheckpoint.load` can still recover the
+    optimizer by loading the last snapshot and replaying the tail of the journal.
+
+    Parameters
+    ----------
+    filepath: str or Path
+        path to the snapshot pickle file (the journal is written next to it, with an additional
+        ".journal" suffix)
+    snapshot_interval_tells: int
+        number of tells between two snapshots
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        checkpoint = OptimizerCheckpoint(filepath, snapshot_interval_tells=1000)
+        optimizer.register_callback("ask", checkpoint)
+        optimizer.register_callback("tell", checkpoint)
+        optimizer.minimize(func)
+        # after an interruption:
+        optimizer = OptimizerCheckpoint.load(filepath)
+
+    Note
+    ----
+    - the callback should be registered on both "ask" and "tell": asks are replayed so that
+      candidates are recovered with their full information. This requires the asks to be
+      reproducible, as for pickling recast optimizers (see :code:`enable_pickling`).
+      Candidates which cannot be recovered this way (asked before the snapshot, or not
+      reproduced) are rebuilt from their standardized data.
+    - candidates which were asked but not told before the interruption are lost.
+    - with multiobjective losses, snapshots are only taken on asks.
+    - callbacks are not called while replaying the journal.
+    """
+
+    def __init__(self, filepath: tp.Union[str, Path], snapshot_interval_tells: int = 100) -> None:
+        assert snapshot_interval_tells > 0
+        self._filepath = Path(filepath)
+        self._journal_path = self._filepath.with_name(self._filepath.name + ".journal")
+        self._snapshot_interval_tells = int(snapshot_interval_tells)
+        self._snapshot_num_tell: tp.Optional[int] = None
+        self._journal: tp.Optional[tp.BinaryIO] = None
+
+    def __call__(
+        self,
+        optimizer: base.Optimizer,
+        candidate: tp.Optional[p.Parameter] = None,
+        loss: tp.Optional[tp.FloatLoss] = None,
+    ) -> None:
+        due = (
+            self._snapshot_num_tell is None
+            or optimizer.num_tell - self._snapshot_num_tell >= self._snapshot_interval_tells
+        )
+        # multiobjective tells update the pareto front before calling the callbacks, the snapshot
+        # must then wait for the next ask, otherwise the tell would be replayed on top of it
+        if due and (candidate is None or optimizer.num_objectives == 1):
+            self._snapshot(optimizer)
+        if self._snapshot_num_tell is None:
+            return  # the tell will be included in the first snapshot
+        if candidate is None:
+            self._write(("ask",))
+        else:
+            data = candidate.get_standardized_data(reference=optimizer.parametrization)
+            losses = loss if optimizer.num_objectives == 1 else candidate.losses
+            self._write(("tell", candidate.uid, data, losses, candidate.heritage))
+
+    def _snapshot(self, optimizer: base.Optimizer) -> None:
+        self._snapshot_num_tell = optimizer.num_tell
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        tmp = self._filepath.with_name(self._filepath.name + ".tmp")
+        optimizer.dump(tmp)
+        tmp.replace(self._filepath)  # atomic, the journal of the previous snapshot is ignored from there
+        self._journal = self._journal_path.open("wb")
+        self._write(("snapshot", optimizer.num_ask, optimizer.num_tell))
+
+    def _write(self, event: tp.Tuple[tp.Any, ...]) -> None:
+        if self._journal is None:
+            self._journal = self._journal_path.open("ab")
+        pickle.dump(event, self._journal)
+        self._journal.flush()
+
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        state = dict(self.__dict__)
+        state["_journal"] = None  # file handles cannot be pickled
+        return state
+
+    def __del__(self) -> None:
+        if getattr(self, "_journal", None) is not None:
+            self._journal.close()  # type: ignore
+
+    @staticmethod
+    def load(filepath: tp.Union[str, Path]) -> base.Optimizer:
+        """Loads the last snapshot and replays the tail of the journal
+
+        Parameters
+        ----------
+        filepath: str or Path
+            path to the snapshot pickle file
+        """
+        filepath = Path(filepath)
+        optimizer = base.load(base.Optimizer, filepath)
+        events = list(_read_journal(filepath.with_name(filepath.name + ".journal")))
+        if not events or events[0] != ("snapshot", optimizer.num_ask, optimizer.num_tell):
+            return optimizer  # the journal belongs to a previous snapshot (interrupted during a snapshot)
+        callbacks, optimizer._callbacks = optimizer._callbacks, {}
+        pending: tp.List[tp.Tuple[p.Parameter, np.ndarray]] = []  # replayed asks which were not told yet
+        try:
+            for event in events[1:]:
+                if event[0] == "ask":
+                    candidate = optimizer.ask()
+                    pending.append(
+                        (candidate, candidate.get_standardized_data(reference=optimizer.parametrization))
+                    )
+                    continue
+                _, uid, data, loss, heritage = event
+                index = next((k for k, (_, d) in enumerate(pending) if np.allclose(d, data)), None)
+                if index is not None:
+                    candidate = pending.pop(index)[0]
+                else:
+                    candidate = optimizer.parametrization.spawn_child().set_standardized_data(data)
+                    if uid in optimizer._asked:  # asked before the snapshot
+                        candidate.uid = uid
+                        candidate.heritage.update(heritage)  # lineage is required by some optimizers
+                optimizer.tell(candidate, loss)
+        finally:
+            optimizer._callbacks = callbacks
+        return optimizer
+
+
+def _read_journal(filepath: Path) -> tp.Iterator[tp.Tuple[tp.Any, ...]]:
+    """Iterates on the events of a journal, ignoring a truncated last event"""
+    if not filepath.exists():
+        return
+    with filepath.open("rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                return
+
+
 class ProgressBar:
     """Progress bar to register as callback in an optimizer"""
 
@@ -69,6 +69,47 @@ class Crossover:
         assert bounds[1] < donor.size + 1
         donor[bounds[0] : bounds[1]] = individual[bounds2[0] : bounds2[1]]
 
+    def apply_batch(self, donors: np.ndarray, individuals: np.ndarray) -> None:
+        """Vectorized version of apply, crossing over each row of donors with
+        the corresponding row of individuals (in place)
+        Random draws differ from successive calls to apply.
+        """
+        num, dim = donors.shape
+        rng = self.random_state
+        cols = np.arange(dim)[None, :]
+        rows = np.arange(num)
+        if self.crossover in ("twopoints", "rotated_twopoints") and dim >= 4:
+            # draw 2 different bounds in [0, dim]
+            low = rng.randint(dim + 1, size=num)
+            high = rng.randint(dim, size=num)
+            high += high >= low
+            low, high = np.minimum(low, high), np.maximum(low, high)
+            full = (low == 0) & (high == dim)  # make sure there is at least one point crossover
+            replaced = rng.randint(1, dim, size=num)
+            replace_low = rng.randint(2, size=num).astype(bool)
+            low = np.where(full & replace_low, replaced, low)
+            high = np.where(full & ~replace_low, replaced, high)
+            low, high = np.minimum(low, high), np.maximum(low, high)
+            inside = (cols >= low[:, None]) & (cols < high[:, None])
+            if self.crossover == "twopoints":
+                transfer = np.where(rng.randint(2, size=num).astype(bool)[:, None], inside, ~inside)
+                donors[transfer] = individuals[transfer]
+            else:
+                start = (rng.uniform(size=num) * (dim + 1 - high + low)).astype(int)
+                source = np.clip(cols - low[:, None] + start[:, None], 0, dim - 1)
+                donors[inside] = individuals[rows[:, None], source][inside]
+        elif self.crossover == "onepoint" and dim >= 3:
+            point = rng.randint(1, dim, size=num)[:, None]
+            transfer = np.where(rng.randint(2, size=num).astype(bool)[:, None], cols >= point, cols < point)
+            donors[transfer] = individuals[transfer]
+        else:
+            CR: tp.Union[float, np.ndarray] = self.CR
+            if self.crossover == "random":
+                CR = rng.uniform(0.0, 1.0, size=(num, 1))
+            transfer = rng.uniform(0, 1, size=(num, dim)) > CR
+            transfer[rows, rng.randint(dim, size=num)] = False
+            donors[transfer] = individuals[transfer]
+
 
 class _DE(base.Optimizer):
     """Differential evolution.
@@ -111,14 +152,17 @@ class _DE(base.Optimizer):
         self._penalize_cheap_violations = True
         self._uid_queue = base.utils.UidQueue()
         self.population: tp.Dict[str, p.Parameter] = {}
+        # cache of the population uids, standardized data and losses for the batched ask/tell
+        self._pop_matrix: tp.Optional[tp.Tuple[tp.List[str], np.ndarray, np.ndarray]] = None
         self.sampler: tp.Optional[base.Optimizer] = None
+        self._surrogate = metamodel.QuadraticSurrogate(self.dimension)  # for high_speed recommendations
         self._no_hypervolume = self._config.multiobjective_adaptation
 
     def recommend(self) -> p.Parameter:  # This is NOT the naive version. We deal with noise.
         sample_size = int((self.dimension * (self.dimension - 1)) / 2 + 2 * self.dimension + 1)
         if self._config.high_speed and len(self.archive) >= sample_size:
             try:
-                meta_data = metamodel.learn_on_k_best(self.archive, sample_size)
+                meta_data = metamodel.learn_on_k_best(self.archive, sample_size, surrogate=self._surrogate)
                 return self.parametrization.spawn_child().set_standardized_data(meta_data)
             except metamodel.MetaModelFailure:  # The optimum is at infinity. Shit happens.
                 pass  # MetaModel failures are something which happens, no worries.
@@ -156,6 +200,7 @@ class _DE(base.Optimizer):
                 candidate = self.parametrization.spawn_child().set_standardized_data(new_guy)
             candidate.heritage["lineage"] = candidate.uid  # new lineage
             self.population[candidate.uid] = candidate
+            self._pop_matrix = None
             self._uid_queue.asked.add(candidate.uid)
             return candidate
         # init is done
@@ -167,6 +212,11 @@ class _DE(base.Optimizer):
         # define all the different parents
         uids = list(self.population)
         a, b = (self.population[uids[self._rng.randint(self.llambda)]] for _ in range(2))
+        base_data = data
+        if self._config.mutation == "rand-1":
+            base_data = self.population[uids[self._rng.randint(self.llambda)]].get_standardized_data(
+                reference=self.parametrization
+            )
         best = self.current_bests["pessimistic"].parameter
         # redefine the different parents in case of multiobjective optimization
         if self._config.multiobjective_adaptation and self.num_objectives > 1:
@@ -180,7 +230,7 @@ class _DE(base.Optimizer):
         data_a, data_b, data_best = (
             indiv.get_standardized_data(reference=self.parametrization) for indiv in (a, b, best)
         )
-        donor = data + self._config.F1 * (data_a - data_b) + self._config.F2 * (data_best - data)
+        donor = self._mutate(base_data, data_a, data_b, data_best)
         candidate.parents_uids.extend([i.uid for i in (a, b)])
         # apply crossover
         co = self._config.crossover
@@ -192,6 +242,96 @@ class _DE(base.Optimizer):
             candidate.set_standardized_data(donor, reference=self.parametrization)
         return candidate
 
+    def _mutate(
+        self, data: np.ndarray, data_a: np.ndarray, data_b: np.ndarray, data_best: np.ndarray
+    ) -> np.ndarray:
+        """Computes the donor from the base point (current point, or a third random point for "rand-1"),
+        two random points and the best point (works row-wise on matrices as well)
+        """
+        mutation = self._config.mutation
+        if mutation == "best-1":
+            return data_best + self._config.F1 * (data_a - data_b)
+        if mutation == "rand-1":
+            return data + self._config.F1 * (data_a - data_b)
+        return data + self._config.F1 * (data_a - data_b) + self._config.F2 * (data_best - data)
+
+    def _population_matrix(self) -> tp.Tuple[tp.List[str], np.ndarray, np.ndarray]:
+        """Returns the uids of the population, along with their standardized data as a
+        (population size, dimension) matrix and their losses, cached between batches
+        """
+        if self._pop_matrix is None:
+            uids = list(self.population)
+            data = np.array(
+                [self.population[uid].get_standardized_data(reference=self.parametrization) for uid in uids],
+                dtype=float,
+            ).reshape(len(uids), self.dimension)
+            losses = np.array([base._loss(self.population[uid]) for uid in uids], dtype=float)
+            self._pop_matrix = (uids, data, losses)
+        return self._pop_matrix
+
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        co = self._config.crossover
+        if len(self.population) < self.llambda or co == "parametrization" or self.num_objectives > 1:
+            return None  # initialization and specific settings go through the standard pipeline
+        # the whole generation is computed at once on the population matrix
+        lineages = [self._uid_queue.ask() for _ in range(n)]
+        uids, pop_data, _ = self._population_matrix()
+        indices = {uid: k for k, uid in enumerate(uids)}
+        data = pop_data[[indices[lineage] for lineage in lineages]]
+        data_a, data_b = (pop_data[self._rng.randint(len(uids), size=n)] for _ in range(2))
+        base_data = (
+            pop_data[self._rng.randint(len(uids), size=n)] if self._config.mutation == "rand-1" else data
+        )
+        donors = self._mutate(base_data, data_a, data_b, self.current_bests["pessimistic"].x)
+        crossover = Crossover(self._rng, 1.0 / self.dimension if co == "dimension" else co)
+        crossover.apply_batch(donors, data)
+        for donor, lineage in zip(donors, lineages):
+            self._register_batch_row(donor, lineage)
+        return donors
+
+    def _candidate_from_batch(self, data: np.ndarray, info: tp.Any) -> p.Parameter:
+        if not isinstance(info, str) or info not in self.population:
+            return super()._candidate_from_batch(data, info)
+        candidate = self.population[info].spawn_child()
+        candidate.heritage["lineage"] = info
+        return candidate.set_standardized_data(data, reference=self.parametrization)
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        uids, pop_data, pop_losses = self._population_matrix()
+        indices = {uid: k for k, uid in enumerate(uids)}
+        rows = np.array([indices.get(uid, -1) if isinstance(uid, str) else -1 for uid in infos], dtype=int)
+        for uid in np.array(uids, dtype=object)[rows[rows >= 0]]:
+            self._uid_queue.tell(uid)
+        # selection: worst children first so that the best child of each lineage is written last
+        order = np.argsort(-losses, kind="stable")
+        order = order[rows[order] >= 0]
+        better = losses[order] <= pop_losses[rows[order]]
+        worse, order = order[~better], order[better]
+        pop_data[rows[order]] = data[order]
+        pop_losses[rows[order]] = losses[order]
+        # only build a parameter for the children which enter the population
+        written: tp.Set[int] = set()
+        for k in order[::-1].tolist():
+            if rows[k] not in written:
+                written.add(rows[k])
+                self.population[uids[rows[k]]] = self._batch_child(data[k], losses[k], infos[k])
+        if self._config.propagate_heritage:  # children which did not make it pass on their heritage
+            for k in worse.tolist():
+                child = self._batch_child(data[k], losses[k], infos[k])
+                self.population[uids[rows[k]]].heritage.update(child.heritage)
+        for k in np.flatnonzero(rows < 0).tolist():  # parent was removed
+            self._internal_tell_candidate(self._batch_child(data[k], losses[k], infos[k]), float(losses[k]))
+
+    def _batch_child(self, x: np.ndarray, loss: float, info: tp.Any) -> p.Parameter:
+        """Builds the evaluated candidate of a row provided by ask_batch, and keeps it
+        as the archived parameter of its point, as the standard tell pipeline does
+        """
+        candidate = self._candidate_from_batch(x, info)
+        candidate.loss = float(loss)
+        candidate.freeze()
+        self._keep_batch_candidate(x, candidate)
+        return candidate
+
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         uid = candidate.heritage["lineage"]
         if uid not in self.population:  # parent was removed, revert to tell_not_asked
@@ -203,12 +343,14 @@ class _DE(base.Optimizer):
         mo_adapt &= candidate._losses is not None  # can happen with bad constraints
         if not mo_adapt and loss <= base._loss(parent):
             self.population[uid] = candidate
+            self._pop_matrix = None
         elif mo_adapt and (
             parent._losses is None or np.mean(candidate.losses < parent.losses) > self._rng.rand()
         ):
             # multiobjective case, with adaptation,
             # randomly replaces the parent depending on the number of better losses
             self.population[uid] = candidate
+            self._pop_matrix = None
         elif self._config.propagate_heritage and loss <= float("inf"):
             self.population[uid].heritage.update(candidate.heritage)
 
@@ -230,8 +372,10 @@ class _DE(base.Optimizer):
         if discardable is not None:  # if we found a point to kick, kick it
             del self.population[discardable]
             self._uid_queue.discard(discardable)
+            self._pop_matrix = None
         if len(self.population) < self.llambda:  # if there is space, add the new point
             self.population[candidate.uid] = candidate
+            self._pop_matrix = None
             # this candidate lineage is not candidate.uid, but to avoid interfering with other optimizers (eg: PSO)
             # we should not update the lineage (and lineage of children must therefore be enforced manually)
             self._uid_queue.tell(candidate.uid)
@@ -274,6 +418,10 @@ class DifferentialEvolution(base.ConfiguredOptimizer):
         differential weight #1
     F2: float
         differential weight #2
+    mutation: "curr-to-best", "rand-1" or "best-1"
+        strategy for building the donors: current point + F1 * (a - b) + F2 * (best - current),
+        random point + F1 * (a - b), or best + F1 * (a - b), where a and b are random points of
+        the population (F2 is only used by "curr-to-best").
     popsize: int, "standard", "dimension", "large"
         size of the population to use. "standard" is max(num_workers, 30), "dimension" max(num_workers, 30, dimension +1)
         and "large" max(num_workers, 30, 7 * dimension).
@@ -282,6 +430,12 @@ class DifferentialEvolution(base.ConfiguredOptimizer):
         activated by default because the non-multiobjective implementation is performing very badly.
     high_speed: bool
         Trying to make the optimization faster by a metamodel for the recommendation step.
+
+    Note
+    ----
+    With :code:`ask_batch`/:code:`tell_batch`, a whole generation is computed at once on the population matrix
+    (mutation, crossover and selection), which is much faster for large populations and cheap objective functions.
+    Random draws differ from the sequential :code:`ask`/:code:`tell` interface.
     """
 
     def __init__(
@@ -293,6 +447,7 @@ class DifferentialEvolution(base.ConfiguredOptimizer):
         crossover: tp.Union[str, float] = 0.5,
         F1: float = 0.8,
         F2: float = 0.8,
+        mutation: str = "curr-to-best",
         popsize: tp.Union[str, int] = "standard",
         propagate_heritage: bool = False,  # experimental
         multiobjective_adaptation: bool = True,
@@ -301,6 +456,7 @@ class DifferentialEvolution(base.ConfiguredOptimizer):
         super().__init__(_DE, locals(), as_config=True)
         assert recommendation in ["optimistic", "pessimistic", "noisy", "mean"]
         assert initialization in ["gaussian", "LHS", "QR", "parametrization"]
+        assert mutation in ["curr-to-best", "rand-1", "best-1"]
         assert isinstance(scale, float) or scale == "mini"
         if not isinstance(popsize, int):
             assert popsize in ["large", "dimension", "standard"]
@@ -319,6 +475,7 @@ class DifferentialEvolution(base.ConfiguredOptimizer):
         self.propagate_heritage = propagate_heritage
         self.F1 = F1
         self.F2 = F2
+        self.mutation = mutation
         self.crossover = crossover
         self.popsize = popsize
         self.multiobjective_adaptation = multiobjective_adaptation
@@ -0,0 +1,281 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import math
+import numpy as np
+import nevergrad.common.typing as tp
+
+# pylint: disable=import-outside-toplevel
+
+
+_SQRT5 = math.sqrt(5)
+
+
+class GaussianProcess:
+    """Gaussian process regression with an isotropic Matérn 5/2 kernel and normalized targets,
+    designed for an incremental use in Bayesian optimization.
+
+    Parameters
+    ----------
+    dimension: int
+        dimension of the points
+    alpha: float
+        value added to the diagonal of the kernel matrix (noise level of the normalized targets)
+    refit_ratio: float
+        the length scale of the kernel is fitted by maximizing the marginal likelihood (O(n^3)) each time
+        the number of points is multiplied by this ratio. In-between, the Cholesky factor of the kernel
+        matrix is extended in O(n^2) for each new point.
+    """
+
+    def __init__(self, dimension: int, alpha: float = 1e-6, refit_ratio: float = 1.25) -> None:
+        assert refit_ratio > 1
+        self.dimension = dimension
+        self.alpha = alpha
+        self.refit_ratio = refit_ratio
+        self.length_scale = 1.0
+        self._x = np.zeros((0, dimension))
+        self._y = np.zeros(0)
+        self._chol = np.zeros((0, 0))  # lower Cholesky factor of the kernel matrix
+        self._num_fitted = 0  # number of points at the last fit of the length scale
+        self._weights: tp.Optional[np.ndarray] = None  # K^-1 (y - mean) / std, computed lazily
+
+    def __len__(self) -> int:
+        return self._y.size
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y
+
+    def _normalization(self) -> tp.Tuple[float, float]:
+        if not self._y.size:
+            return 0.0, 1.0
+        std = float(np.std(self._y))
+        return float(np.mean(self._y)), std if std > 0 else 1.0
+
+    def kernel(self, x1: np.ndarray, x2: np.ndarray, length_scale: tp.Optional[float] = None) -> np.ndarray:
+        """(n1, n2) Matérn 5/2 kernel matrix between two sets of points"""
+        length_scale = self.length_scale if length_scale is None else length_scale
+        sqdist = np.sum(x1**2, axis=1)[:, None] + np.sum(x2**2, axis=1)[None, :] - 2 * x1 @ x2.T
+        s5r = _SQRT5 * np.sqrt(np.maximum(sqdist, 0)) / length_scale
+        return (1 + s5r + s5r**2 / 3) * np.exp(-s5r)  # type: ignore
+
+    def add(self, x: tp.ArrayLike, y: float) -> None:
+        """Adds an observation, extending the Cholesky factor, or refitting
+        the length scale if it is scheduled
+        """
+        x = np.array(x, dtype=float).reshape(1, self.dimension)
+        self._x = np.concatenate([self._x, x], axis=0)
+        self._y = np.append(self._y, float(y))
+        self._weights = None
+        if len(self) >= max(3, self.refit_ratio * self._num_fitted):
+            self.fit()
+        else:
+            self._chol = self._extended_cholesky(self._chol, self._x[:-1], x)
+
+    def _extended_cholesky(self, chol: np.ndarray, x_old: np.ndarray, x_new: np.ndarray) -> np.ndarray:
+        from scipy.linalg import solve_triangular
+
+        n, m = chol.shape[0], x_new.shape[0]
+        cross = self.kernel(x_old, x_new)
+        lower = solve_triangular(chol, cross, lower=True) if n else cross
+        schur = self.kernel(x_new, x_new) + self.alpha * np.eye(m) - lower.T @ lower
+        new = np.zeros((n + m, n + m))
+        new[:n, :n] = chol
+        new[n:, :n] = lower.T
+        new[n:, n:] = np.linalg.cholesky(schur + 1e-10 * np.eye(m))
+        return new
+
+    def _factorize(self, length_scale: float) -> np.ndarray:
+        matrix = self.kernel(self._x, self._x, length_scale) + (self.alpha + 1e-10) * np.eye(len(self))
+        return np.linalg.cholesky(matrix)  # type: ignore
+
+    def log_marginal_likelihood(self, length_scale: float) -> float:
+        """Log marginal likelihood of the normalized targets for a given length scale"""
+        from scipy.linalg import cho_solve
+
+        try:
+            chol = self._factorize(length_scale)
+        except np.linalg.LinAlgError:
+            return -float("inf")
+        mean, std = self._normalization()
+        y = (self._y - mean) / std
+        return float(
+            -0.5 * y @ cho_solve((chol, True), y)
+            - np.sum(np.log(np.diag(chol)))
+            - 0.5 * len(self) * np.log(2 * np.pi)
+        )
+
+    def fit(self) -> None:
+        """Fits the length scale by maximizing the marginal likelihood, and refactorizes the kernel matrix"""
+        from scipy.optimize import minimize_scalar
+
+        result = minimize_scalar(
+            lambda log_scale: -self.log_marginal_likelihood(float(np.exp(log_scale))),
+            bounds=(np.log(1e-3), np.log(1e2)),
+            method="bounded",
+            options={"xatol": 1e-2},
+        )
+        if np.isfinite(result.fun):
+            self.length_scale = float(np.exp(result.x))
+        self._chol = self._factorize(self.length_scale)
+        self._num_fitted = len(self)
+        self._weights = None
+
+    def condition(self, x: tp.ArrayLike, y: tp.ArrayLike) -> "GaussianProcess":
+        """Returns a new process with additional observations and the same length scale,
+        without refitting (used for fantasizing the values of pending points)
+        """
+        x = np.array(x, dtype=float).reshape(-1, self.dimension)
+        new = GaussianProcess(self.dimension, alpha=self.alpha, refit_ratio=self.refit_ratio)
+        new.length_scale = self.length_scale
+        new._num_fitted = self._num_fitted
+        new._x = np.concatenate([self._x, x], axis=0)
+        new._y = np.concatenate([self._y, np.array(y, dtype=float).ravel()])
+        new._chol = self._extended_cholesky(self._chol, self._x, x)
+        return new
+
+    def predict(
+        self, x: tp.ArrayLike, return_grad: bool = False
+    ) -> tp.Tuple[np.ndarray, np.ndarray, tp.Optional[np.ndarray], tp.Optional[np.ndarray]]:
+        """Posterior mean and standard deviation at a set of points
+
+        Parameters
+        ----------
+        x: array-like
+            (m, dimension) array of points
+        return_grad: bool
+            whether to also compute the (m, dimension) gradients of the mean and standard deviation
+
+        Returns
+        -------
+        tuple
+            mean, standard deviation, gradient of the mean and gradient of the standard deviation
+            (gradients are None if not requested)
+        """
+        from scipy.linalg import solve_triangular, cho_solve
+
+        x = np.array(x, dtype=float).reshape(-1, self.dimension)
+        mean, std = self._normalization()
+        if not len(self):
+            ones = np.ones(x.shape[0])
+            grads = (np.zeros(x.shape), np.zeros(x.shape)) if return_grad else (None, None)
+            return mean * ones, std * ones, grads[0], grads[1]
+        if self._weights is None:
+            self._weights = cho_solve((self._chol, True), (self._y - mean) / std)
+        cross = self.kernel(x, self._x)  # (m, n)
+        pred = mean + std * cross @ self._weights
+        v = solve_triangular(self._chol, cross.T, lower=True)  # (n, m)
+        var = np.maximum(1.0 - np.sum(v**2, axis=0), 1e-12)
+        sigma = std * np.sqrt(var)
+        if not return_grad:
+            return pred, sigma, None, None
+        diff = x[:, None, :] - self._x[None, :, :]  # (m, n, d)
+        s5r = _SQRT5 * np.sqrt(np.sum(diff**2, axis=2)) / self.length_scale
+        dcross = (-5.0 / (3 * self.length_scale**2) * (1 + s5r) * np.exp(-s5r))[:, :, None] * diff
+        dpred = std * np.einsum("mnd,n->md", dcross, self._weights)
+        w = solve_triangular(self._chol.T, v, lower=False)  # K^-1 k, (n, m)
+        dvar = -2 * np.einsum("mnd,nm->md", dcross, w)
+        dsigma = std * dvar / (2 * np.sqrt(var))[:, None]
+        return pred, sigma, dpred, dsigma
+
+
+def acquisition(
+    gp: GaussianProcess,
+    x: np.ndarray,
+    kind: str = "ucb",
+    kappa: float = 2.576,
+    xi: float = 0.0,
+    return_grad: bool = False,
+) -> tp.Tuple[np.ndarray, tp.Optional[np.ndarray]]:
+    """Acquisition function to minimize (targets are losses), along with its gradient if requested
+
+    Parameters
+    ----------
+    gp: GaussianProcess
+        the Gaussian process modeling the loss
+    x: np.ndarray
+        (m, dimension) array of points
+    kind: str
+        "ucb" (lower confidence bound mean - kappa * std), "ei" (negative expected improvement)
+        or "poi" (negative probability of improvement)
+    kappa: float
+        exploration parameter of "ucb"
+    xi: float
+        minimal improvement for "ei" and "poi"
+    """
+    from scipy.special import ndtr
+
+    mean, sigma, dmean, dsigma = gp.predict(x, return_grad=return_grad)
+    if kind == "ucb":
+        value = mean - kappa * sigma
+        grad = None if dmean is None or dsigma is None else dmean - kappa * dsigma
+        return value, grad
+    if kind not in ("ei", "poi"):
+        raise ValueError(f'Unknown acquisition "{kind}"')
+    improvement = np.min(gp.y) - mean - xi
+    z = improvement / sigma
+    cdf = ndtr(z)
+    pdf = np.exp(-0.5 * z**2) / np.sqrt(2 * np.pi)
+    if kind == "ei":
+        value = -(improvement * cdf + sigma * pdf)
+        grad = None if dmean is None or dsigma is None else cdf[:, None] * dmean - pdf[:, None] * dsigma
+        return value, grad
+    value = -cdf
+    grad = None
+    if dmean is not None and dsigma is not None:
+        dz = -(dmean + z[:, None] * dsigma) / sigma[:, None]
+        grad = -pdf[:, None] * dz
+    return value, grad
+
+
+def minimize_acquisition(
+    func: tp.Callable[[np.ndarray, bool], tp.Tuple[np.ndarray, tp.Optional[np.ndarray]]],
+    dimension: int,
+    rng: np.random.RandomState,
+    num_samples: int = 512,
+    num_starts: int = 8,
+    maxiter: int = 100,
+) -> np.ndarray:
+    """Minimizes a vectorized function on [0, 1]^dimension through random sampling, followed by
+    a multistart L-BFGS-B run on the best samples. All starts are optimized at once as a single
+    separable problem, so that each iteration evaluates the function on all of them in one call.
+
+    Parameters
+    ----------
+    func: callable
+        function taking a (m, dimension) array of points and a boolean specifying whether gradients
+        are required, and returning the (m,) values and the (m, dimension) gradients (or None)
+    dimension: int
+        dimension of the space
+    rng: np.random.RandomState
+        random state for the samples
+    """
+    from scipy.optimize import minimize
+
+    samples = rng.uniform(0, 1, size=(num_samples, dimension))
+    values, _ = func(samples, False)
+    starts = samples[np.argsort(values, kind="stable")[:num_starts]]
+
+    def flat_func(flat: np.ndarray) -> tp.Tuple[float, np.ndarray]:
+        vals, grads = func(flat.reshape(-1, dimension), True)
+        assert grads is not None
+        return float(np.sum(vals)), grads.ravel()
+
+    result = minimize(
+        flat_func,
+        starts.ravel(),
+        jac=True,
+        method="L-BFGS-B",
+        bounds=[(0.0, 1.0)] * starts.size,
+        options={"maxiter": maxiter},
+    )
+    optimized = np.clip(result.x.reshape(-1, dimension), 0, 1)
+    candidates = np.concatenate([optimized, starts], axis=0)
+    values, _ = func(candidates, False)
+    return candidates[int(np.argmin(values))]  # type: ignore
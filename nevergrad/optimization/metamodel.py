@@ -6,75 +6,198 @@
 import numpy as np
 import nevergrad.common.typing as tp
 from . import utils
-from .base import registry
-from . import callbacks
 
 
 class MetaModelFailure(ValueError):
     """Sometimes the optimum of the metamodel is at infinity."""
 
 
-def learn_on_k_best(archive: utils.Archive[utils.MultiValue], k: int) -> tp.ArrayLike:
+class QuadraticSurrogate:
+    """Quadratic model fitted by least squares, whose normal equations are updated
+    through rank-one updates when points enter or leave the fitted set, and whose
+    optimum is computed in closed form.
+
+    Parameters
+    ----------
+    dimension: int
+        dimension of the points
+
+    Note
+    ----
+    Features are computed on points recentered and rescaled with a reference center and scale
+    for the conditioning of the normal equations. They are rebuilt from scratch when the fitted
+    points drift away from this reference, and regularly to avoid accumulating rounding errors.
+    In large dimension (more than MAX_NORMAL_FEATURES features), the normal equations are too large
+    to be stored, and the least squares problem is solved directly on the fitted points instead.
+    Nothing is allocated before the first fit.
+    """
+
+    MAX_NORMAL_FEATURES = 2000
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.num_features = (dimension + 1) * (dimension + 2) // 2
+        self._triu: tp.Optional[tp.Tuple[np.ndarray, np.ndarray]] = None  # upper triangle indices
+        self._members: tp.Dict[bytes, tp.Tuple[np.ndarray, float]] = {}
+        self._center = np.zeros(dimension)  # reference center of the features
+        self._last_center = np.zeros(dimension)  # center provided at the last fit
+        self._scale = 1.0
+        self._incremental = self.num_features <= self.MAX_NORMAL_FEATURES
+        self._gram = np.zeros((0, 0))  # normal equations, allocated at the first fit
+        self._moment = np.zeros(0)
+        self._num_updates = 0
+        self._coefficients: tp.Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def _triu_indices(self) -> tp.Tuple[np.ndarray, np.ndarray]:
+        if self._triu is None:
+            self._triu = np.triu_indices(self.dimension)
+        return self._triu
+
+    def features(self, points: tp.ArrayLike) -> np.ndarray:
+        """(num_points, num_features) array of the constant, linear and quadratic
+        features of the recentered and rescaled points
+        """
+        points = np.array(points, copy=False, dtype=float).reshape(-1, self.dimension)
+        z = (points - self._center) / self._scale
+        rows, cols = self._triu_indices()
+        quad = z[:, rows] * z[:, cols]
+        return np.concatenate([np.ones((z.shape[0], 1)), z, quad], axis=1)
+
+    def _accumulate(self, points: np.ndarray, values: np.ndarray, sign: float) -> None:
+        phi = self.features(points)
+        self._gram += sign * phi.T @ phi
+        self._moment += sign * phi.T @ values
+        self._num_updates += len(values)
+
+    def _rebuild(self, center: np.ndarray, scale: float) -> None:
+        self._center = np.array(center, dtype=float)
+        self._scale = float(scale)
+        size = self.num_features if self._incremental else 0
+        self._gram = np.zeros((size, size))
+        self._moment = np.zeros(size)
+        if self._members and self._incremental:
+            points, values = zip(*self._members.values())
+            self._accumulate(np.array(points), np.array(values), 1)
+        self._num_updates = 0
+
+    def fit(self, points: tp.ArrayLike, values: tp.ArrayLike, center: np.ndarray, scale: float) -> None:
+        """Updates the model so that it is fitted on the provided points only.
+        Points which were already fitted with the same value are not processed again.
+
+        Parameters
+        ----------
+        points: array-like
+            (num_points, dimension) array of points
+        values: array-like
+            (num_points,) array of values of the points
+        center: np.ndarray
+            center of the points, used as reference if the model is rebuilt
+        scale: float
+            scale of the points, used as reference if the model is rebuilt
+        """
+        points = np.array(points, copy=False, dtype=float)
+        values = np.array(values, copy=False, dtype=float)
+        members = {utils._tobytes(x): (x, float(y)) for x, y in zip(points, values)}
+        removed = [val for key, val in self._members.items() if members.get(key, (None, None))[1] != val[1]]
+        added = [val for key, val in members.items() if self._members.get(key, (None, None))[1] != val[1]]
+        self._members = members
+        self._last_center = np.array(center, dtype=float)
+        self._coefficients = None
+        drift = float(np.sum(((center - self._center) / self._scale) ** 2))
+        rebuild = drift > 1 or not 0.1 < scale / self._scale < 10 or self._gram.size != self.num_features**2
+        rebuild |= self._num_updates + len(removed) + len(added) > 10 * max(len(members), self.num_features)
+        if rebuild or not self._incremental:
+            self._rebuild(center, scale)
+            return
+        for updates, sign in ((removed, -1.0), (added, 1.0)):
+            if updates:
+                upoints, uvalues = zip(*updates)
+                self._accumulate(np.array(upoints), np.array(uvalues), sign)
+
+    def coefficients(self) -> np.ndarray:
+        """Least square coefficients of the features (minimum norm solution of the normal
+        equations, since the number of fitted points is typically close to the number of features)
+        """
+        if self._coefficients is None:
+            if self._incremental:
+                self._coefficients = np.linalg.lstsq(self._gram, self._moment, rcond=None)[0]
+            else:
+                points, values = zip(*self._members.values())
+                self._coefficients = np.linalg.lstsq(self.features(points), np.array(values), rcond=None)[0]
+        return self._coefficients  # type: ignore
+
+    def predict(self, points: tp.ArrayLike) -> np.ndarray:
+        return self.features(points) @ self.coefficients()  # type: ignore
+
+    def minimum(self) -> np.ndarray:
+        """Closed form optimum of the model. Directions along which the Hessian
+        is not positive are projected out, and the point is not moved along them
+        from the center provided at the last fit.
+        """
+        coeffs = self.coefficients()
+        d = self.dimension
+        gradient = coeffs[1 : d + 1]
+        hessian = np.zeros((d, d))
+        hessian[self._triu_indices()] = coeffs[d + 1 :]
+        hessian += hessian.T  # diagonal is doubled, as expected for the second derivatives
+        eigvals, eigvecs = np.linalg.eigh(hessian)
+        positive = eigvals > 1e-12 * max(1e-30, float(np.max(np.abs(eigvals))))
+        if not positive.any():
+            raise MetaModelFailure("Infinite meta-model optimum in learn_on_k_best.")
+        projected = eigvecs[:, positive].T @ gradient
+        z = -eigvecs[:, positive] @ (projected / eigvals[positive])
+        fixed = eigvecs[:, ~positive]
+        z += fixed @ (fixed.T @ ((self._last_center - self._center) / self._scale))
+        return self._center + self._scale * z  # type: ignore
+
+
+def learn_on_k_best(
+    archive: utils.Archive[utils.MultiValue], k: int, surrogate: tp.Optional[QuadraticSurrogate] = None
+) -> tp.ArrayLike:
     """Approximate optimum learnt from the k best.
 
     Parameters
     ----------
     archive: utils.Archive[utils.Value]
+    k: int
+        number of best points to learn on
+    surrogate: QuadraticSurrogate (optional)
+        surrogate to update incrementally (a new one is created if not provided)
     """
-    items = list(archive.items_as_arrays())
-    dimension = len(items[0][0])
+    archive = utils.ArrayArchive.from_archive(archive)
+    dimension = archive.points.shape[1]
 
     # Select the k best.
-    first_k_individuals = sorted(items, key=lambda indiv: archive[indiv[0]].get_estimation("average"))[:k]
+    best_indices = np.argsort(archive.estimations("average"), kind="stable")[:k]
+    first_k_individuals = archive.points[best_indices]
     assert len(first_k_individuals) == k
 
     # Recenter the best.
-    middle = np.array(sum(p[0] for p in first_k_individuals) / k)
-    normalization = 1e-15 + np.sqrt(np.sum((first_k_individuals[-1][0] - first_k_individuals[0][0]) ** 2))
-    y = np.asarray([archive[c[0]].get_estimation("pessimistic") for c in first_k_individuals])
-    X = np.asarray([(c[0] - middle) / normalization for c in first_k_individuals])
-
-    # We need SKLearn.
-    from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import PolynomialFeatures
-
-    polynomial_features = PolynomialFeatures(degree=2)
-    X2 = polynomial_features.fit_transform(X)
-
-    # Fit a linear model.
+    middle = first_k_individuals.sum(axis=0) / k
+    normalization = 1e-15 + np.sqrt(np.sum((first_k_individuals[-1] - first_k_individuals[0]) ** 2))
+    y = archive.estimations("pessimistic")[best_indices]
     if not max(y) - min(y) > 1e-20:  # better use "not" for dealing with nans
         raise MetaModelFailure
 
-    y = (y - min(y)) / (max(y) - min(y))
-    model = LinearRegression()
-    model.fit(X2, y)
+    # Fit the quadratic model (ordering is not modified by the normalization of y).
+    if surrogate is None:
+        surrogate = QuadraticSurrogate(dimension)
+    surrogate.fit(first_k_individuals, y, center=middle, scale=normalization)
 
     # Check model quality.
-    model_outputs = model.predict(X2)
-    indices = np.argsort(y)
-    ordered_model_outputs = [model_outputs[i] for i in indices]
-    if not np.all(np.diff(ordered_model_outputs) > 0):
+    model_outputs = surrogate.predict(first_k_individuals)
+    if not np.all(np.diff(model_outputs[np.argsort(y)]) > 0):
         raise MetaModelFailure("Unlearnable objective function.")
 
     try:
-        Powell = registry["Powell"]
-        DE = registry["DE"]
-        for cls in (Powell, DE):  # Powell excellent here, DE as a backup for thread safety.
-            optimizer = cls(parametrization=dimension, budget=45 * dimension + 30)
-            # limit to 20s at most
-            optimizer.register_callback("ask", callbacks.EarlyStopping.timer(20))
-            try:
-                minimum = optimizer.minimize(
-                    lambda x: float(model.predict(polynomial_features.fit_transform(x[None, :])))
-                ).value
-            except RuntimeError:
-                assert cls == Powell, "Only Powell is allowed to crash here."
-            else:
-                break
-    except ValueError:
+        minimum = surrogate.minimum()
+    except np.linalg.LinAlgError:
         raise MetaModelFailure("Infinite meta-model optimum in learn_on_k_best.")
-    if float(model.predict(polynomial_features.fit_transform(minimum[None, :]))) > y[0]:
+    if float(surrogate.predict(minimum)[0]) > y[0]:
         raise MetaModelFailure("Not a good proposal.")
-    if np.sum(minimum**2) > 1.0:
+    if np.sum(((minimum - middle) / normalization) ** 2) > 1.0:
         raise MetaModelFailure("huge meta-model optimum in learn_on_k_best.")
-    return middle + normalization * minimum
+    return minimum
@@ -6,3 +6,4 @@
 from .core import HypervolumePareto as HypervolumePareto
 from .core import AUTO_BOUND as AUTO_BOUND
 from .hypervolume import HypervolumeIndicator as HypervolumeIndicator
+from .hypervolume import IncrementalHypervolume as IncrementalHypervolume
@@ -6,7 +6,8 @@
 import numpy as np
 import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter as p
-from .hypervolume import HypervolumeIndicator
+from .hypervolume import IncrementalHypervolume
+from . import pareto
 
 
 AUTO_BOUND = 15
@@ -69,7 +70,7 @@ class HypervolumePareto:
         # If we have ever beaten the upper bounds, the _best_volume is nonnegative. In particular, it is
         # the hypervolume of the current PF if we are using hypervolume, otherwise 0.
         self._best_volume = -float("Inf")
-        self._hypervolume: tp.Optional[HypervolumeIndicator] = None
+        self._hypervolume: tp.Optional[IncrementalHypervolume] = None
         self._pareto_needs_filtering = False
         self._no_hypervolume = no_hypervolume
         self._pf = ParetoFront(seed=seed, no_hypervolume=no_hypervolume)
@@ -129,9 +130,13 @@ class HypervolumePareto:
 
     def _calc_hypervolume(self, parameter: p.Parameter, losses: np.ndarray) -> float:
         if self._hypervolume is None:
-            self._hypervolume = HypervolumeIndicator(self._upper_bounds)
+            # contributions are then updated incrementally, points over the upper bounds do not contribute
+            self._hypervolume = IncrementalHypervolume(self._upper_bounds)
+            for front_losses in self._pf.get_losses():
+                self._hypervolume.add(front_losses)
             self._pf._hypervolume = self._hypervolume
-        new_volume = self._hypervolume.compute([pa.losses for pa in self._pf.get_raw()] + [losses])
+        self._hypervolume.add(losses)  # only added if it contributes, hence if it is good
+        new_volume = self._hypervolume.volume
         if new_volume > self._best_volume:
             # This point is good! Let us give him a great mono-fitness value.
             self._best_volume = new_volume
@@ -141,12 +146,12 @@ class HypervolumePareto:
             # This point is not on the front
             # First we prune.
             distance_to_pareto = float("Inf")
-            for param in self._pf.get_front():
-                stored_losses = param.losses
-                # TODO the following is probably not good at all:
-                # -> +inf if no point is strictly better (but lower if it is)
-                if (stored_losses <= losses).all():
-                    distance_to_pareto = min(distance_to_pareto, min(losses - stored_losses))
+            front_losses = self._pf.get_losses()
+            # TODO the following is probably not good at all:
+            # -> +inf if no point is strictly better (but lower if it is)
+            better = (front_losses <= losses).all(axis=1) if front_losses.size else np.zeros(0, dtype=bool)
+            if better.any():
+                distance_to_pareto = float(np.min(losses - front_losses[better]))
             assert distance_to_pareto >= 0
             return 0.0 if self._no_hypervolume else -new_volume + distance_to_pareto
 
@@ -161,9 +166,11 @@ class HypervolumePareto:
         size:  int (optional)
             if provided, selects a subset of the full pareto front with the given maximum size
         subset: str
-            method for selecting the subset ("random, "loss-covering", "EPS", "domain-covering", "hypervolume")
+            method for selecting the subset ("random, "loss-covering", "EPS", "domain-covering", "hypervolume",
+            "crowding")
             EPS is the epsilon indicator described e.g.
                 here: https://hal.archives-ouvertes.fr/hal-01159961v2/document
+            crowding selects the points with largest crowding distance, as in NSGA-II
         subset_tentatives: int
             number of random tentatives for finding a better subset
 
@@ -175,7 +182,7 @@ class HypervolumePareto:
         return self._pf.get_front(size, subset, subset_tentatives)
 
     def get_min_losses(self) -> tp.List[float]:
-        return np.min([p.losses for p in self._pf.get_raw()], axis=0)
+        return np.min(self._pf.get_losses(), axis=0)  # type: ignore
 
 
 class ParetoFront:
@@ -186,33 +193,58 @@ class ParetoFront:
         no_hypervolume: bool = False,
     ) -> None:
         self._pareto: tp.List[p.Parameter] = []
+        self._losses: tp.Optional[np.ndarray] = None  # stacked losses of the front
         self._pareto_needs_filtering = False
         self._no_hypervolume = no_hypervolume
         self._rng = seed if isinstance(seed, np.random.RandomState) else np.random.RandomState(seed)
-        self._hypervolume: tp.Optional[HypervolumeIndicator] = None
+        self._hypervolume: tp.Optional[IncrementalHypervolume] = None
 
     def add_to_pareto(self, parameter: p.Parameter) -> None:
+        """Adds a parameter to the front if it is not dominated, and removes
+        the parameters it dominates
+        """
+        if self._pareto_needs_filtering:
+            self._filter_pareto_front()
+        losses = parameter.losses[None, :]
+        if self._losses is None or not self._pareto:
+            self._pareto, self._losses = [parameter], losses.copy()
+            return
+        if pareto.dominates(self._losses, losses).any():
+            return  # rejected on arrival
+        kept = ~pareto.dominates(losses, self._losses)[0]
+        if not kept.all():
+            self._pareto = [param for param, keep in zip(self._pareto, kept) if keep]
+            self._losses = self._losses[kept]
         self._pareto.append(parameter)
-        self._pareto_needs_filtering = True
+        self._losses = np.concatenate([self._losses, losses], axis=0)
+
+    def extend(self, parameters: tp.Iterable[p.Parameter]) -> None:
+        """Adds several parameters at once, the front is filtered lazily"""
+        parameters = list(parameters)
+        if parameters:
+            self._pareto.extend(parameters)
+            self._pareto_needs_filtering = True
 
     def _filter_pareto_front(self) -> None:
         """Filters the Pareto front"""
-        new_pareto: tp.List[p.Parameter] = []
-        for param in self._pareto:  # quadratic :(
-            should_be_added = True
-            for other in self._pareto:
-                if (other.losses <= param.losses).all() and (other.losses < param.losses).any():
-                    should_be_added = False
-                    break
-            if should_be_added:
-                new_pareto.append(param)
-        self._pareto = new_pareto
+        losses = np.array([param.losses for param in self._pareto], dtype=float)
+        mask = pareto.pareto_mask(losses) if self._pareto else np.zeros(0, dtype=bool)
+        self._pareto = [param for param, keep in zip(self._pareto, mask) if keep]
+        self._losses = losses[mask] if self._pareto else None
         self._pareto_needs_filtering = False
 
     def get_raw(self) -> tp.List[p.Parameter]:
         """Retrieve current values, which may not be a Pareto front, as they have not been filtered."""
         return self._pareto
 
+    def get_losses(self) -> np.ndarray:
+        """Losses of the Pareto front, as a (num_points, num_objectives) array"""
+        if self._pareto_needs_filtering:
+            self._filter_pareto_front()
+        if self._losses is None:
+            return np.zeros((0, 0))
+        return self._losses
+
     # pylint: disable=too-many-branches
     def get_front(
         self, size: tp.Optional[int] = None, subset: str = "random", subset_tentatives: int = 12
@@ -225,7 +257,8 @@ class ParetoFront:
         size:  int (optional)
             if provided, selects a subset of the full pareto front with the given maximum size
         subset: str
-            method for selecting the subset ("random, "loss-covering", "EPS", "domain-covering", "hypervolume")
+            method for selecting the subset ("random, "loss-covering", "EPS", "domain-covering", "hypervolume",
+            "crowding")
             EPS is the epsilon indicator described e.g.
                 here: https://hal.archives-ouvertes.fr/hal-01159961v2/document
         subset_tentatives: int
@@ -242,6 +275,9 @@ class ParetoFront:
             return self._pareto
         if subset == "random":
             return self._rng.choice(self._pareto, size).tolist()  # type: ignore
+        if subset == "crowding":  # deterministic, no need for tentatives
+            distances = pareto.crowding_distance(self.get_losses())
+            return [self._pareto[i] for i in np.argsort(-distances, kind="stable")[:size]]
         tentatives = [self._rng.choice(self._pareto, size).tolist() for _ in range(subset_tentatives)]  # type: ignore
         if self._hypervolume is None and subset == "hypervolume":
             raise RuntimeError("Hypervolume subsetting not supported as hypervolume not in use")
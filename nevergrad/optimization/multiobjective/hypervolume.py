@@ -9,8 +9,10 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import bisect
 import typing as tp
 import numpy as np
+from . import pareto
 
 
 class VectorNode:
@@ -309,3 +311,162 @@ class HypervolumeIndicator:
             node.area[dimension] = self.recursive_hypervolume(dimension - 1)
             if node.area[dimension] <= node.prev[dimension].area[dimension]:
                 node.dominated_flag = dimension
+
+
+def _staircase_insert(
+    xs: tp.List[float], ys: tp.List[float], x: float, y: float, rx: float, ry: float
+) -> float:
+    """Inserts a point in a 2D staircase of non-dominated points (increasing xs, decreasing ys)
+    and returns the variation of the area it dominates (up to reference rx, ry)
+    """
+    k = bisect.bisect_right(xs, x) - 1
+    if k >= 0 and ys[k] <= y:
+        return 0.0  # weakly dominated
+    start = bisect.bisect_left(xs, x)
+    stop = start
+    while stop < len(ys) and ys[stop] >= y:
+        stop += 1
+    y_prev = ys[start - 1] if start else ry
+    x_next = xs[stop] if stop < len(xs) else rx
+    delta = (x_next - x) * (y_prev - y)
+    for i in range(start, stop):  # remove the area which was exclusively dominated by removed points
+        delta -= ((xs[i + 1] if i + 1 < stop else x_next) - xs[i]) * (y_prev - ys[i])
+    xs[start:stop] = [x]
+    ys[start:stop] = [y]
+    return delta
+
+
+def compute_hypervolume(
+    points: tp.Union[tp.List[np.ndarray], np.ndarray], reference_point: np.ndarray
+) -> float:
+    """Exact hypervolume of a set of points with respect to a reference point.
+    Uses O(n log n) sweeps for 2 and 3 dimensions, and the HypervolumeIndicator
+    dimension-sweep recursion above.
+    """
+    reference = np.array(reference_point, dtype=float, copy=False).ravel()
+    data = np.array(points, dtype=float, copy=False).reshape(-1, reference.size)
+    data = data[(data < reference).all(axis=1)]  # other points do not dominate any volume
+    if not data.shape[0]:
+        return 0.0
+    if reference.size == 1:
+        return float(reference[0] - data.min())
+    if reference.size == 2:
+        order = np.argsort(data[:, 0], kind="stable")
+        widths = np.diff(np.append(data[order, 0], reference[0]))
+        return float(np.sum(widths * (reference[1] - np.minimum.accumulate(data[order, 1]))))
+    if reference.size == 3:
+        order = np.argsort(data[:, 2], kind="stable")
+        sorted_points = data[order].tolist()
+        rx, ry, rz = reference.tolist()
+        xs: tp.List[float] = []
+        ys: tp.List[float] = []
+        area = volume = 0.0
+        for k, (x, y, z) in enumerate(sorted_points):
+            area += _staircase_insert(xs, ys, x, y, rx, ry)
+            volume += area * ((sorted_points[k + 1][2] if k + 1 < len(sorted_points) else rz) - z)
+        return volume
+    return float(HypervolumeIndicator(reference).compute(data[pareto.pareto_mask(data)]))
+
+
+class IncrementalHypervolume:
+    """Keeps track of a set of non-dominated points and of the hypervolume they dominate,
+    updating it with the contributions of the points when they are added or removed,
+    instead of recomputing the volume of the whole set.
+
+    Parameters
+    ----------
+    reference_point: np.ndarray
+        the reference point bounding the hypervolume
+
+    Note
+    ----
+    - The contribution of a point p to a set S is the volume of the box between p and the reference point,
+      minus the hypervolume of the points of S "limited" to this box (max(s, p) for s in S).
+    - Only the points whose limited version is not dominated by another limited point can share
+      volume with p. Adding or removing p therefore only updates the contributions of these neighbors.
+    """
+
+    def __init__(self, reference_point: np.ndarray) -> None:
+        self.reference_point = np.array(reference_point, dtype=float, copy=False).ravel()
+        self._points = np.zeros((0, self.reference_point.size))
+        self._volume = 0.0
+        self._contributions = np.zeros(0)
+        self._stale = np.zeros(0, dtype=bool)  # contributions which must be recomputed
+
+    @property
+    def points(self) -> np.ndarray:
+        """(num_points, num_objectives) array of the non-dominated points within the reference box"""
+        return self._points
+
+    @property
+    def volume(self) -> float:
+        """Hypervolume dominated by the points"""
+        return self._volume
+
+    def compute(self, points: tp.Union[tp.List[np.ndarray], np.ndarray]) -> float:
+        """Computes the hypervolume of any set of points with respect to the reference point"""
+        return compute_hypervolume(points, self.reference_point)
+
+    def _neighbors(self, point: np.ndarray) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """Returns the points limited to the box of the point, and the mask of the ones which
+        are not dominated by other limited points (the neighbors of the point)
+        """
+        limited = np.maximum(self._points, point)
+        return limited, pareto.pareto_mask(limited)
+
+    def _contribution(self, point: np.ndarray) -> tp.Tuple[float, np.ndarray]:
+        """Returns the contribution of the point, and the mask of its neighbors"""
+        if not (point < self.reference_point).all() or (self._points <= point).all(axis=1).any():
+            return 0.0, np.zeros(len(self._points), dtype=bool)  # out of the box or weakly dominated
+        limited, neighbors = self._neighbors(point)
+        box = float(np.prod(self.reference_point - point))
+        return max(0.0, box - self.compute(limited[neighbors])), neighbors
+
+    def contribution(self, point: np.ndarray) -> float:
+        """Volume which would be added by adding the point"""
+        return self._contribution(np.array(point, dtype=float, copy=False).ravel())[0]
+
+    def add(self, point: np.ndarray) -> float:
+        """Adds a point, removes the points it dominates, and returns its contribution
+        to the hypervolume
+        """
+        point = np.array(point, dtype=float, copy=False).ravel()
+        contribution, neighbors = self._contribution(point)
+        if contribution > 0:
+            kept = ~(point <= self._points).all(axis=1)
+            self._points = np.concatenate([self._points[kept], point[None, :]], axis=0)
+            self._volume += contribution
+            # only the neighbors lose some contribution, and the contribution of the new point
+            # is the volume it adds unless it dominates other points
+            self._contributions = np.append(self._contributions[kept], contribution)
+            self._stale = np.append((self._stale | neighbors)[kept], not kept.all())
+        return contribution
+
+    def remove(self, index: int) -> float:
+        """Removes the point at the given index, and returns its (former) contribution"""
+        contribution = float(self.contributions[index])
+        point = self._points[index]
+        self._points = np.delete(self._points, index, axis=0)
+        self._volume -= contribution
+        self._contributions = np.delete(self._contributions, index)
+        self._stale = np.delete(self._stale, index) | self._neighbors(point)[1]
+        return contribution
+
+    @property
+    def contributions(self) -> np.ndarray:
+        """Exclusive contribution of each point to the hypervolume"""
+        if not self._stale.any():
+            return self._contributions
+        points = self._points
+        if points.shape[1] == 2:  # closed form on the sorted staircase
+            order = np.argsort(points[:, 0], kind="stable")
+            x, y = points[order, 0], points[order, 1]
+            widths = np.append(x[1:], self.reference_point[0]) - x
+            heights = np.insert(y[:-1], 0, self.reference_point[1]) - y
+            self._contributions[order] = widths * heights
+        else:
+            for k in np.flatnonzero(self._stale):
+                limited = np.maximum(np.delete(points, k, axis=0), points[k])
+                self._contributions[k] = np.prod(self.reference_point - points[k]) - self.compute(limited)
+        self._stale[:] = False
+        return self._contributions
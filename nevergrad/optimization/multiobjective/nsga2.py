@@ -7,104 +7,29 @@ import logging
 import numpy as np
 import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter as p
+from . import pareto
 
 
 logger = logging.getLogger(__name__)
 
 
+def _get_losses(candidates: tp.Sequence[p.Parameter]) -> np.ndarray:
+    """(num_candidates, num_objectives) array of the losses of the candidates"""
+    return np.array([c.losses for c in candidates], dtype=float).reshape(len(candidates), -1)
+
+
 class CrowdingDistance:
     """This class implements the calculation of crowding distance for NSGA-II."""
 
-    def accumulate_distance_per_objective(self, front: tp.List[p.Parameter], i: int):
-        if isinstance(front[0].losses, np.ndarray) and front[0].losses.shape != ():
-            is_multiobj: bool = len(front[0].losses) > 1  # isinstance(front[0].loss, np.ndarray)
-        else:
-            is_multiobj = False
-        assert (not is_multiobj and (i == 0)) or is_multiobj
-
-        # Sort the population by objective i
-        if is_multiobj:
-            front = sorted(front, key=lambda x: x.losses[i])
-            objective_minn = front[0].losses[i]
-            objective_maxn = front[-1].losses[i]
-            assert objective_minn <= objective_maxn
-
-            # Set the crowding distance
-            front[0]._meta["crowding_distance"] = float("inf")
-            front[-1]._meta["crowding_distance"] = float("inf")
-
-            # All other intermediate solutions are assigned a distance value equal
-            # to the absolute normalized difference in the function values of two
-            # adjacent solutions.
-            for j in range(1, len(front) - 1):
-                distance = front[j + 1].losses[i] - front[j - 1].losses[i]
-
-                # Check if minimum and maximum are the same (in which case do nothing)
-                if objective_maxn - objective_minn == 0:
-                    pass  # undefined
-                else:
-                    distance = distance / float(objective_maxn - objective_minn)
-                logger.debug("front[j]: %s distance: %s", front[j].uid, distance)
-                # The overall crowding-distance value is calculated as the sum of
-                # individual distance values corresponding to each objective.
-                front[j]._meta["crowding_distance"] += distance
-        else:
-            front = sorted(front, key=lambda x: x.loss)  # type: ignore
-            objective_minn = front[0].loss
-            objective_maxn = front[-1].loss
-            assert objective_minn <= objective_maxn
-
-            # Set the crowding distance
-            front[0]._meta["crowding_distance"] = float("inf")
-            front[-1]._meta["crowding_distance"] = float("inf")
-
-            # All other intermediate solutions are assigned a distance value equal
-            # to the absolute normalized difference in the function values of two
-            # adjacent solutions.
-            for j in range(1, len(front) - 1):
-                if front[j + 1].loss is None or front[j - 1].loss is None:
-                    distance = 0
-                else:
-                    distance = front[j + 1].loss if front[j + 1].loss is not None else 0
-                    distance -= front[j - 1].loss if front[j - 1].loss is not None else 0
-
-                # Check if minimum and maximum are the same (in which case do nothing)
-                if objective_maxn - objective_minn == 0:
-                    pass  # undefined
-                else:
-                    distance = distance / float(objective_maxn - objective_minn)
-                # The overall crowding-distance value is calculated as the sum of
-                # individual distance values corresponding to each objective.
-                front[j]._meta["crowding_distance"] += distance
-
-    def compute_distance(self, front: tp.List[p.Parameter]):
+    def compute_distance(self, front: tp.List[p.Parameter]) -> None:
         """This function assigns the crowding distance to the solutions.
         :param front: The list of solutions.
         """
-        size = len(front)
-
-        if size == 0:
-            return
-        # The boundary solutions (solutions with smallest and largest function values)
-        # are set to an infinite (maximum) distance value
-        if size == 1:
-            front[0]._meta["crowding_distance"] = float("inf")
+        if not front:
             return
-        if size == 2:
-            front[0]._meta["crowding_distance"] = float("inf")
-            front[1]._meta["crowding_distance"] = float("inf")
-            return
-
-        for f in front:
-            f._meta["crowding_distance"] = 0.0
-
-        if isinstance(front[0].losses, np.ndarray) and front[0].losses.shape != ():
-            number_of_objectives = len(front[0].losses)
-        else:
-            number_of_objectives = 1
-
-        for i in range(number_of_objectives):
-            self.accumulate_distance_per_objective(front, i)
+        distances = pareto.crowding_distance(_get_losses(front))
+        for cand, distance in zip(front, distances.tolist()):
+            cand._meta["crowding_distance"] = distance
 
     def sort(self, candidates: tp.List[p.Parameter], in_place: bool = True) -> tp.List[p.Parameter]:
         if in_place:
@@ -131,7 +56,6 @@ class FastNonDominatedRanking:
             return 1
         return 0
 
-    # pylint: disable=too-many-locals
     def compute_ranking(
         self, candidates: tp.List[p.Parameter], k: int = None
     ) -> tp.List[tp.List[p.Parameter]]:
@@ -140,92 +64,92 @@ class FastNonDominatedRanking:
         :param candidates: List of candidates.
         :param k: Number of individuals.
         """
-        n_cand: int = len(candidates)
-        # dominated_by_cnt[i]: number of candidates dominating ith candidate
-        dominated_by_cnt: tp.List[int] = [0] * n_cand  # [0 for _ in range(len(candidates))]
-
-        # candidates_dominated[i]: List of candidates dominated by ith candidate
-        candidates_dominated: tp.List[tp.List[int]] = [[] for _ in range(n_cand)]
-
-        # front[i] contains the list of solutions belonging to front i
-        front: tp.List[tp.List[int]] = [[] for _ in range(n_cand + 1)]
-
-        uid2candidate = {c.uid: c for c in candidates}
-        uids = [c.uid for c in candidates]
-        for c1 in range(n_cand - 1):
-            uid1 = uids[c1]
-            for c2 in range(c1 + 1, n_cand):
-                uid2 = uids[c2]
-                dominance_test_result = self.compare(uid2candidate[uid1], uid2candidate[uid2])
-                # self.number_of_comparisons += 1
-                if dominance_test_result == -1:
-                    # c1 wins
-                    candidates_dominated[c1].append(c2)
-                    dominated_by_cnt[c2] += 1
-                elif dominance_test_result == 1:
-                    # c2 wins
-                    candidates_dominated[c2].append(c1)
-                    dominated_by_cnt[c1] += 1
-
         # Reset rank
         for cand in candidates:
             cand._meta["non_dominated_rank"] = float("inf")
-
-        # Formation of front[0], i.e. candidates that do not dominated by others
-        front[0] = [c1 for c1 in range(n_cand) if dominated_by_cnt[c1] == 0]
-        last_fronts = 0
-        while len(front[last_fronts]) != 0:
-            last_fronts += 1
-            # Number of candidates in a frontier <= Number of candidates that dominate at least 1 candidate
-            assert len(front[last_fronts - 1]) <= len(candidates_dominated)
-            for c1 in front[last_fronts - 1]:
-                for c2 in candidates_dominated[c1]:
-                    dominated_by_cnt[c2] -= 1
-                    if dominated_by_cnt[c2] == 0:
-                        front[last_fronts].append(c2)
-
-        # Convert index to uid
+        if not candidates:
+            return []
+        # dominance as defined in the compare method
+        losses = np.array([c.losses for c in candidates])
+        ranks = pareto.non_dominated_ranks(losses, relation="majority")
+        ranked = np.flatnonzero(ranks >= 0)
+        order = ranked[np.argsort(ranks[ranked], kind="stable")]
+        sizes = np.bincount(ranks[ranked])
         # Trim to frontiers that contain the k candidates of interest
         ranked_sublists = []
         count = 0
-        for front_i in range(last_fronts):
-            count += len(front[front_i])
-            for cand_i in front[front_i]:
-                uid2candidate[uids[cand_i]]._meta["non_dominated_rank"] = front_i
-            ranked_sublists.append([uid2candidate[uids[i]] for i in front[front_i]])
+        fronts = np.split(order, np.cumsum(sizes)[:-1]) if order.size else []
+        for front_i, front in enumerate(fronts):
+            count += len(front)
+            ranked_sublists.append([candidates[i] for i in front])
+            for cand in ranked_sublists[-1]:
+                cand._meta["non_dominated_rank"] = front_i
             if (k is not None) and (count >= k):
                 break
 
         return ranked_sublists
 
 
+def select(
+    losses: tp.ArrayLike, n_selected: tp.Optional[int] = None
+) -> tp.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Multi-objective selection of NSGA-II on a (num_points, num_objectives) array of losses:
+    points are ranked by non-dominated front, and the last selected front is truncated
+    by decreasing crowding distance.
+
+    Parameters
+    ----------
+    losses: array-like
+        (num_points, num_objectives) array of losses
+    n_selected: optional int
+        number of points to select (if None, all the points which can be ranked are selected,
+        and the crowding distances are computed in all fronts)
+
+    Returns
+    -------
+    tuple of np.ndarray
+        indices of the selected points, their selection rank, their front index and their
+        crowding distance (infinite in the fronts which are fully selected)
+    """
+    losses = np.array(losses, dtype=float, copy=False).reshape(len(losses), -1)
+    fronts = pareto.non_dominated_ranks(losses, relation="majority")
+    ranked = np.flatnonzero(fronts >= 0)  # majority dominance can be cyclic
+    order = ranked[np.argsort(fronts[ranked], kind="stable")]
+    bounds = np.cumsum(np.bincount(fronts[ranked]))
+    # fronts which fit entirely in the selection all get the same selection rank
+    num_full = 0 if n_selected is None else int(np.searchsorted(bounds, n_selected, side="right"))
+    full = order[: bounds[num_full - 1] if num_full else 0]
+    indices = [full]
+    selection_ranks = [fronts[full]]
+    distances = [np.full(full.size, float("inf"))]
+    next_rank = num_full
+    for front in np.split(order, bounds[:-1])[num_full:]:
+        front_distances = pareto.crowding_distance(losses[front])
+        sub = np.argsort(-front_distances, kind="stable")  # larger -> less crowded
+        if n_selected is not None:
+            sub = sub[: n_selected - full.size]
+        indices.append(front[sub])
+        selection_ranks.append(np.arange(next_rank, next_rank + sub.size))
+        distances.append(front_distances[sub])
+        next_rank += sub.size
+        if n_selected is not None:
+            break
+    selected = np.concatenate(indices)
+    return selected, np.concatenate(selection_ranks), fronts[selected], np.concatenate(distances)
+
+
 def rank(
     population: tp.List[p.Parameter], n_selected: tp.Optional[int] = None
 ) -> tp.Dict[str, tp.Tuple[int, int, float]]:
     """implements the multi-objective ranking function of NSGA-II."""
-    frontier_ranker = FastNonDominatedRanking()
-    density_estimator = CrowdingDistance()
+    if not population:
+        return {}
+    selected, selection_ranks, fronts, distances = select(_get_losses(population), n_selected)
     selected_pop: tp.Dict[str, tp.Tuple[int, int, float]] = {}
-    frontiers = frontier_ranker.compute_ranking(population)
-    count = 0
-    next_rank = 0
-    for front_i, p_frontier in enumerate(frontiers):
-        count += len(p_frontier)
-        if n_selected is None or count > n_selected:
-            density_estimator.compute_distance(p_frontier)
-            density_estimator.sort(p_frontier)
-            n_dist_calc = n_selected - len(selected_pop) if n_selected is not None else len(p_frontier)
-            for c_i in range(0, n_dist_calc):
-                selected_pop[p_frontier[c_i].uid] = (
-                    next_rank,
-                    front_i,
-                    p_frontier[c_i]._meta["crowding_distance"],
-                )
-                next_rank += 1
-            if n_selected is not None:
-                break
-        if n_selected is not None:
-            for candidate in p_frontier:
-                selected_pop[candidate.uid] = (next_rank, front_i, float("inf"))
-            next_rank += 1
+    for index, selection_rank, front, distance in zip(
+        selected.tolist(), selection_ranks.tolist(), fronts.tolist(), distances.tolist()
+    ):
+        candidate = population[index]
+        candidate._meta["non_dominated_rank"] = front
+        selected_pop[candidate.uid] = (selection_rank, front, distance)
     return selected_pop
@@ -0,0 +1,205 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""Dominance computations on (n, m) arrays of losses (n points, m objectives, minimization).
+"""
+
+import bisect
+import numpy as np
+import nevergrad.common.typing as tp
+
+
+BLOCK_SIZE = 2**22  # maximum number of elementwise comparisons performed at once
+
+
+def _blocks(num: int, cost: int) -> tp.Iterator[slice]:
+    """Slices of range(num) such that each slice costs at most about BLOCK_SIZE
+    when each element costs "cost" comparisons
+    """
+    step = max(1, BLOCK_SIZE // max(1, cost))
+    for start in range(0, num, step):
+        yield slice(start, min(num, start + step))
+
+
+def _as_losses(losses: tp.ArrayLike) -> np.ndarray:
+    losses = np.array(losses, dtype=float, copy=False)
+    if losses.ndim == 1:
+        losses = losses[:, None]
+    if losses.ndim != 2:
+        raise ValueError(f"Losses must be a (num_points, num_objectives) array, got shape {losses.shape}")
+    return losses
+
+
+def dominates(losses1: np.ndarray, losses2: np.ndarray) -> np.ndarray:
+    """Pareto dominance matrix: output[i, j] is True if losses1[i] dominates losses2[j]
+    (lower or equal on all objectives, and strictly lower on at least one)
+    """
+    first, second = losses1[:, None, :], losses2[None, :, :]
+    return np.logical_and((first <= second).all(axis=2), (first < second).any(axis=2))  # type: ignore
+
+
+def majority_dominates(losses1: np.ndarray, losses2: np.ndarray) -> np.ndarray:
+    """Majority dominance matrix: output[i, j] is True if losses1[i] is strictly lower than losses2[j]
+    on more objectives than the opposite (this is Pareto dominance for 1 or 2 objectives)
+    """
+    first, second = losses1[:, None, :], losses2[None, :, :]
+    return (first < second).sum(axis=2) > (second < first).sum(axis=2)  # type: ignore
+
+
+def pareto_mask(losses: tp.ArrayLike) -> np.ndarray:
+    """Computes which points are not Pareto-dominated by any other point.
+    Uses sort-based O(n log n) algorithms for 2 and 3 objectives, and block-wise
+    vectorized dominance tests above.
+
+    Parameters
+    ----------
+    losses: array-like
+        (num_points, num_objectives) array of losses
+
+    Returns
+    -------
+    np.ndarray
+        boolean array of shape (num_points,), True for the points of the Pareto front
+    """
+    losses = _as_losses(losses)
+    num, num_obj = losses.shape
+    if not num:
+        return np.zeros(0, dtype=bool)
+    if num_obj == 1:
+        return losses[:, 0] == np.min(losses[:, 0])  # type: ignore
+    if num_obj == 2:
+        return _pareto_mask_2d(losses)
+    if num_obj == 3:
+        return _pareto_mask_3d(losses)
+    dominated = np.zeros(num, dtype=bool)
+    for block in _blocks(num, num * num_obj):
+        dominated[block] = dominates(losses, losses[block]).any(axis=0)
+    return ~dominated  # type: ignore
+
+
+def _pareto_mask_2d(losses: np.ndarray) -> np.ndarray:
+    num = losses.shape[0]
+    order = np.lexsort((losses[:, 1], losses[:, 0]))
+    first, second = losses[order, 0], losses[order, 1]
+    # points sharing the same first objective are contiguous, sorted by second objective
+    starts = np.ones(num, dtype=bool)
+    starts[1:] = first[1:] != first[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(num), 0))
+    # best second objective among the points with a strictly lower first objective
+    previous = np.full(num, np.inf)
+    has_previous = group_start > 0
+    previous[has_previous] = np.minimum.accumulate(second)[group_start[has_previous] - 1]
+    dominated = (has_previous & (previous <= second)) | (second[group_start] < second)
+    mask = np.zeros(num, dtype=bool)
+    mask[order] = ~dominated
+    return mask
+
+
+def _pareto_mask_3d(losses: np.ndarray) -> np.ndarray:
+    # sweep in lexicographic order (any dominating point comes first), keeping the staircase
+    # of the points which are non-dominated in the plane of the last 2 objectives
+    order = np.lexsort((losses[:, 2], losses[:, 1], losses[:, 0]))
+    mask = np.zeros(losses.shape[0], dtype=bool)
+    stairs: tp.List[tp.List[float]] = [[], [], []]  # increasing 2nd objective, decreasing 3rd objective
+    for index, (x, y, z) in zip(order.tolist(), losses[order].tolist()):
+        k = bisect.bisect_right(stairs[1], y) - 1
+        if k >= 0 and stairs[2][k] <= z:  # dominated, unless it is a duplicate
+            mask[index] = stairs[0][k] == x and stairs[1][k] == y and stairs[2][k] == z
+            continue
+        mask[index] = True
+        start = bisect.bisect_left(stairs[1], y)
+        stop = start
+        while stop < len(stairs[2]) and stairs[2][stop] >= z:
+            stop += 1
+        for stair, value in zip(stairs, (x, y, z)):
+            stair[start:stop] = [value]
+    return mask
+
+
+def non_dominated_ranks(losses: tp.ArrayLike, relation: str = "pareto") -> np.ndarray:
+    """Computes the non-dominated rank of each point: 0 for the non-dominated points,
+    1 for the points only dominated by points of rank 0 etc.
+
+    Parameters
+    ----------
+    losses: array-like
+        (num_points, num_objectives) array of losses
+    relation: str
+        "pareto" for Pareto dominance, or "majority" for majority dominance (see majority_dominates)
+
+    Returns
+    -------
+    np.ndarray
+        integer array of ranks of shape (num_points,). Since majority dominance can be cyclic,
+        points which cannot be ranked have rank -1.
+    """
+    if relation not in ("pareto", "majority"):
+        raise ValueError(f'Unknown dominance relation "{relation}"')
+    losses = _as_losses(losses)
+    num, num_obj = losses.shape
+    if num_obj == 1:
+        return np.unique(losses[:, 0], return_inverse=True)[1].reshape(num)  # type: ignore
+    if num_obj == 2:  # both relations are equivalent
+        return _ranks_2d(losses)
+    func = dominates if relation == "pareto" else majority_dominates
+    num_dominating = np.zeros(num, dtype=int)
+    for block in _blocks(num, num * num_obj):
+        num_dominating += func(losses[block], losses).sum(axis=0)
+    ranks = np.full(num, -1, dtype=int)
+    front = np.flatnonzero(num_dominating == 0)
+    rank = 0
+    while front.size:
+        ranks[front] = rank
+        for block in _blocks(front.size, num * num_obj):
+            num_dominating -= func(losses[front[block]], losses).sum(axis=0)
+        front = np.flatnonzero(np.logical_and(num_dominating == 0, ranks < 0))
+        rank += 1
+    return ranks
+
+
+def _ranks_2d(losses: np.ndarray) -> np.ndarray:
+    # in lexicographic order, the last point added to a front has its lowest second objective,
+    # and the fronts dominating a point are the first ones (binary search)
+    order = np.lexsort((losses[:, 1], losses[:, 0]))
+    ranks = np.zeros(losses.shape[0], dtype=int)
+    lasts: tp.List[tp.Tuple[float, float]] = []  # (second, first) objectives of the last point of each front
+    for index, (x, y) in zip(order.tolist(), losses[order].tolist()):
+        rank = bisect.bisect_left(lasts, (y, x))
+        if rank == len(lasts):
+            lasts.append((y, x))
+        else:
+            lasts[rank] = (y, x)
+        ranks[index] = rank
+    return ranks
+
+
+def crowding_distance(losses: tp.ArrayLike) -> np.ndarray:
+    """Computes the crowding distance of NSGA-II of each point of a front: the sum over
+    the objectives of the normalized distance between the two neighbors of the point
+    (infinite for the extreme points)
+
+    Parameters
+    ----------
+    losses: array-like
+        (num_points, num_objectives) array of losses
+
+    Returns
+    -------
+    np.ndarray
+        float array of shape (num_points,)
+    """
+    losses = _as_losses(losses)
+    num = losses.shape[0]
+    if num <= 2:
+        return np.full(num, float("inf"))
+    distances = np.zeros(num)
+    for values in losses.T:
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        span = float(sorted_values[-1] - sorted_values[0])
+        distances[order[[0, -1]]] = float("inf")
+        gaps = sorted_values[2:] - sorted_values[:-2]
+        distances[order[1:-1]] += gaps / span if span else gaps
+    return distances
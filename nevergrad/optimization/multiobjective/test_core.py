@@ -133,3 +133,4 @@ def test_doc_multiobjective() -> None:
     assert len(optimizer.pareto_front(2, "hypervolume")) == 2
     assert len(optimizer.pareto_front(2, "random")) == 2
     assert len(optimizer.pareto_front(2, "EPS")) == 2
+    assert len(optimizer.pareto_front(2, "crowding")) == 2
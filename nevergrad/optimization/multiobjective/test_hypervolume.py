@@ -10,11 +10,13 @@
 # LICENSE file in the root directory of this source tree.
 
 import numpy as np
-
+from nevergrad.common import testing
 from .hypervolume import (
     VectorNode,
     VectorLinkedList,
     HypervolumeIndicator,
+    IncrementalHypervolume,
+    compute_hypervolume,
 )
 
 
@@ -311,3 +313,49 @@ def test_reference_no_pointy() -> None:
     )
     volume = hv.compute(front)
     assert volume == -3  # not sure this is expected
+
+
+def test_compute_hypervolume_out_of_reference() -> None:
+    front = np.array([(11, 9), (9, 11)])
+    assert compute_hypervolume(front, np.array([10, 10])) == 0
+    assert compute_hypervolume(np.concatenate([front, [(5, 5)]]), np.array([10, 10])) == 25
+
+
+@testing.parametrized(**{f"{num_obj}obj": (num_obj,) for num_obj in range(1, 5)})
+def test_incremental_hypervolume(num_obj: int) -> None:
+    rng = np.random.RandomState(12)
+    reference = np.ones(num_obj)
+    for k in range(10):
+        # discrete losses for testing duplicates and ties
+        points = rng.randint(0, 5, size=(30, num_obj)) / 4.0 if k % 2 else rng.rand(30, num_obj)
+        engine = IncrementalHypervolume(reference)
+        for point in points:
+            engine.add(point)
+        expected = HypervolumeIndicator(reference).compute(engine.points) if engine.points.size else 0.0
+        np.testing.assert_almost_equal(engine.volume, expected, decimal=12)
+        np.testing.assert_almost_equal(compute_hypervolume(points, reference), expected, decimal=12)
+        if not engine.points.size:
+            continue
+        contributions = engine.contributions
+        for index, contribution in enumerate(contributions):
+            remaining = np.delete(engine.points, index, axis=0)
+            np.testing.assert_almost_equal(expected - engine.compute(remaining), contribution, decimal=12)
+        assert engine.remove(0) == contributions[0]
+        np.testing.assert_almost_equal(engine.volume, engine.compute(engine.points), decimal=12)
+
+
+@testing.parametrized(**{f"{num_obj}obj": (num_obj,) for num_obj in range(2, 5)})
+def test_incremental_hypervolume_contribution_updates(num_obj: int) -> None:
+    rng = np.random.RandomState(num_obj)
+    reference = np.ones(num_obj)
+    engine = IncrementalHypervolume(reference)
+    for k in range(60):
+        if k % 7 == 6:
+            engine.remove(rng.randint(len(engine.points)))
+        else:
+            engine.add(rng.randint(0, 9, size=num_obj) / 8.0 if k % 2 else rng.rand(num_obj))
+        volume = engine.compute(engine.points)
+        expected = [
+            volume - engine.compute(np.delete(engine.points, i, axis=0)) for i in range(len(engine.points))
+        ]
+        np.testing.assert_almost_equal(engine.contributions, expected, decimal=12)
@@ -142,3 +142,16 @@ def test_nsga2_ranking_4():
     loss_from_rank = [r.loss for r in candidates[:n_selected]]
     loss_from_sorted = [np.array(v) for v in sorted(loss_values)[:n_selected]]
     assert loss_from_rank == loss_from_sorted
+
+
+def test_select() -> None:
+    losses = np.array([[0.0, 2.0], [1.0, 1.0], [0.0, 4.0], [1.0, 3.0], [3.0, 1.0], [2.0, 3.0], [4.0, 2.0]])
+    selected, selection_ranks, fronts, distances = nsga2.select(losses, 4)
+    np.testing.assert_array_equal(selected, [0, 1, 2, 4])  # [1, 3] is the most crowded of the second front
+    np.testing.assert_array_equal(selection_ranks, [0, 0, 1, 2])
+    np.testing.assert_array_equal(fronts, [0, 0, 1, 1])
+    assert np.isinf(distances).all()
+    selected, selection_ranks, fronts, distances = nsga2.select(losses)
+    assert sorted(selected) == list(range(7))
+    np.testing.assert_array_equal(selection_ranks, range(7))
+    np.testing.assert_array_equal(distances[fronts == 1], [np.inf, np.inf, 2])
@@ -0,0 +1,59 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+import nevergrad as ng
+from nevergrad.common import testing
+from . import pareto
+from . import core
+
+
+def _naive_ranks(losses: np.ndarray, relation: str) -> np.ndarray:
+    func = pareto.dominates if relation == "pareto" else pareto.majority_dominates
+    matrix = func(losses, losses)
+    ranks = np.full(losses.shape[0], -1)
+    rank = 0
+    while True:
+        front = [i for i in range(len(ranks)) if ranks[i] < 0 and not matrix[ranks < 0, i].any()]
+        if not front:
+            return ranks
+        ranks[front] = rank
+        rank += 1
+
+
+@testing.parametrized(**{f"{num_obj}obj": (num_obj,) for num_obj in range(1, 6)})
+def test_pareto_mask_and_ranks(num_obj: int) -> None:
+    rng = np.random.RandomState(12)
+    for k in range(20):
+        # discrete losses for testing duplicates and ties
+        losses = rng.randint(0, 4, size=(30, num_obj)).astype(float) if k % 2 else rng.rand(30, num_obj)
+        losses[0, :] = np.inf
+        expected = ~pareto.dominates(losses, losses).any(axis=0)
+        np.testing.assert_array_equal(pareto.pareto_mask(losses), expected)
+        for relation in ["pareto", "majority"]:
+            ranks = pareto.non_dominated_ranks(losses, relation=relation)
+            np.testing.assert_array_equal(ranks, _naive_ranks(losses, relation))
+
+
+def test_pareto_mask_empty() -> None:
+    np.testing.assert_array_equal(pareto.pareto_mask(np.zeros((0, 3))), np.zeros(0, dtype=bool))
+    np.testing.assert_raises(ValueError, pareto.non_dominated_ranks, np.zeros((3, 2)), "blublu")
+
+
+def test_pareto_front_incremental() -> None:
+    rng = np.random.RandomState(12)
+    front = core.ParetoFront()
+    batch_front = core.ParetoFront()
+    params = []
+    for losses in rng.rand(200, 3):
+        param = ng.p.Scalar()
+        param._losses = losses
+        params.append(param)
+        front.add_to_pareto(param)
+        mask = pareto.pareto_mask(front.get_losses())
+        assert mask.all(), "Dominated points should be rejected on arrival"
+    batch_front.extend(params)
+    assert [p.uid for p in front.get_front()] == [p.uid for p in batch_front.get_front()]
+    np.testing.assert_array_equal(front.get_losses(), batch_front.get_losses())
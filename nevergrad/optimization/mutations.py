@@ -135,9 +135,11 @@ class Mutator:
         """Apply a roulette tournament selection."""
         if num is None:
             num = int(0.999 + np.sqrt(len(archive)))
+        archive = utils.ArrayArchive.from_archive(archive)
         # the following sort makes the line deterministic, and function seedable, at the cost of complexity!
-        my_keys = sorted(archive.bytesdict.keys())
-        my_keys_indices = self.random_state.choice(len(my_keys), size=min(num, len(my_keys)), replace=False)
-        my_keys = [my_keys[i] for i in my_keys_indices]
+        # (sorting rows as raw bytes, exactly as bytes keys would be sorted)
+        points = np.ascontiguousarray(archive.points)
+        rows = np.argsort(points.view(np.dtype((np.void, points.shape[1] * points.itemsize))).ravel())
+        selected = rows[self.random_state.choice(len(rows), size=min(num, len(rows)), replace=False)]
         # best pessimistic value in a random set of keys
-        return np.frombuffer(min(my_keys, key=lambda x: archive.bytesdict[x].pessimistic_confidence_bound))
+        return archive.points[selected[np.argmin(archive.estimations("pessimistic")[selected])]].copy()
@@ -5,7 +5,6 @@
 
 import copy
 import numpy as np
-from scipy.spatial import ConvexHull  # pylint: disable=no-name-in-module
 import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter as p
 from nevergrad.parametrization import transforms as trans
@@ -20,6 +19,8 @@ from . import utils
 def convex_limit(struct_points: np.ndarray) -> int:
     """Given points in order from best to worst,
     Returns the length of the maximum initial segment of points such that quasiconvexity is verified."""
+    from scipy.spatial import ConvexHull  # pylint: disable=no-name-in-module
+
     points: tp.List[float] = []
     d = len(struct_points[0])
     if len(struct_points) < 2 * d + 2:
@@ -47,6 +48,8 @@ def convex_limit(struct_points: np.ndarray) -> int:
 
 def hull_center(points: np.ndarray, k: int) -> np.ndarray:
     """Center of the cuboid enclosing the hull."""
+    from scipy.spatial import ConvexHull  # pylint: disable=no-name-in-module
+
     hull = ConvexHull(points[:k])
     maxi = np.asarray(hull.vertices[0])
     mini = np.asarray(hull.vertices[0])
@@ -68,28 +71,25 @@ def avg_of_k_best(archive: utils.Archive[utils.MultiValue], method: str = "dimfo
         If exp, we use the Lmeunier method, i.e. k=max(1, len(archiv) // (2**dimension))
         If hull, we use the maximum k <= dimfourth-value, such that the function looks quasiconvex on the k best points.
     """
-    items = list(archive.items_as_arrays())
-    dimension = len(items[0][0])
+    archive = utils.ArrayArchive.from_archive(archive)
+    dimension = archive.points.shape[1]
+    sorted_points = archive.points[np.argsort(archive.estimations("pessimistic"), kind="stable")]
     if method == "dimfourth":
         k = min(len(archive) // 4, dimension)  # fteytaud heuristic.
     elif method == "exp":
         k = max(1, int(len(archive) // (1.1**dimension)))
     elif method == "hull":
-        k = convex_limit(
-            np.concatenate(
-                sorted(items, key=lambda indiv: archive[indiv[0]].get_estimation("pessimistic")), axis=0
-            )
-        )
+        # each point is repeated twice to match the former interleaved (point, value) layout
+        k = convex_limit(np.repeat(sorted_points, 2, axis=0))
         k = min(len(archive) // 4, min(k, int(len(archive) / (1.1**dimension))))
         # We might investigate the possibility to return the middle of the convex hull instead of averaging:
-        # return hull_center(np.concatenate(sorted(items, key=lambda indiv: archive[indiv[0]].get_estimation("pessimistic")), axis=0), k)
+        # return hull_center(sorted_points, k)
     else:
         raise ValueError(f"{method} not implemented as a method for choosing k in avg_of_k_best.")
     k = 1 if k < 1 else int(k)
-    # Wasted time.
-    first_k_individuals = sorted(items, key=lambda indiv: archive[indiv[0]].get_estimation("pessimistic"))[:k]
+    first_k_individuals = sorted_points[:k]
     assert len(first_k_individuals) == k
-    return np.array(sum(p[0] for p in first_k_individuals) / k)
+    return first_k_individuals.sum(axis=0) / k  # type: ignore
 
 
 # # # # # classes of optimizers # # # # #
@@ -106,6 +106,17 @@ class OneShotOptimizer(base.Optimizer):
             out.set_standardized_data(self._internal_ask())
         return out
 
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        return self._sequential_ask_batch(n)
+
+    def _candidate_from_batch(self, data: np.ndarray, info: tp.Any) -> p.Parameter:
+        if isinstance(info, p.Parameter):
+            return info
+        out = self.parametrization.spawn_child()
+        with p.helpers.deterministic_sampling(out):
+            out.set_standardized_data(data)
+        return out
+
 
 # Recentering or center-based counterparts of the original Nevergrad oneshot optimizers:
 # - Quasi-opposite counterpart of a sampling = one sample out of 2 is the symmetric of the previous one,
@@ -156,16 +167,7 @@ class _RandomSearch(OneShotOptimizer):
         if self.middle_point and not self._num_ask:
             self._opposable_data = np.zeros(self.dimension)
             return self._opposable_data
-        scale = self.scale
-        if isinstance(scale, str) and scale == "auto":
-            # Some variants use a rescaling depending on the budget and the dimension (1st version).
-            assert self.budget is not None
-            scale = (1 + np.log(self.budget)) / (4 * np.log(self.dimension))
-        if isinstance(scale, str) and scale == "autotune":
-            assert self.budget is not None
-            scale = np.sqrt(np.log(self.budget) / self.dimension)
-        if isinstance(scale, str) and scale == "random":
-            scale = np.exp(self._rng.normal(0.0, 1.0) - 2.0) / np.sqrt(self.dimension)
+        scale = self._get_scale()
         # sample the new point
         if self.sampler == "gaussian":
             point = self._rng.normal(0, 1, self.dimension)
@@ -178,6 +180,33 @@ class _RandomSearch(OneShotOptimizer):
         self._opposable_data = scale * point  # type: ignore
         return self._opposable_data  # type: ignore
 
+    def _get_scale(self, size: tp.Optional[int] = None) -> tp.Any:
+        """Scale of the sampled points (an array of shape (size, 1) for "random" scale if size is provided)"""
+        scale = self.scale
+        if isinstance(scale, str) and scale == "auto":
+            # Some variants use a rescaling depending on the budget and the dimension (1st version).
+            assert self.budget is not None
+            scale = (1 + np.log(self.budget)) / (4 * np.log(self.dimension))
+        if isinstance(scale, str) and scale == "autotune":
+            assert self.budget is not None
+            scale = np.sqrt(np.log(self.budget) / self.dimension)
+        if isinstance(scale, str) and scale == "random":
+            normal = self._rng.normal(0.0, 1.0, size=None if size is None else (size, 1))
+            scale = np.exp(normal - 2.0) / np.sqrt(self.dimension)
+        return scale
+
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        if self.opposition_mode is not None or self.sampler not in ("gaussian", "cauchy"):
+            return super()._internal_ask_batch(n)
+        first = np.zeros((1 if self.middle_point and not self._num_ask and n else 0, self.dimension))
+        num = n - len(first)
+        scale = self._get_scale(num)
+        if self.sampler == "gaussian":
+            points = self._rng.normal(0, 1, size=(num, self.dimension))
+        else:
+            points = self._rng.standard_cauchy(size=(num, self.dimension))
+        return np.concatenate([first, scale * points], axis=0)  # type: ignore
+
     def _internal_provide_recommendation(self) -> tp.Optional[tp.ArrayLike]:
         if self.stupid:
             return self._internal_ask()
@@ -246,6 +275,8 @@ RandomSearchPlusMiddlePoint = RandomSearchMaker(middle_point=True).set_name(
 
 
 class _SamplingSearch(OneShotOptimizer):
+    _BLOCK_SIZE = 2**16  # approximate number of coordinates drawn at once for low discrepancy sequences
+
     def __init__(
         self,
         parametrization: IntOrParameter,
@@ -265,6 +296,7 @@ class _SamplingSearch(OneShotOptimizer):
         self._sampler_instance: tp.Optional[sequences.Sampler] = None
         self._rescaler: tp.Optional[sequences.Rescaler] = None
         self._opposable_data: tp.Optional[np.ndarray] = None
+        self._samples_buffer = np.zeros((0, self.dimension))
         self._sampler = sampler
         self.opposition_mode = opposition_mode
         self.middle_point = middle_point
@@ -296,10 +328,28 @@ class _SamplingSearch(OneShotOptimizer):
             )
             assert self._sampler_instance is not None
             if self.rescaled:
-                self._rescaler = sequences.Rescaler(self.sampler)
+                assert internal_budget is not None, "Rescaling requires a budget"
+                self._rescaler = sequences.Rescaler(self._sampler_instance.draw_batch(internal_budget))
                 self._sampler_instance.reinitialize()  # sampler was consumed by the scaler
         return self._sampler_instance
 
+    def _draw_samples(self, num: int) -> np.ndarray:
+        """Draws num samples from the sampler. Low discrepancy sequences are drawn by
+        vectorized blocks, which are buffered for the following asks.
+        """
+        sampler = self.sampler
+        if not isinstance(sampler, sequences.HaltonSampler):  # other samplers may share the rng
+            return sampler.draw_batch(num)
+        missing = num - len(self._samples_buffer)
+        if missing > 0:
+            remaining = np.inf if sampler.budget is None else sampler.budget - sampler.index
+            block = max(missing, min(remaining, max(1, self._BLOCK_SIZE // max(1, self.dimension))))
+            block_samples = sampler.draw_batch(int(block))
+            self._samples_buffer = np.concatenate([self._samples_buffer, block_samples], axis=0)
+        samples = self._samples_buffer[:num]
+        self._samples_buffer = self._samples_buffer[num:]
+        return samples
+
     def _internal_ask(self) -> tp.ArrayLike:
         # pylint: disable=not-callable
         if self.middle_point and not self._num_ask:
@@ -311,9 +361,15 @@ class _SamplingSearch(OneShotOptimizer):
             data *= -(self._rng.uniform(0.0, 1.0) if mode == "quasi" else 1.0)
             self._opposable_data = None
             return data
-        sample = self.sampler()
+        sample = self._draw_samples(1)[0]
         if self._rescaler is not None:
             sample = self._rescaler.apply(sample)
+        self._update_normalizer()
+        self._opposable_data = self._normalizer.backward(sample)
+        assert self._opposable_data is not None
+        return self._opposable_data
+
+    def _update_normalizer(self) -> None:
         if self.autorescale is True or self.autorescale == "auto":
             assert self.budget is not None
             self.scale = (1 + np.log(self.budget)) / (4 * np.log(self.dimension))
@@ -327,9 +383,15 @@ class _SamplingSearch(OneShotOptimizer):
         # hack since scale is not defined before the first hack (TODO: refactor)
         self._normalizer.unbounded_transform = transf
 
-        self._opposable_data = self._normalizer.backward(sample)
-        assert self._opposable_data is not None
-        return self._opposable_data
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        if self.opposition_mode is not None:
+            return super()._internal_ask_batch(n)
+        first = np.zeros((1 if self.middle_point and not self._num_ask and n else 0, self.dimension))
+        samples = self._draw_samples(n - len(first))
+        if self._rescaler is not None:
+            samples = self._rescaler.apply(samples)
+        self._update_normalizer()
+        return np.concatenate([first, self._normalizer.backward(samples)], axis=0)
 
     def _internal_provide_recommendation(self) -> tp.Optional[tp.ArrayLike]:
         if self.archive and self.recommendation_rule == "average_of_best":
@@ -3,14 +3,14 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 import math
+import weakref
 import logging
+import importlib.util
 import itertools
+import multiprocessing
 from collections import deque
 import warnings
 import numpy as np
-import scipy.ndimage as ndimage
-from bayes_opt import UtilityFunction
-from bayes_opt import BayesianOptimization
 import nevergrad.common.typing as tp
 from nevergrad.common import errors
 from nevergrad.parametrization import parameter as p
@@ -21,8 +21,10 @@ from nevergrad.parametrization import _datalayers
 from . import oneshot
 from . import base
 from . import mutations
+from . import gaussianprocess
 from .metamodel import MetaModelFailure as MetaModelFailure
 from .metamodel import learn_on_k_best as learn_on_k_best
+from .metamodel import QuadraticSurrogate as QuadraticSurrogate
 from .base import registry as registry
 from .base import addCompare  # pylint: disable=unused-import
 from .base import IntOrParameter
@@ -36,10 +38,19 @@ from .es import *  # type: ignore  # noqa: F403
 from .oneshot import *  # noqa: F403
 from .recastlib import *  # noqa: F403
 
-try:
-    from .externalbo import HyperOpt  # pylint: disable=unused-import
-except ModuleNotFoundError:
-    pass
+# optimizers relying on heavy optional dependencies: (owning module, required package)
+# their modules are only imported when the optimizers are first accessed
+_LAZY_OPTIMIZERS = {"HyperOpt": ("nevergrad.optimization.externalbo", "hyperopt")}
+for _name, (_module, _package) in _LAZY_OPTIMIZERS.items():
+    if importlib.util.find_spec(_package) is not None:
+        registry.register_lazy(_name, _module)
+
+
+def __getattr__(name: str) -> tp.Any:
+    if name in _LAZY_OPTIMIZERS and name in registry:
+        return registry[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +59,8 @@ logger = logging.getLogger(__name__)
 
 
 def smooth_copy(array: p.Array, possible_radii: tp.List[int] = None) -> p.Array:
+    import scipy.ndimage as ndimage
+
     candidate = array.spawn_child()
     if possible_radii is None:
         possible_radii = [3]
@@ -454,6 +467,7 @@ class _CMA(base.Optimizer):
         self._to_be_told: tp.List[p.Parameter] = []
         self._num_spawners = self._popsize // 2  # experimental, for visualization
         self._parents = [self.parametrization]
+        self._surrogate = QuadraticSurrogate(self.dimension)  # for high_speed recommendations
         # delay initialization to ease implementation of variants
         self._es: tp.Any = None
 
@@ -515,15 +529,35 @@ class _CMA(base.Optimizer):
         if len(self._to_be_told) >= self.es.popsize:
             listx = [c._meta[self._CACHE_KEY] for c in self._to_be_told]
             listy = [c.loss for c in self._to_be_told]
-            args = (listy, listx) if self._config.fcmaes else (listx, listy)
-            try:
-                self.es.tell(*args)
-            except (RuntimeError, AssertionError):
-                pass
-            else:
+            if self._tell_es(listx, listy):
                 self._parents = sorted(self._to_be_told, key=base._loss)[: self._num_spawners]
             self._to_be_told = []
 
+    def _tell_es(self, listx: tp.List[np.ndarray], listy: tp.List[tp.Any]) -> bool:
+        """Tells a full population to the underlying CMA, returns False if it failed"""
+        args = (listy, listx) if self._config.fcmaes else (listx, listy)
+        try:
+            self.es.tell(*args)
+        except (RuntimeError, AssertionError):
+            return False
+        return True
+
+    def _internal_ask_batch(self, n: int) -> np.ndarray:
+        while len(self._to_be_asked) < n:
+            self._to_be_asked.extend(self.es.ask())
+        return np.array([self._to_be_asked.popleft() for _ in range(n)])
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        popsize = self.es.popsize
+        # complete the pending population through the standard pipeline
+        start = min(len(data), -len(self._to_be_told) % popsize)
+        super()._internal_tell_batch(data[:start], losses[:start], infos[:start])
+        # then provide full populations directly to the underlying CMA
+        end = start + popsize * ((len(data) - start) // popsize)
+        for k in range(start, end, popsize):
+            self._tell_es(list(data[k : k + popsize]), losses[k : k + popsize].tolist())
+        super()._internal_tell_batch(data[end:], losses[end:], infos[end:])
+
     def _internal_provide_recommendation(self) -> np.ndarray:
         pessimistic = self.current_bests["pessimistic"].parameter.get_standardized_data(
             reference=self.parametrization
@@ -533,7 +567,7 @@ class _CMA(base.Optimizer):
         sample_size = int(d * d / 2 + d / 2 + 3)
         if self._config.high_speed and n >= sample_size:
             try:
-                data = learn_on_k_best(self.archive, sample_size)
+                data = learn_on_k_best(self.archive, sample_size, surrogate=self._surrogate)
                 return data  # type: ignore
             except MetaModelFailure:  # Failures in the metamodeling can happen.
                 pass
@@ -662,6 +696,12 @@ class ChoiceBase(base.Optimizer):
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         self.optim.tell(candidate, loss)
 
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        return self.optim.ask_batch(n)
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        self.optim.tell_batch(data, losses)
+
     def recommend(self) -> p.Parameter:
         return self.optim.recommend()
 
@@ -849,6 +889,28 @@ class MEDA(EDA):
     _COVARIANCE_MEMORY = True
 
 
+class _BatchChild(tp.NamedTuple):
+    """Light record of a told child, for optimizers supporting tell_batch"""
+
+    data: np.ndarray
+    loss: float
+    sigma: tp.Any
+    parameter: tp.Optional[p.Parameter] = None
+
+
+def _merge_children(
+    children: tp.List[p.Parameter], batch_children: tp.List[_BatchChild], reference: p.Parameter
+) -> tp.List[_BatchChild]:
+    """Merges children told through tell and tell_batch and sorts them by loss"""
+    records = [
+        _BatchChild(c.get_standardized_data(reference=reference), base._loss(c), c._meta["sigma"], c)
+        for c in children
+    ]
+    records.extend(batch_children)
+    records.sort(key=lambda c: c.loss)
+    return records
+
+
 class _TBPSA(base.Optimizer):
     """Test-based population-size adaptation.
 
@@ -880,6 +942,7 @@ class _TBPSA(base.Optimizer):
             self.parametrization
         ]  # for transfering heritage (checkpoints in PBT)
         self.children: tp.List[p.Parameter] = []
+        self._batch_children: tp.List[_BatchChild] = []  # children told through tell_batch
 
     def recommend(self) -> p.Parameter:
         if self.naive:
@@ -901,23 +964,43 @@ class _TBPSA(base.Optimizer):
         candidate._meta["sigma"] = mutated_sigma
         return candidate
 
+    def _internal_ask_batch(self, n: int) -> np.ndarray:
+        sigmas = self.sigma * np.exp(self._rng.normal(0, 1, size=n) / np.sqrt(self.dimension))
+        data = self.current_center + sigmas[:, None] * self._rng.normal(0, 1, size=(n, self.dimension))
+        for x, sigma in zip(data, sigmas):
+            self._register_batch_row(x, sigma)
+        return data
+
+    def _candidate_from_batch(self, data: np.ndarray, info: tp.Any) -> p.Parameter:
+        candidate = super()._candidate_from_batch(data, info)
+        if info is not None and not isinstance(info, p.Parameter):
+            candidate.heritage["lineage"] = candidate.uid
+            candidate._meta["sigma"] = info
+        return candidate
+
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         self.popsize.add_value(loss)
         self.children.append(candidate)
-        if len(self.children) >= self.popsize.llambda:
-            # Sorting the population.
-            self.children.sort(key=base._loss)
-            # Computing the new parent.
+        if len(self.children) + len(self._batch_children) >= self.popsize.llambda:
+            self._update_population()
 
-            self.parents = self.children[: self.popsize.mu]
-            self.children = []
-            self.current_center = (
-                sum(  # type: ignore
-                    c.get_standardized_data(reference=self.parametrization) for c in self.parents
-                )
-                / self.popsize.mu
-            )
-            self.sigma = np.exp(np.sum(np.log([c._meta["sigma"] for c in self.parents])) / self.popsize.mu)
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        for x, loss, sigma in zip(data, losses, infos):
+            self.popsize.add_value(loss)
+            self._batch_children.append(_BatchChild(x, loss, sigma))
+            if len(self.children) + len(self._batch_children) >= self.popsize.llambda:
+                self._update_population()
+
+    def _update_population(self) -> None:
+        # Sorting the population.
+        children = _merge_children(self.children, self._batch_children, reference=self.parametrization)
+        # Computing the new parent.
+        selected = children[: self.popsize.mu]
+        self.parents = [c.parameter for c in selected if c.parameter is not None] or [self.parametrization]
+        self.children = []
+        self._batch_children = []
+        self.current_center = sum(c.data for c in selected) / self.popsize.mu  # type: ignore
+        self.sigma = np.exp(np.sum(np.log([c.sigma for c in selected])) / self.popsize.mu)
 
     def _internal_tell_not_asked(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         data = candidate.get_standardized_data(reference=self.parametrization)
@@ -1470,6 +1553,133 @@ class NoisySplit(base.ConfiguredOptimizer):
         super().__init__(ConfOpt, kwargs)
 
 
+def _run_optimizer_process(connection: tp.Any, optimizer: base.Optimizer, seed: int) -> None:
+    """Loop processing the ask/tell messages of an _OptimizerProcess, in the child process.
+    Each message gets a ("ok", output) or ("error", exception) reply.
+    """
+    optimizer.parametrization.random_state.seed(seed)  # avoid identical copies of the random state
+    candidates: tp.Dict[str, p.Parameter] = {}
+    while True:
+        message = connection.recv()
+        if message[0] == "close":
+            break
+        try:
+            if message[0] == "ask":
+                if message[1] is not None:  # suggestion value
+                    optimizer._suggestions.append(optimizer.parametrization.spawn_child(new_value=message[1]))
+                candidate = optimizer.ask()
+                candidates[candidate.uid] = candidate
+                connection.send(("ok", (candidate.uid, candidate.value)))
+            elif message[0] == "tell":
+                _, uid, value, loss = message
+                if uid is not None:
+                    candidate = candidates.pop(uid)
+                else:
+                    candidate = optimizer.parametrization.spawn_child(new_value=value)
+                optimizer.tell(candidate, loss)
+                connection.send(("ok", None))
+        except Exception as e:  # pylint: disable=broad-except
+            connection.send(("error", e))  # raised in the main process
+    connection.close()
+
+
+def _close_optimizer_process(connection: tp.Any, process: tp.Any) -> None:
+    try:
+        connection.send(("close",))
+    except (BrokenPipeError, OSError):
+        pass
+    process.join(timeout=10)
+
+
+class _OptimizerProcess:
+    """Runs an optimizer in a separate process, and exposes the subset of the optimizer API
+    which is used by Portfolio (ask, tell and counters).
+    Candidates are exchanged as values and losses as floats. Asks are synchronous round trips
+    to the process, while tells can be sent without waiting for their processing (see send_tell
+    and receive_tells), so that several processes can process the same tell in parallel.
+
+    Note
+    ----
+    - the process has its own copy of the parametrization, with a random state reseeded
+      from the random state of the main process when starting it.
+    - errors raised in the process are raised in the main process, in ask or receive_tells.
+    """
+
+    def __init__(self, optimizer: base.Optimizer) -> None:
+        self.parametrization = optimizer.parametrization
+        self.name = optimizer.name
+        self.budget = optimizer.budget
+        self.num_workers = optimizer.num_workers
+        self.no_parallelization = optimizer.no_parallelization
+        self.num_ask = optimizer.num_ask
+        self.num_tell = optimizer.num_tell
+        self.num_tell_not_asked = optimizer.num_tell_not_asked
+        self._suggestions: tp.Deque[p.Parameter] = deque()
+        self._uids: tp.Dict[str, str] = {}  # uid in this process -> uid in the child process
+        self._pending_tells: tp.Deque[bool] = deque()  # whether each sent tell is a tell-not-asked
+        seed = int(self.parametrization.random_state.randint(2**32, dtype=np.uint32))
+        self._connection, child_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_run_optimizer_process, args=(child_connection, optimizer, seed), daemon=True
+        )
+        process.start()
+        child_connection.close()
+        self._finalizer = weakref.finalize(self, _close_optimizer_process, self._connection, process)
+
+    def ask(self) -> p.Parameter:
+        self.receive_tells()
+        suggestion = self._suggestions.popleft().value if self._suggestions else None
+        self._connection.send(("ask", suggestion))
+        status, output = self._connection.recv()
+        if status == "error":
+            raise output
+        uid, value = output
+        # the value is provided since rebuilding it from the data is not deterministic for some parameters
+        candidate = self.parametrization.spawn_child(new_value=value)
+        self._uids[candidate.uid] = uid
+        self.num_ask += 1
+        return candidate
+
+    def tell(self, candidate: p.Parameter, loss: tp.Loss) -> None:
+        self.send_tell(candidate, loss)
+        self.receive_tells()
+
+    def send_tell(self, candidate: p.Parameter, loss: tp.Loss) -> None:
+        """Sends a tell to the process without waiting for its processing,
+        receive_tells must then be called to collect its outcome
+        """
+        uid = self._uids.pop(candidate.uid, None)
+        value = None if uid is not None else candidate.value
+        self._connection.send(("tell", uid, value, loss))
+        self._pending_tells.append(uid is None)
+
+    def receive_tells(self) -> None:
+        """Waits for the processing of all the tells which were sent, and raises the
+        first error which occurred in the process if any
+        """
+        error: tp.Optional[Exception] = None
+        while self._pending_tells:
+            not_asked = self._pending_tells.popleft()
+            status, output = self._connection.recv()
+            if status == "error":
+                error = output if error is None else error
+                continue
+            self.num_tell += 1
+            self.num_tell_not_asked += not_asked
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Stops the child process"""
+        self._finalizer()
+
+    def enable_pickling(self) -> None:
+        raise errors.NevergradRuntimeError("Optimizers running in a separate process cannot be pickled")
+
+    def __getstate__(self) -> None:
+        self.enable_pickling()
+
+
 class ConfPortfolio(base.ConfiguredOptimizer):
     """Alternates :code:`ask()` on several optimizers
 
@@ -1479,11 +1689,19 @@ class ConfPortfolio(base.ConfiguredOptimizer):
         the list of optimizers to use.
     warmup_ratio: optional float
         ratio of the budget used before choosing to focus on one optimizer
+    processes: bool
+        whether to run each sub-optimizer in its own process. Tells are then processed
+        in parallel by the sub-optimizers, which helps when their bookkeeping is costly
+        (eg: many CMA instances with high budget). Asks are still synchronous round trips
+        to the processes, and are not parallelized.
 
     Notes
     -----
     - if providing an initialized  optimizer, the parametrization of the optimizer
       must be the exact same instance as the one of the Portfolio.
+    - with processes=True, candidates are rebuilt from their value in the main process,
+      each sub-optimizer has its own copy of the random state (reseeded from the
+      random state of the Portfolio), and the optimizer cannot be pickled.
     - this API is temporary and will be renamed very soon
     """
 
@@ -1493,9 +1711,11 @@ class ConfPortfolio(base.ConfiguredOptimizer):
         *,
         optimizers: tp.Sequence[tp.Union[base.Optimizer, base.OptCls, str]] = (),
         warmup_ratio: tp.Optional[float] = None,
+        processes: bool = False,
     ) -> None:
         self.optimizers = optimizers
         self.warmup_ratio = warmup_ratio
+        self.processes = processes
         super().__init__(Portfolio, locals(), as_config=True)
 
 
@@ -1522,7 +1742,7 @@ class Portfolio(base.Optimizer):
             if budget is not None:  # needs a budget
                 optimizers.append("ScrHammersleySearch")
         num = len(optimizers)
-        self.optims: tp.List[base.Optimizer] = []
+        optims: tp.List[base.Optimizer] = []
         sub_budget = None if budget is None else budget // num + (budget % num > 0)
         sub_workers = 1
         if distribute_workers:
@@ -1534,17 +1754,20 @@ class Portfolio(base.Optimizer):
                         "Initialized optimizers are only accepted if "
                         "the parametrization object is strictly the same"
                     )
-                self.optims.append(opt)
+                optims.append(opt)
                 continue
             Optim: base.OptCls = registry[opt] if isinstance(opt, str) else opt
             assert sub_workers == 1 or not Optim.no_parallelization
-            self.optims.append(
+            optims.append(
                 Optim(
                     self.parametrization,  # share parametrization and its rng
                     budget=sub_budget,
                     num_workers=sub_workers,
                 )
             )
+        self.optims: tp.List[tp.Union[base.Optimizer, _OptimizerProcess]] = list(optims)
+        if cfg.processes:
+            self.optims = [_OptimizerProcess(opt) for opt in optims]
         # current optimizer choice
         self._current = -1
         self._warmup_budget: tp.Optional[int] = None
@@ -1586,13 +1809,24 @@ class Portfolio(base.Optimizer):
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         # Telling all optimizers is presumably better than just
         # self.optims[optim_index].tell(candidate, value)
+        for opt in self.optims:
+            if isinstance(opt, _OptimizerProcess):
+                opt.send_tell(candidate, loss)  # processed in parallel by the processes
         accepted = 0
+        error: tp.Optional[Exception] = None
         for opt in self.optims:
             try:
-                opt.tell(candidate, loss)
+                if isinstance(opt, _OptimizerProcess):
+                    opt.receive_tells()
+                else:
+                    opt.tell(candidate, loss)
                 accepted += 1
             except errors.TellNotAskedNotSupportedError:
                 pass
+            except Exception as e:  # pylint: disable=broad-except
+                error = e if error is None else error  # collect the other replies first
+        if error is not None:
+            raise error
         if not accepted:
             raise errors.TellNotAskedNotSupportedError("No sub-optimizer accepted the tell-not-asked")
 
@@ -1641,6 +1875,7 @@ class _MetaModel(base.Optimizer):
         self._optim = multivariate_optimizer(
             self.parametrization, budget, num_workers
         )  # share parametrization and its rng
+        self._surrogate = QuadraticSurrogate(self.dimension)  # updated incrementally along the optimization
 
     def _internal_ask_candidate(self) -> p.Parameter:
         # We request a bit more points than what is really necessary for our dimensionality (+dimension).
@@ -1648,7 +1883,7 @@ class _MetaModel(base.Optimizer):
         freq = max(13, self.num_workers, self.dimension, int(self.frequency_ratio * sample_size))
         if len(self.archive) >= sample_size and not self._num_ask % freq:
             try:
-                data = learn_on_k_best(self.archive, sample_size)
+                data = learn_on_k_best(self.archive, sample_size, surrogate=self._surrogate)
                 candidate = self.parametrization.spawn_child().set_standardized_data(data)
             except MetaModelFailure:  # The optimum is at infinity. Shit happens.
                 candidate = self._optim.ask()
@@ -1862,11 +2097,17 @@ class _BO(base.Optimizer):
         utility_kappa: float = 2.576,
         utility_xi: float = 0.0,
         gp_parameters: tp.Optional[tp.Dict[str, tp.Any]] = None,
+        backend: str = "bayes_opt",
     ) -> None:
         super().__init__(parametrization, budget=budget, num_workers=num_workers)
         self._normalizer = p.helpers.Normalizer(self.parametrization)
-        self._bo: tp.Optional[BayesianOptimization] = None
+        self._bo: tp.Optional[tp.Any] = None  # bayes_opt.BayesianOptimization
         self._fake_function = _FakeFunction(num_digits=len(str(self.dimension)))
+        # native backend
+        self._backend = backend
+        self._gp: tp.Optional[gaussianprocess.GaussianProcess] = None
+        self._probes: tp.Deque[np.ndarray] = deque()  # initialization points
+        self._pending: tp.Dict[str, np.ndarray] = {}  # asked but not told yet
         # initialization
         init = initialization
         self._init_budget = init_budget
@@ -1882,6 +2123,11 @@ class _BO(base.Optimizer):
         self.utility_kappa = utility_kappa
         self.utility_xi = utility_xi
         self.gp_parameters = {} if gp_parameters is None else gp_parameters
+        if backend == "native" and not set(self.gp_parameters).issubset({"alpha", "refit_ratio"}):
+            raise ValueError(
+                "The native backend only supports 'alpha' and 'refit_ratio' gp_parameters "
+                f"(got {self.gp_parameters})"
+            )
         if isinstance(parametrization, p.Parameter) and self.gp_parameters.get("alpha", 0) == 0:
             analysis = p.helpers.analyze(parametrization)
             noisy = not analysis.deterministic
@@ -1896,43 +2142,82 @@ class _BO(base.Optimizer):
                 )
 
     @property
-    def bo(self) -> BayesianOptimization:
+    def bo(self) -> tp.Any:  # bayes_opt.BayesianOptimization
         if self._bo is None:
+            from bayes_opt import BayesianOptimization
+
             bounds = {self._fake_function.key(i): (0.0, 1.0) for i in range(self.dimension)}
             self._bo = BayesianOptimization(self._fake_function, bounds, random_state=self._rng)
-            if self._init_budget is None:
-                assert self.budget is not None
-                init_budget = int(np.sqrt(self.budget))
-            else:
-                init_budget = self._init_budget
-            init_budget = max(2, init_budget)
             if self.gp_parameters is not None:
                 self._bo.set_gp_params(**self.gp_parameters)
-            # init
-            if self._middle_point:
-                self._bo.probe([0.5] * self.dimension, lazy=True)
-                init_budget -= 1
-            if self._InitOpt is not None and init_budget > 0:
-                param = p.Array(shape=(self.dimension,)).set_bounds(lower=0, upper=1)
-                param.random_state = self._rng
-                opt = self._InitOpt(param, budget=init_budget)
-                for _ in range(init_budget):
-                    self._bo.probe(opt.ask().value, lazy=True)
-            else:  # default
-                for _ in range(init_budget):
-                    self._bo.probe(self._bo._space.random_sample(), lazy=True)
+            for x in self._initial_probes(self._bo._space.random_sample):
+                self._bo.probe(x, lazy=True)
         return self._bo
 
+    @property
+    def gp(self) -> gaussianprocess.GaussianProcess:
+        if self._gp is None:
+            self._gp = gaussianprocess.GaussianProcess(self.dimension, **self.gp_parameters)
+            probes = self._initial_probes(lambda: self._rng.uniform(0, 1, size=self.dimension))
+            self._probes.extend(np.array(x, dtype=float) for x in probes)
+        return self._gp
+
+    def _initial_probes(self, random_sample: tp.Callable[[], tp.ArrayLike]) -> tp.List[tp.ArrayLike]:
+        """Points in [0, 1]^dimension to evaluate before using the Gaussian process"""
+        if self._init_budget is None:
+            assert self.budget is not None
+            init_budget = int(np.sqrt(self.budget))
+        else:
+            init_budget = self._init_budget
+        init_budget = max(2, init_budget)
+        probes: tp.List[tp.ArrayLike] = []
+        if self._middle_point:
+            probes.append([0.5] * self.dimension)
+            init_budget -= 1
+        if self._InitOpt is not None and init_budget > 0:
+            param = p.Array(shape=(self.dimension,)).set_bounds(lower=0, upper=1)
+            param.random_state = self._rng
+            opt = self._InitOpt(param, budget=init_budget)
+            probes.extend(opt.ask().value for _ in range(init_budget))
+        else:  # default
+            probes.extend(random_sample() for _ in range(init_budget))
+        return probes
+
+    def _native_suggest(self) -> np.ndarray:
+        gp = self.gp
+        if self._probes:
+            return self._probes.popleft()
+        if len(gp) < 2:
+            return self._rng.uniform(0, 1, size=self.dimension)  # type: ignore
+        if self._pending:  # kriging believer: pending points are fantasized with the posterior mean
+            pending = np.array(list(self._pending.values()))
+            gp = gp.condition(pending, gp.predict(pending)[0])
+        return gaussianprocess.minimize_acquisition(
+            lambda x, grad: gaussianprocess.acquisition(
+                gp, x, self.utility_kind, self.utility_kappa, self.utility_xi, return_grad=grad
+            ),
+            self.dimension,
+            self._rng,
+        )
+
     def _internal_ask_candidate(self) -> p.Parameter:
-        util = UtilityFunction(kind=self.utility_kind, kappa=self.utility_kappa, xi=self.utility_xi)
-        if self.bo._queue:
-            x_probe = next(self.bo._queue)
+        x_probe: tp.ArrayLike
+        if self._backend == "native":
+            x_probe = self._native_suggest()
         else:
-            x_probe = self.bo.suggest(util)  # this is time consuming
-            x_probe = [x_probe[self._fake_function.key(i)] for i in range(len(x_probe))]
+            from bayes_opt import UtilityFunction
+
+            util = UtilityFunction(kind=self.utility_kind, kappa=self.utility_kappa, xi=self.utility_xi)
+            if self.bo._queue:
+                x_probe = next(self.bo._queue)
+            else:
+                suggestion = self.bo.suggest(util)  # this is time consuming
+                x_probe = [suggestion[self._fake_function.key(i)] for i in range(len(suggestion))]
         data = self._normalizer.backward(np.array(x_probe, copy=False))
         candidate = self.parametrization.spawn_child().set_standardized_data(data)
         candidate._meta["x_probe"] = x_probe
+        if self._backend == "native":
+            self._pending[candidate.uid] = np.array(x_probe, dtype=float)
         return candidate
 
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
@@ -1941,6 +2226,10 @@ class _BO(base.Optimizer):
         else:
             data = candidate.get_standardized_data(reference=self.parametrization)
             y = self._normalizer.forward(data)  # tell not asked
+        if self._backend == "native":
+            self._pending.pop(candidate.uid, None)
+            self.gp.add(y, loss)
+            return
         self._fake_function.register(y, -loss)  # minimizing
         self.bo.probe(y, lazy=False)
         # for some unknown reasons, BO wants to evaluate twice the same point,
@@ -1949,8 +2238,8 @@ class _BO(base.Optimizer):
         self._fake_function._registered.clear()
 
     def _internal_provide_recommendation(self) -> tp.Optional[tp.ArrayLike]:
-        if not self.archive:
-            return None
+        if not self.archive or self._backend == "native":
+            return None  # native backend: best evaluated point
         return self._normalizer.backward(
             np.array([self.bo.max["params"][self._fake_function.key(i)] for i in range(self.dimension)])
         )
@@ -1959,7 +2248,8 @@ class _BO(base.Optimizer):
 class ParametrizedBO(base.ConfiguredOptimizer):
     """Bayesian optimization.
     Hyperparameter tuning method, based on statistical modeling of the objective function.
-    This class is a wrapper over the `bayes_opt <https://github.com/fmfn/BayesianOptimization>`_ package.
+    This class is a wrapper over the `bayes_opt <https://github.com/fmfn/BayesianOptimization>`_ package,
+    or over a native Gaussian process implementation (see :code:`backend`).
 
     Parameters
     ----------
@@ -1977,6 +2267,12 @@ class ParametrizedBO(base.ConfiguredOptimizer):
         Xi parameter for the utility function
     gp_parameters: dict
         dictionnary of parameters for the gaussian process
+        (only "alpha" and "refit_ratio" for the native backend, see :code:`gaussianprocess.GaussianProcess`)
+    backend: str
+        "bayes_opt" or "native". The native backend extends the Cholesky factor of its Gaussian process in O(n^2)
+        at each tell, only refits the kernel length scale on a geometric schedule, and optimizes the acquisition
+        function with a vectorized multistart L-BFGS-B. It supports parallelization: pending points are
+        fantasized with the posterior mean (kriging believer), so that workers get distinct points.
     """
 
     no_parallelization = True
@@ -1992,11 +2288,15 @@ class ParametrizedBO(base.ConfiguredOptimizer):
         utility_kappa: float = 2.576,
         utility_xi: float = 0.0,
         gp_parameters: tp.Optional[tp.Dict[str, tp.Any]] = None,
+        backend: str = "bayes_opt",
     ) -> None:
+        assert backend in ["bayes_opt", "native"]
+        self.no_parallelization = backend != "native"
         super().__init__(_BO, locals())
 
 
 BO = ParametrizedBO().set_name("BO", register=True)
+NativeBO = ParametrizedBO(backend="native").set_name("NativeBO", register=True)
 BOSplit = ConfSplitOptimizer(max_num_vars=15, progressive=False, multivariate_optimizer=BO).set_name(
     "BOSplit", register=True
 )
@@ -2290,32 +2590,68 @@ class cGA(base.Optimizer):
         # then updates depending on the comparison with the first one. We therefore have to store the previous candidate.
         self._previous_value_candidate: tp.Optional[tp.Tuple[float, np.ndarray]] = None
 
+    def _sample(self, num: int) -> np.ndarray:
+        """Draws a (num, dimension) array of values of the variables,
+        by comparing one uniform draw per variable to the cumulated probabilities
+        """
+        cum_proba = np.cumsum(self.p, axis=1)
+        uniforms = self._rng.uniform(size=(num, self.dimension, 1))
+        # one sample at a time to avoid a (num, dimension, arity) intermediate array
+        return np.array([np.sum(u > cum_proba, axis=1) for u in uniforms]).reshape(num, self.dimension)
+
+    def _update(self, winners: np.ndarray, losers: np.ndarray) -> None:
+        """Updates the probabilities given (num_pairs, dimension) arrays of the values
+        of the winner and loser of each pair, processed in order
+        """
+        increment = 1.0 / self.llambda
+        for winner, loser in zip(winners, losers):
+            rows = np.flatnonzero(winner != loser)
+            if not rows.size:
+                continue
+            self.p[rows, winner[rows]] += increment
+            self.p[rows, loser[rows]] -= increment
+            probas = self.p[rows]
+            np.maximum(probas, increment, out=probas)
+            probas /= np.sum(probas, axis=1, keepdims=True)
+            self.p[rows] = probas
+
     def _internal_ask_candidate(self) -> p.Parameter:
         # Multinomial.
-        values: tp.List[int] = [
-            sum(self._rng.uniform() > cum_proba) for cum_proba in np.cumsum(self.p, axis=1)
-        ]
+        values = self._sample(1)[0]
         data = discretization.noisy_inverse_threshold_discretization(values, arity=self._arity, gen=self._rng)
         return self.parametrization.spawn_child().set_standardized_data(data)
 
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        values = self._sample(n)
+        return np.array(
+            [
+                discretization.noisy_inverse_threshold_discretization(v, arity=self._arity, gen=self._rng)
+                for v in values
+            ]
+        ).reshape(n, self.dimension)
+
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         data = candidate.get_standardized_data(reference=self.parametrization)
-        if self._previous_value_candidate is None:
-            self._previous_value_candidate = (loss, data)
-        else:
-            winner, loser = self._previous_value_candidate[1], data
-            if self._previous_value_candidate[0] > loss:
-                winner, loser = loser, winner
-            winner_data = discretization.threshold_discretization(np.asarray(winner.data), arity=self._arity)
-            loser_data = discretization.threshold_discretization(np.asarray(loser.data), arity=self._arity)
-            for i, _ in enumerate(winner_data):
-                if winner_data[i] != loser_data[i]:
-                    self.p[i][winner_data[i]] += 1.0 / self.llambda
-                    self.p[i][loser_data[i]] -= 1.0 / self.llambda
-                    for j in range(len(self.p[i])):
-                        self.p[i][j] = max(self.p[i][j], 1.0 / self.llambda)
-                    self.p[i] /= sum(self.p[i])
-            self._previous_value_candidate = None
+        self._internal_tell_batch(data[None, :], np.array([loss]), [None])
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        # CGA compares successive candidates by pairs
+        evaluated = list(zip(losses.tolist(), data))
+        if self._previous_value_candidate is not None:
+            evaluated.insert(0, self._previous_value_candidate)
+        self._previous_value_candidate = evaluated.pop() if len(evaluated) % 2 else None
+        if not evaluated:
+            return
+        pair_losses = np.array([e[0] for e in evaluated]).reshape(-1, 2)
+        pairs = np.array([e[1] for e in evaluated]).reshape(-1, 2, self.dimension)
+        swap = pair_losses[:, 0] > pair_losses[:, 1]  # the first candidate wins ties
+        winners = np.where(swap[:, None], pairs[:, 1], pairs[:, 0])
+        losers = np.where(swap[:, None], pairs[:, 0], pairs[:, 1])
+        winners, losers = (
+            np.array(discretization.threshold_discretization(x, arity=self._arity), dtype=int)
+            for x in (winners, losers)
+        )
+        self._update(winners, losers)
 
 
 class _EMNA(base.Optimizer):
@@ -2365,6 +2701,7 @@ class _EMNA(base.Optimizer):
         # population
         self.parents: tp.List[p.Parameter] = [self.parametrization]
         self.children: tp.List[p.Parameter] = []
+        self._batch_children: tp.List[_BatchChild] = []  # children told through tell_batch
 
     def recommend(self) -> p.Parameter:
         if self.naive:
@@ -2391,63 +2728,77 @@ class _EMNA(base.Optimizer):
         candidate._meta["sigma"] = sigma_tmp
         return candidate
 
+    def _internal_ask_batch(self, n: int) -> np.ndarray:
+        # sigma can be either a float or an array, hence a (n, 1) or (n, dimension) array of sigmas
+        sigmas = np.array([self.sigma] * n, dtype=float).reshape(n, -1)
+        if (
+            self.population_size_adaptation
+            and self.popsize.llambda < self.min_coef_parallel_context * self.dimension
+        ):
+            sigmas *= np.exp(self._rng.normal(0, 1, size=(n, 1)) / np.sqrt(self.dimension))
+        data = self.current_center + sigmas * self._rng.normal(0, 1, size=(n, self.dimension))
+        for x, sigma in zip(data, sigmas):
+            self._register_batch_row(x, sigma if np.ndim(self.sigma) else float(sigma[0]))
+        return data
+
+    def _candidate_from_batch(self, data: np.ndarray, info: tp.Any) -> p.Parameter:
+        candidate = super()._candidate_from_batch(data, info)
+        if info is not None and not isinstance(info, p.Parameter):
+            candidate.heritage["lineage"] = candidate.uid
+            candidate._meta["sigma"] = info
+        return candidate
+
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         if self.population_size_adaptation:
             self.popsize.add_value(loss)
         self.children.append(candidate)
-        if len(self.children) >= self.popsize.llambda:
-            # Sorting the population.
-            self.children.sort(key=base._loss)
-            # Computing the new parent.
-            self.parents = self.children[: self.popsize.mu]
-            self.children = []
-            self.current_center = (
-                sum(  # type: ignore
-                    c.get_standardized_data(reference=self.parametrization) for c in self.parents
-                )
-                / self.popsize.mu
-            )
+        if len(self.children) + len(self._batch_children) >= self.popsize.llambda:
+            self._update_population()
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        for x, loss, sigma in zip(data, losses, infos):
             if self.population_size_adaptation:
-                if (
-                    self.popsize.llambda < self.min_coef_parallel_context * self.dimension
-                ):  # Population size not large enough for emna
-                    self.sigma = np.exp(
-                        np.sum(
-                            np.log([c._meta["sigma"] for c in self.parents]),
-                            axis=0 if self.isotropic else None,  # type: ignore
-                        )
-                        / self.popsize.mu
-                    )
-                else:
-                    stdd = [
-                        (
-                            self.parents[i].get_standardized_data(reference=self.parametrization)
-                            - self.current_center
-                        )
-                        ** 2
-                        for i in range(self.popsize.mu)
-                    ]
-                    self.sigma = np.sqrt(
-                        np.sum(stdd) / (self.popsize.mu * (self.dimension if self.isotropic else 1))
+                self.popsize.add_value(loss)
+            self._batch_children.append(_BatchChild(x, loss, sigma))
+            if len(self.children) + len(self._batch_children) >= self.popsize.llambda:
+                self._update_population()
+
+    def _update_population(self) -> None:
+        # Sorting the population.
+        children = _merge_children(self.children, self._batch_children, reference=self.parametrization)
+        # Computing the new parent.
+        selected = children[: self.popsize.mu]
+        self.parents = [c.parameter for c in selected if c.parameter is not None] or [self.parametrization]
+        self.children = []
+        self._batch_children = []
+        self.current_center = sum(c.data for c in selected) / self.popsize.mu  # type: ignore
+        if self.population_size_adaptation:
+            if (
+                self.popsize.llambda < self.min_coef_parallel_context * self.dimension
+            ):  # Population size not large enough for emna
+                self.sigma = np.exp(
+                    np.sum(
+                        np.log([c.sigma for c in selected]),
+                        axis=0 if self.isotropic else None,  # type: ignore
                     )
+                    / self.popsize.mu
+                )
             else:
-                # EMNA update
-                stdd = [
-                    (
-                        self.parents[i].get_standardized_data(reference=self.parametrization)
-                        - self.current_center
-                    )
-                    ** 2
-                    for i in range(self.popsize.mu)
-                ]
+                stdd = [(selected[i].data - self.current_center) ** 2 for i in range(self.popsize.mu)]
                 self.sigma = np.sqrt(
-                    np.sum(stdd, axis=0 if self.isotropic else None)  # type: ignore
-                    / (self.popsize.mu * (self.dimension if self.isotropic else 1))
+                    np.sum(stdd) / (self.popsize.mu * (self.dimension if self.isotropic else 1))
                 )
+        else:
+            # EMNA update
+            stdd = [(selected[i].data - self.current_center) ** 2 for i in range(self.popsize.mu)]
+            self.sigma = np.sqrt(
+                np.sum(stdd, axis=0 if self.isotropic else None)  # type: ignore
+                / (self.popsize.mu * (self.dimension if self.isotropic else 1))
+            )
 
-            if self.num_workers / self.dimension > 32:  # faster decrease of sigma if large parallel context
-                imp = max(1, (np.log(self.popsize.llambda) / 2) ** (1 / self.dimension))
-                self.sigma /= imp
+        if self.num_workers / self.dimension > 32:  # faster decrease of sigma if large parallel context
+            imp = max(1, (np.log(self.popsize.llambda) / 2) ** (1 / self.dimension))
+            self.sigma /= imp
 
     def _internal_tell_not_asked(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         raise errors.TellNotAskedNotSupportedError
@@ -2579,6 +2930,12 @@ class NGOptBase(base.Optimizer):
     def _internal_tell_candidate(self, candidate: p.Parameter, loss: tp.FloatLoss) -> None:
         self.optim.tell(candidate, loss)
 
+    def _internal_ask_batch(self, n: int) -> tp.Optional[np.ndarray]:
+        return self.optim.ask_batch(n)
+
+    def _internal_tell_batch(self, data: np.ndarray, losses: np.ndarray, infos: tp.List[tp.Any]) -> None:
+        self.optim.tell_batch(data, losses)
+
     def recommend(self) -> p.Parameter:
         return self.optim.recommend()
 
@@ -2796,7 +3153,7 @@ class NGOpt13(NGOpt12):  # Also known as NGOpt12H
             and self.dimension < 8
             and self.budget < 80
         ):
-            return HyperOpt
+            return registry["HyperOpt"]
         else:
             return super()._select_optimizer_cls()
 
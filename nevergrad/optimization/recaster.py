@@ -247,7 +247,8 @@ class SequentialRecastOptimizer(RecastOptimizer):
     ) -> None:
         super().__init__(parametrization=parametrization, budget=budget, num_workers=num_workers)
         self._enable_pickling = False
-        self.replay_archive_tell: tp.List[p.Parameter] = []
+        # standardized data and posted loss of each tell, replayed when unpickling
+        self.replay_archive_tell: tp.List[tp.Tuple[np.ndarray, tp.Loss]] = []
 
     def enable_pickling(self):
         """Make the optimizer store its history of tells, so
@@ -287,9 +288,11 @@ class SequentialRecastOptimizer(RecastOptimizer):
         if not self._messaging_thread.is_alive():  # optimizer is done
             self._check_error()
             return
+        posted = self._post_loss(candidate, loss)
         if self._enable_pickling:
-            self.replay_archive_tell.append(candidate)
-        self._messaging_thread.messages_tell.put(self._post_loss(candidate, loss))
+            data = candidate.get_standardized_data(reference=self.parametrization)
+            self.replay_archive_tell.append((data, posted))
+        self._messaging_thread.messages_tell.put(posted)
 
     def __getstate__(self):
         if not self._enable_pickling:
@@ -308,21 +311,36 @@ class SequentialRecastOptimizer(RecastOptimizer):
         # We temporarily unset _enable_pickling so that the replays do not
         # get archived again.
         self._enable_pickling = False
-        for i, candidate in enumerate(self.replay_archive_tell):
-            new_candidate = self._internal_ask_candidate()
-            norm = np.linalg.norm(new_candidate.get_standardized_data(reference=candidate))
+        # The replay talks directly to the messaging thread (no candidate is created),
+        # as the data and posted losses were recorded at tell time.
+        if self.replay_archive_tell:
+            self._messaging_thread = MessagingThread(self.get_optimization_function())
+        for i, (data, posted) in enumerate(self.replay_archive_tell):
+            point = self._messaging_thread.messages_ask.get()
+            if isinstance(point, Exception):
+                raise point
             # Check that the replay wants the same value as we had the first time.
             # If an error is raised here then you might want to
             # check the reproducibility of your optimizer.
-            if norm > 0.00001:
+            if point is None or not self._same_point(point, data):
                 raise RuntimeError(f"Mismatch in replay at index {i} of {len(self.replay_archive_tell)}.")
-            self._internal_tell_candidate(candidate, candidate.loss)
+            self._messaging_thread.messages_tell.put(posted)
 
         if self.num_ask > self.num_tell:
             self._internal_ask_candidate()
 
         self._enable_pickling = True
 
+    def _same_point(self, point: tp.ArrayLike, data: np.ndarray) -> bool:
+        """Checks whether a point asked by the underlying optimizer corresponds to recorded standardized data"""
+        point = np.asarray(point, dtype=float)
+        if point.shape == data.shape and np.linalg.norm(point - data) <= 0.00001:
+            return True  # fast path: the data is not modified by the parametrization
+        candidate = self.parametrization.spawn_child().set_standardized_data(point)
+        return bool(
+            np.linalg.norm(candidate.get_standardized_data(reference=self.parametrization) - data) <= 0.00001
+        )
+
 
 class BatchRecastOptimizer(RecastOptimizer):
     """Recast optimizer where points to evaluate are provided in batches
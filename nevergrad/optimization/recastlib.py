@@ -9,7 +9,6 @@ import math
 import warnings
 import weakref
 import numpy as np
-from scipy import optimize as scipyoptimize
 import nevergrad.common.typing as tp
 from nevergrad.parametrization import parameter as p
 from nevergrad.common import errors
@@ -146,6 +145,8 @@ class _NonObjectMinimizeBase(recaster.SequentialRecastOptimizer):
                             best_x = weakself._normalizer.backward(np.asarray(best_x, dtype=np.float32))
                     num_calls += res[2]
             else:
+                from scipy import optimize as scipyoptimize
+
                 res = scipyoptimize.minimize(
                     objective_function,
                     best_x
@@ -56,6 +56,38 @@ class Sampler:
         self.index += 1
         return sample
 
+    def draw_batch(self, num: int) -> np.ndarray:
+        """Draws the next num samples at once
+
+        Parameters
+        ----------
+        num: int
+            number of samples to draw
+
+        Returns
+        -------
+        np.ndarray
+            the samples, as a (num, dimension) array
+        """
+        assert (
+            self.budget is None or self.index + num <= self.budget
+        ), "Over the budget (reinitialize if you want to start over)"
+        samples = self._internal_sampler_batch(num)
+        self.index += num
+        return samples
+
+    def _internal_sampler_batch(self, num: int) -> np.ndarray:
+        # default implementation: stack the samples, index must be updated since samplers rely on it
+        start = self.index
+        samples = []
+        try:
+            for k in range(num):
+                self.index = start + k
+                samples.append(np.array(self._internal_sampler(), dtype=float))
+        finally:
+            self.index = start
+        return np.array(samples) if samples else np.zeros((0, self.dimension))
+
     def __iter__(self) -> tp.Iterator[tp.ArrayLike]:  # unused, but could be useful
         assert self.index == 0, "Reinitialize before iterating again"  # backward compatibility
         assert (
@@ -180,11 +212,34 @@ class HaltonSampler(Sampler):
             vdc += float(remainder) / float(denom)
         return vdc
 
+    @staticmethod
+    def vdc_batch(indices: np.ndarray, permut: tp.ArrayLike) -> np.ndarray:
+        """Vectorized version of vdc, computing the radical inverses of an array of indices
+        digit by digit
+        """
+        permut = np.array(permut, dtype=float, copy=False)
+        base = len(permut)  # should be a prime number
+        vdc = np.zeros(len(indices), dtype=float)
+        denom = 1.0  # powers of base are exact until all indices are consumed
+        remaining = np.array(indices, dtype=np.int64) + 1
+        while remaining.any():
+            denom *= base
+            remaining, remainders = np.divmod(remaining, base)
+            vdc += permut[remainders] / denom
+        return vdc
+
     def _internal_sampler(self) -> tp.ArrayLike:
         # len(sigma) describes all n=dimension first prime numbers
         sample = [self.vdc(self.index, sigma) for sigma in self.permgen.get_permutations_generator()]  # type: ignore
         return sample
 
+    def _internal_sampler_batch(self, num: int) -> np.ndarray:
+        indices = np.arange(self.index, self.index + num)
+        samples = np.zeros((num, self.dimension), dtype=float)
+        for k, sigma in enumerate(self.permgen.get_permutations_generator()):
+            samples[:, k] = self.vdc_batch(indices, sigma)
+        return samples
+
 
 @samplers.register
 class HammersleySampler(HaltonSampler):
@@ -202,15 +257,19 @@ class HammersleySampler(HaltonSampler):
         assert self.budget is not None
         return np.concatenate(([(self.index + 0.5) / float(self.budget)], super()._internal_sampler()))  # type: ignore
 
+    def _internal_sampler_batch(self, num: int) -> np.ndarray:
+        assert self.budget is not None
+        first = (np.arange(self.index, self.index + num) + 0.5) / float(self.budget)
+        return np.concatenate([first[:, None], super()._internal_sampler_batch(num)], axis=1)
+
 
 class Rescaler:
     def __init__(self, points: tp.Iterable[tp.ArrayLike]) -> None:
-        iterp = iter(points)
-        self.sample_mins = np.array(next(iterp), copy=False)
-        self.sample_maxs = self.sample_mins
-        for point in iterp:
-            self.sample_mins = np.minimum(self.sample_mins, point)
-            self.sample_maxs = np.maximum(self.sample_maxs, point)
+        if not isinstance(points, np.ndarray):
+            points = [np.array(point, copy=False) for point in points]
+        samples = np.array(points, dtype=float, copy=False)
+        self.sample_mins = samples.min(axis=0)
+        self.sample_maxs = samples.max(axis=0)
         self.epsilon = min([x for x in self.sample_mins] + [1 - s for s in self.sample_maxs] + [1e-15])
         assert (
             self.epsilon > 0.0
@@ -3,8 +3,13 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import time
+import asyncio
 import warnings
 from pathlib import Path
+from unittest.mock import patch
+from concurrent import futures
+import pytest
 import numpy as np
 import nevergrad.common.typing as tp
 from nevergrad.common import testing
@@ -14,6 +19,7 @@ from . import experimentalvariants as xpvariants
 from . import base
 from . import utils
 from . import callbacks
+from . import differentialevolution
 
 
 class CounterFunction:
@@ -191,3 +197,152 @@ def test_pruning_calls() -> None:
     opt.minimize(constant)
     assert isinstance(opt.pruning, utils.Pruning)
     assert opt.pruning._num_prunings < 4
+
+
+@testing.parametrized(
+    cma=("CMA",),
+    de=("TwoPointsDE",),
+    rotated_de=("RotatedTwoPointsDE",),
+    standard_de=("DE",),
+    tbpsa=("TBPSA",),
+    emna=("NaiveIsoEMNA",),
+    hammersley=("ScrHammersleySearch",),
+    random=("RandomSearchPlusMiddlePoint",),
+    gaussian=("QORandomSearch",),
+    oneplusone=("OnePlusOne",),
+)
+def test_ask_tell_batch(name: str) -> None:
+    opt = optimizerlib.registry[name](parametrization=3, budget=600)
+    opt.parametrization.random_state.seed(12)
+    for _ in range(6):
+        data = opt.ask_batch(100)
+        assert data.shape == (100, 3)
+        opt.tell_batch(data, np.sum((data - 0.5) ** 2, axis=1))
+    assert opt.num_ask == opt.num_tell == 600
+    assert not opt.num_tell_not_asked
+    assert not len(opt._asked_batch) and not opt._asked, "Some asked points were not cleared"
+    assert opt.current_bests["minimum"].mean < 0.3
+    np.testing.assert_array_equal(opt.recommend().value, opt.recommend().value)
+
+
+@testing.parametrized(
+    curr_to_best=("curr-to-best",),
+    rand_1=("rand-1",),
+    best_1=("best-1",),
+)
+def test_de_ask_tell_batch_mutations(mutation: str) -> None:
+    opt = optimizerlib.DifferentialEvolution(mutation=mutation, popsize=50)(parametrization=4, budget=1000)
+    opt.parametrization.random_state.seed(12)
+    for _ in range(20):
+        data = opt.ask_batch(50)
+        opt.tell_batch(data, np.sum((data - 0.5) ** 2, axis=1))
+    # the cached population matrix must match the population
+    uids, pop_data, pop_losses = opt._population_matrix()  # type: ignore
+    assert uids == list(opt.population)  # type: ignore
+    for uid, x, loss in zip(uids, pop_data, pop_losses):
+        param = opt.population[uid]  # type: ignore
+        np.testing.assert_array_equal(param.get_standardized_data(reference=opt.parametrization), x)
+        assert param.loss == loss
+    assert opt.current_bests["minimum"].mean < 0.1
+    # sequential interface is still available
+    candidate = opt.ask()
+    opt.tell(candidate, 12.0)
+
+
+def test_de_tell_batch_candidates() -> None:
+    opt = optimizerlib.DifferentialEvolution(propagate_heritage=True, popsize=10)(
+        parametrization=2, budget=100
+    )
+    assert isinstance(opt, differentialevolution._DE)
+    opt.parametrization.random_state.seed(12)
+    for _ in range(3):
+        data = opt.ask_batch(10)
+        opt.tell_batch(data, np.sum((data - 0.5) ** 2, axis=1))
+    # the archive keeps the evaluated candidate, as with the sequential tell
+    best = opt.current_bests["minimum"].parameter
+    assert any(best is c for c in opt.population.values())
+    # children which do not enter the population pass on their heritage to their parent
+    build = opt._candidate_from_batch
+
+    def tagged_child(x: np.ndarray, info: tp.Any) -> ng.p.Parameter:
+        child = build(x, info)
+        child.heritage["tag"] = "child"
+        return child
+
+    data = opt.ask_batch(10)
+    with patch.object(opt, "_candidate_from_batch", side_effect=tagged_child):
+        opt.tell_batch(data, np.full(10, 1000.0))
+    assert all(c.heritage.get("tag") == "child" for c in opt.population.values())
+
+
+def test_tell_batch_fallbacks() -> None:
+    opt = optimizerlib.registry["CMA"](parametrization=2, budget=100)
+    data = opt.ask_batch(4)
+    candidates = opt.candidates_from_batch(data)
+    np.testing.assert_array_equal(np.array([c.value for c in candidates]), data)
+    # tell callbacks require candidates
+    losses: tp.List[float] = []
+    opt.register_callback("tell", lambda o, c, loss: losses.append(loss))
+    opt.tell_batch(data[:2], [1, 2])
+    assert losses == [1, 2]
+    # not asked points
+    opt.tell_batch(np.ones((2, 2)), [3, 4])
+    assert opt.num_tell == 4
+    assert opt.num_tell_not_asked == 2
+    assert len(opt._asked_batch) == 2
+    # multiobjective
+    opt = optimizerlib.registry["TwoPointsDE"](parametrization=2, budget=100)
+    data = opt.ask_batch(4)
+    opt.tell_batch(data, np.ones((4, 2)))
+    assert opt.num_objectives == 2
+    assert len(opt.pareto_front()) == 4
+
+
+class AsyncCounterFunction:
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, value: tp.ArrayLike) -> float:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.001 * float(np.random.rand()))
+        self.running -= 1
+        return float(np.sum(np.asarray(value) ** 2))
+
+
+def test_aminimize() -> None:
+    func = AsyncCounterFunction()
+    optim = optimizerlib.OnePlusOne(parametrization=2, budget=40, num_workers=4)
+    recom = asyncio.run(optim.aminimize(func))
+    assert optim.num_ask == optim.num_tell == 40
+    assert not optim._asked
+    assert func.max_running == 4
+    assert recom.loss is not None
+    # with a standard function in a thread pool
+    optim = optimizerlib.OnePlusOne(parametrization=2, budget=20, num_workers=4)
+    with futures.ThreadPoolExecutor(max_workers=2) as executor:
+        asyncio.run(optim.aminimize(lambda x: float(np.sum(x**2)), executor=executor, concurrency=2))
+    assert optim.num_tell == 20
+
+
+def test_aminimize_error() -> None:
+    async def failing(value: tp.ArrayLike) -> float:
+        raise ValueError("Failing")
+
+    optim = optimizerlib.OnePlusOne(parametrization=2, budget=20, num_workers=3)
+    with pytest.raises(ValueError):
+        asyncio.run(optim.aminimize(failing))
+    assert optim.num_tell == 0
+
+
+def test_minimize_waits_for_futures() -> None:
+    def slow_sphere(x: np.ndarray) -> float:
+        time.sleep(0.002)
+        return float(np.sum(x**2))
+
+    optim = optimizerlib.OnePlusOne(parametrization=2, budget=20, num_workers=3)
+    with patch("nevergrad.common.tools.Sleeper.sleep", side_effect=RuntimeError("Should not sleep")):
+        with futures.ThreadPoolExecutor(max_workers=3) as executor:
+            optim.minimize(slow_sphere, executor=executor)
+    assert optim.num_tell == 20
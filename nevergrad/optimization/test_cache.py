@@ -0,0 +1,88 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from pathlib import Path
+from concurrent import futures
+import pytest
+import numpy as np
+import nevergrad as ng
+import nevergrad.common.typing as tp
+from . import cache
+from . import optimizerlib
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, x: np.ndarray, y: int = 0) -> float:
+        self.count += 1
+        return float(np.sum(x**2) + y)
+
+
+@pytest.mark.parametrize("key", ["value", "data"])  # type: ignore
+def test_cached_objective_persistence(key: str, tmp_path: Path) -> None:
+    param = ng.p.Instrumentation(ng.p.Array(shape=(2,)), y=ng.p.Choice([0, 1]))
+    func = Counter()
+    cached = cache.CachedObjective(func, path=tmp_path / "cache.db", memory_size=2, key=key)
+    candidates = [param.spawn_child(new_value=((np.array([k, 1.0]),), {"y": k % 2})) for k in range(4)]
+    losses = [cached.evaluate(c, reference=param) for c in candidates]
+    assert losses == [1.0, 3.0, 5.0, 11.0]
+    assert cached.evaluate(candidates[3], reference=param) == 11.0  # memory
+    assert cached.evaluate(candidates[0], reference=param) == 1.0  # on disk
+    assert func.count == 4
+    cached.close()
+    # new instance reads from the disk
+    other = cache.CachedObjective(func, path=tmp_path / "cache.db", key=key)
+    assert other.lookup(candidates[2], reference=param) == 5.0
+    other.store("multi", np.array([1.0, 2.0]))
+    other._memory.clear()
+    np.testing.assert_array_equal(other.get("multi").loss, [1.0, 2.0])  # type: ignore
+    other.namespace = "other"
+    assert other.lookup(candidates[2], reference=param) is None
+
+
+def test_cached_objective_minimize(tmp_path: Path) -> None:
+    func = Counter()
+    param = ng.p.Choice([np.array([float(k)]) for k in range(5)])
+    cached = cache.CachedObjective(func, path=tmp_path / "cache.db")
+    optim = optimizerlib.RandomSearch(param, budget=30, num_workers=3)
+    with futures.ThreadPoolExecutor(max_workers=3) as executor:
+        recom = optim.minimize(cached, executor=executor)
+    assert optim.num_tell == 30
+    assert func.count == cached.num_misses <= 5
+    assert cached.num_hits + cached.num_misses == 30
+    np.testing.assert_array_equal(recom.value, [0])
+    # restart with a new optimizer
+    optim = optimizerlib.RandomSearch(param, budget=10)
+    optim.minimize(cache.CachedObjective(func, path=tmp_path / "cache.db"))
+    assert func.count == cached.num_misses
+
+
+def test_cached_objective_in_flight() -> None:
+    param = ng.p.Array(shape=(1,))
+    func = Counter()
+    cached = cache.CachedObjective(func)
+    executor = futures.ThreadPoolExecutor(max_workers=1)
+    candidates = [param.spawn_child(new_value=np.array([1.0])) for _ in range(2)]
+    jobs = [cached.submit(executor, c) for c in candidates]
+    assert jobs[0] is jobs[1]
+    for c, j in zip(candidates, jobs):
+        cached.process_result(c, j.result())
+    assert func.count == 1
+    assert cached.lookup(candidates[0]) == 1.0
+    executor.shutdown()
+
+
+def test_cached_objective_threads(tmp_path: Path) -> None:
+    param = ng.p.Array(shape=(1,))
+    cached = cache.CachedObjective(Counter(), path=tmp_path / "cache.db", memory_size=2)
+    candidates = [param.spawn_child(new_value=np.array([float(k % 20)])) for k in range(400)]
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        losses = list(executor.map(cached.evaluate, candidates))
+    assert losses == [float(k % 20) ** 2 for k in range(400)]
+    cached.close()
+    other = cache.CachedObjective(Counter(), path=tmp_path / "cache.db")
+    assert all(other.lookup(c) == loss for c, loss in zip(candidates[:20], losses))
@@ -8,6 +8,7 @@ from pathlib import Path
 import logging
 import os
 import numpy as np
+import pytest
 import nevergrad as ng
 import nevergrad.common.typing as tp
 from . import optimizerlib
@@ -44,6 +45,31 @@ def test_log_parameters(tmp_path: Path) -> None:
     assert not logger.load()
 
 
+def test_log_parameters_buffered_columnar(tmp_path: Path) -> None:
+    instrum = ng.p.Instrumentation(
+        ng.p.Array(shape=(1,)),
+        ng.p.Scalar().set_integer_casting(),
+        blublu=ng.p.Choice([0, np.int_(1), "a", np.nan, [1, 2]]),
+        array=ng.p.Array(shape=(3, 2)),
+    )
+    optimizer = optimizerlib.NoisyOnePlusOne(parametrization=instrum, budget=25)
+    loggers = [
+        ng.callbacks.ParametersLogger(tmp_path / "logs.txt", flush_interval_tells=10),
+        ng.callbacks.ParametersLogger(tmp_path / "logs.npz", flush_interval_tells=10),
+    ]
+    for logger in loggers:
+        optimizer.register_callback("tell", logger)
+    optimizer.minimize(_func)
+    assert len(callbacks.ParametersLogger(tmp_path / "logs.npz").load()) == 20  # last records not flushed
+    logs = [logger.load() for logger in loggers]  # flushes
+    assert len(logs[0]) == 25
+    items = [[sorted(record.items()) for record in records] for records in logs]  # field order may differ
+    assert repr(items[0]) == repr(items[1])  # also checks the types
+    selected = list(callbacks.ParametersLogger(tmp_path / "logs.npz").iter_load(columns=["#loss", "blublu"]))
+    assert len(selected) == 25
+    assert set(selected[0]) == {"#loss", "blublu"}
+
+
 def test_multiobjective_log_parameters(tmp_path: Path) -> None:
     filepath = tmp_path / "logs.txt"
     instrum = ng.p.Instrumentation(
@@ -86,6 +112,42 @@ def test_dump_callback(tmp_path: Path) -> None:
     assert filepath.exists()
 
 
+@pytest.mark.parametrize(  # type: ignore
+    "name,multiobjective",
+    [("DE", False), ("CMA", False), ("TwoPointsDE", False), ("DE", True), ("CMA", True)],
+)
+def test_checkpoint_callback(tmp_path: Path, name: str, multiobjective: bool) -> None:
+    filepath = tmp_path / "checkpoint.pkl"
+    optimizer = optimizerlib.registry[name](parametrization=ng.p.Array(shape=(3,)), budget=100, num_workers=3)
+    optimizer.parametrization.random_state.seed(12)
+    checkpoint = ng.callbacks.OptimizerCheckpoint(filepath, snapshot_interval_tells=7)
+    optimizer.register_callback("ask", checkpoint)
+    optimizer.register_callback("tell", checkpoint)
+
+    def loss(x: np.ndarray) -> tp.Loss:
+        if multiobjective:
+            return np.array([np.sum(x**2), np.sum((x - 1) ** 2)])
+        return float(np.sum(x**2))
+
+    optimizer.tell(optimizer.parametrization.spawn_child(new_value=[1, 2, 3]), loss(np.array([1, 2, 3])))
+    pending = [optimizer.ask() for _ in range(3)]
+    for k in range(40):  # asks are always in advance of the tells
+        cand = pending.pop(k % len(pending))
+        optimizer.tell(cand, loss(cand.value))
+        pending.append(optimizer.ask())
+    for cand in pending:
+        optimizer.tell(cand, loss(cand.value))
+    # only the tail is replayed (read before asking, since asks may trigger a new snapshot)
+    events = list(callbacks._read_journal(tmp_path / "checkpoint.pkl.journal"))
+    assert 0 < sum(event[0] == "tell" for event in events) <= (10 if multiobjective else 7)
+    recovered = callbacks.OptimizerCheckpoint.load(filepath)
+    assert (recovered.num_ask, recovered.num_tell) == (optimizer.num_ask, optimizer.num_tell)
+    assert len(recovered.archive) == len(optimizer.archive)
+    if multiobjective:  # told points must not be added twice to the pareto front
+        assert len(recovered.pareto_front()) == len(optimizer.pareto_front())
+    np.testing.assert_array_almost_equal(recovered.ask().value, optimizer.ask().value)
+
+
 def test_progressbar_dump(tmp_path: Path) -> None:
     filepath = tmp_path / "pickle.pkl"
     optimizer = optimizerlib.OnePlusOne(parametrization=2, budget=32)
@@ -0,0 +1,61 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+from nevergrad.common import testing
+from . import gaussianprocess as gpm
+
+
+def _make_gp(num: int, dimension: int = 3) -> gpm.GaussianProcess:
+    rng = np.random.RandomState(12)
+    gp = gpm.GaussianProcess(dimension, refit_ratio=1.5)
+    for x in rng.uniform(0, 1, size=(num, dimension)):
+        gp.add(x, float(np.sum((x - 0.3) ** 2)))
+    return gp
+
+
+def test_gp_incremental_cholesky() -> None:
+    gp = _make_gp(40)
+    assert gp._num_fitted < len(gp), "Last points should have been added incrementally"
+    np.testing.assert_almost_equal(gp._chol, gp._factorize(gp.length_scale))
+    # posterior interpolates observations (with low noise)
+    mean, std, _, _ = gp.predict(gp.x)
+    np.testing.assert_almost_equal(mean, gp.y, decimal=4)
+    assert np.max(std) < 1e-2
+    # conditioning
+    x = np.array([[0.5, 0.5, 0.5]])
+    fantasized = gp.condition(x, gp.predict(x)[0])
+    assert len(fantasized) == len(gp) + 1
+    assert fantasized.predict(x)[1][0] < gp.predict(x)[1][0]
+
+
+@testing.parametrized(
+    ucb=("ucb",),
+    ei=("ei",),
+    poi=("poi",),
+)
+def test_acquisition_gradient(kind: str) -> None:
+    gp = _make_gp(20)
+    x = np.random.RandomState(1).uniform(0, 1, size=(5, gp.dimension))
+    _, grad = gpm.acquisition(gp, x, kind, xi=-0.01, return_grad=True)
+    assert grad is not None
+    eps = 1e-6
+    numerical = np.zeros_like(grad)
+    for k in range(gp.dimension):
+        dx = np.zeros(gp.dimension)
+        dx[k] = eps
+        plus, minus = (gpm.acquisition(gp, x + sign * dx, kind, xi=-0.01)[0] for sign in (1, -1))
+        numerical[:, k] = (plus - minus) / (2 * eps)
+    np.testing.assert_allclose(grad, numerical, atol=1e-6 * max(1.0, np.max(np.abs(grad))))
+
+
+def test_minimize_acquisition() -> None:
+    gp = _make_gp(40)
+    x = gpm.minimize_acquisition(
+        lambda z, grad: gpm.acquisition(gp, z, "ucb", kappa=0.0, return_grad=grad),
+        gp.dimension,
+        np.random.RandomState(12),
+    )
+    np.testing.assert_array_almost_equal(x, [0.3] * 3, decimal=1)
@@ -85,3 +85,32 @@ def test_de_crossover(crossover_param: tp.Union[str, float], seed: int, expected
     donor = np.arange(1, len(expected) + 1)
     crossover.apply(donor, 0.0 * donor)
     np.testing.assert_array_equal(donor, expected)
+
+
+@testing.parametrized(
+    cr_0=(0.0, 5),
+    cr_1=(1.0, 5),
+    random=("random", 5),
+    onepoint=("onepoint", 6),
+    twopoints=("twopoints", 6),
+    rotated_twopoints=("rotated_twopoints", 6),
+    small_twopoints=("twopoints", 3),
+)
+def test_de_crossover_batch(crossover_param: tp.Union[str, float], dim: int) -> None:
+    rng = np.random.RandomState(12)
+    crossover = Crossover(rng, crossover_param)
+    donors = np.arange(1, dim + 1) * np.ones((200, 1))
+    individuals = -donors
+    crossover.apply_batch(donors, individuals)
+    num_donated = np.sum(donors > 0, axis=1)
+    assert num_donated.min() >= 1, "At least one item should come from the donor"
+    if crossover_param == 1.0:
+        assert num_donated.min() == dim
+    elif crossover_param == 0.0:
+        assert num_donated.max() == 1
+    elif crossover_param in ("onepoint", "twopoints") and dim >= 4:
+        assert num_donated.max() < dim, "At least one item should come from the individual"
+    if crossover_param != "rotated_twopoints":
+        np.testing.assert_array_equal(np.abs(donors), np.arange(1, dim + 1) * np.ones((200, 1)))
+    else:  # rotated two points copy a shifted slice of the individual
+        assert sorted(set((-donors[donors < 0]).astype(int).tolist())) == list(range(1, dim + 1))
@@ -4,13 +4,16 @@
 # LICENSE file in the root directory of this source tree.
 
 import sys
+import pickle
 import time
+import subprocess
 import random
 import inspect
 import logging
 import platform
 import tempfile
 import warnings
+import importlib.util
 from pathlib import Path
 from functools import partial
 from unittest import SkipTest
@@ -24,6 +27,7 @@ import nevergrad as ng
 import nevergrad.common.typing as tp
 from nevergrad.common import testing
 from nevergrad.common import errors
+from nevergrad.parametrization import discretization
 from . import base
 from . import optimizerlib as optlib
 from . import experimentalvariants as xpvariants
@@ -328,6 +332,63 @@ def test_portfolio_budget() -> None:
         np.testing.assert_equal(optimizer.budget, sum(o.budget for o in optimizer.optims))
 
 
+@testing.suppress_nevergrad_warnings()
+def test_portfolio_processes() -> None:
+    budget = 200
+    optimizer = optlib.ConfPortfolio(optimizers=["CMA", "TwoPointsDE", "OnePlusOne"], processes=True)(
+        parametrization=3, budget=budget, num_workers=2
+    )
+    assert isinstance(optimizer, optlib.Portfolio)
+    processes = [o for o in optimizer.optims if isinstance(o, optlib._OptimizerProcess)]
+    assert len(processes) == 3
+    recom = optimizer.minimize(lambda x: float(np.sum((x - 0.5) ** 2)))
+    assert optimizer.num_tell == budget
+    assert sum(o.num_ask for o in processes) == budget
+    assert all(o.num_tell == budget for o in processes)  # all sub-optimizers are told everything
+    assert recom.loss < 0.1  # type: ignore
+    with pytest.raises(errors.NevergradRuntimeError):
+        pickle.dumps(optimizer)
+    for opt in processes:
+        opt.close()
+
+
+def test_portfolio_processes_random_states() -> None:
+    param = ng.p.Array(shape=(3,))
+    param.random_state.seed(12)  # random state is initialized before starting the processes
+    cma = optlib.ParametrizedCMA(random_init=True)
+    optimizer = optlib.ConfPortfolio(optimizers=[cma, cma, cma], processes=True)(
+        parametrization=param, budget=30, num_workers=3
+    )
+    assert isinstance(optimizer, optlib.Portfolio)
+    candidates = [optimizer.ask() for _ in range(3)]
+    processes = [o for o in optimizer.optims if isinstance(o, optlib._OptimizerProcess)]
+    for opt in processes:
+        opt.close()
+    assert len(processes) == 3
+    data = [c.get_standardized_data(reference=optimizer.parametrization) for c in candidates]
+    for k, d1 in enumerate(data):
+        for d2 in data[k + 1 :]:
+            assert not np.array_equal(d1, d2)
+
+
+def test_portfolio_processes_values_and_errors() -> None:
+    param = ng.p.Choice(list(range(100)))  # rebuilding from the data is not deterministic
+    optimizer = optlib.ConfPortfolio(optimizers=["RandomSearch"], processes=True)(param, budget=10)
+    assert isinstance(optimizer, optlib.Portfolio)
+    process = optimizer.optims[0]
+    assert isinstance(process, optlib._OptimizerProcess)
+    process._suggestions.append(param.spawn_child(new_value=42))
+    candidate = process.ask()
+    assert candidate.value == 42
+    process.tell(candidate, 12.0)
+    assert process.num_tell == 1
+    # errors are raised in the tell of the main process, even without a subsequent ask
+    with pytest.raises(ValueError, match="Expected 1 loss"):
+        process.tell(process.ask(), np.array([1.0, 2.0]))
+    assert process.num_tell == 1
+    process.close()
+
+
 def test_optimizer_families_repr() -> None:
     Cls = optlib.DifferentialEvolution
     np.testing.assert_equal(repr(Cls()), "DifferentialEvolution()")
@@ -418,6 +479,31 @@ def test_optimization_discrete_with_one_sample() -> None:
     optimizer.minimize(_square)
 
 
+def test_cga_batch() -> None:
+    dimension = 1000
+    optimizer = optlib.cGA(dimension, budget=400, arity=3)
+    optimizer.parametrization.random_state.seed(12)
+
+    def loss(x: np.ndarray) -> float:
+        return float(np.sum(discretization.threshold_discretization(x, arity=3)))
+
+    # with ask/tell
+    candidate = optimizer.ask()
+    optimizer.tell(candidate, loss(candidate.value))
+    # with ask_batch/tell_batch (rows are compared by successive pairs, starting with the told candidate)
+    for k in range(10):
+        data = optimizer.ask_batch(40 - (k == 0))
+        optimizer.tell_batch(data, [loss(x) for x in data])
+    assert optimizer._previous_value_candidate is None  # type: ignore
+    probas = optimizer.p  # type: ignore
+    np.testing.assert_almost_equal(probas.sum(axis=1), np.ones(dimension))
+    assert probas.min() > 0.5 / optimizer.llambda  # type: ignore  # lower bounded before renormalization
+    mean_probas = probas.mean(axis=0)
+    assert (
+        mean_probas[0] > mean_probas[1] > mean_probas[2]
+    ), f"Lower values should be preferred: {mean_probas}"
+
+
 def test_smooth_discrete_one_plus_one() -> None:
     n = 35
     d = 35
@@ -437,7 +523,7 @@ def test_smooth_discrete_one_plus_one() -> None:
     assert pval < 0.4, f"P-Value for smooth methods = {pval}."
 
 
-@pytest.mark.parametrize("name", ["TBPSA", "PSO", "TwoPointsDE", "CMA", "BO"])  # type: ignore
+@pytest.mark.parametrize("name", ["TBPSA", "PSO", "TwoPointsDE", "CMA", "BO", "NativeBO"])  # type: ignore
 def test_optim_pickle(name: str) -> None:
     # some generic class can fail to be pickled:
     # example of work around:
@@ -477,6 +563,25 @@ def test_bo_init() -> None:
     optimizer.minimize(np.abs)
 
 
+def test_bo_native_parallel() -> None:
+    optimizer = optlib.ParametrizedBO(backend="native", init_budget=3)(2, budget=30, num_workers=3)
+    assert isinstance(optimizer, optlib._BO)
+    optimizer.parametrization.random_state.seed(7)
+    for k in range(6):
+        candidates = [optimizer.ask() for _ in range(3)]
+        if k == 1:  # first batch proposed through the acquisition on the Gaussian process
+            assert not optimizer._probes
+            points = np.array([c._meta["x_probe"] for c in candidates])
+            distances = [np.linalg.norm(x - y) for i, x in enumerate(points) for y in points[i + 1 :]]
+            assert min(distances) > 0.1, "Workers should get distinct points"
+        for candidate in candidates:
+            optimizer.tell(candidate, float(np.sum((candidate.value - 0.5) ** 2)))
+    assert not optimizer._pending
+    assert len(optimizer.gp) == 18
+    with pytest.raises(ValueError):
+        optlib.ParametrizedBO(backend="native", gp_parameters={"normalize_y": True})(2, budget=10)
+
+
 def test_chaining() -> None:
     budgets = [7, 19]
     optimizer = optlib.Chaining([optlib.LHSSearch, optlib.HaltonSearch, optlib.OnePlusOne], budgets)(2, 40)
@@ -614,6 +719,33 @@ def check_metamodel(
         assert successes > num_trials // 2, f"Problem for beating {baseline}."
 
 
+def test_quadratic_surrogate() -> None:
+    rng = np.random.RandomState(12)
+    dimension = 5
+    optimum = np.arange(dimension) / 10.0
+    points = rng.normal(size=(60, dimension))
+    values = np.sum((1 + np.arange(dimension)) * (points - optimum) ** 2, axis=1)
+    surrogate = optlib.QuadraticSurrogate(dimension)
+    surrogate.fit(points[:30], values[:30], center=points[:30].mean(axis=0), scale=1.0)
+    # incremental update: 10 points leave and 20 points enter the fitted set
+    surrogate.fit(points[10:50], values[10:50], center=points[10:50].mean(axis=0), scale=1.0)
+    assert len(surrogate) == 40
+    scratch = optlib.QuadraticSurrogate(dimension)
+    scratch.fit(points[10:50], values[10:50], center=points[10:50].mean(axis=0), scale=1.0)
+    np.testing.assert_almost_equal(surrogate.predict(points), scratch.predict(points))
+    np.testing.assert_almost_equal(surrogate.minimum(), optimum)
+    # without normal equations (large dimension), the problem is solved directly on the points
+    with patch.object(optlib.QuadraticSurrogate, "MAX_NORMAL_FEATURES", 0):
+        direct = optlib.QuadraticSurrogate(dimension)
+    assert not direct._gram.size
+    direct.fit(points[10:50], values[10:50], center=points[10:50].mean(axis=0), scale=1.0)
+    np.testing.assert_almost_equal(direct.predict(points), scratch.predict(points))
+    # non convex direction: the point is not moved along it
+    values = np.sum(points**2, axis=1) - 2 * points[:, 0] ** 2
+    surrogate.fit(points, values, center=np.zeros(dimension), scale=1.0)
+    np.testing.assert_almost_equal(surrogate.minimum(), np.zeros(dimension))
+
+
 @pytest.mark.parametrize(  # type: ignore
     "penalization,expected,as_layer",
     [
@@ -934,3 +1066,13 @@ def test_smoother() -> None:
         optlib.smooth_copy(x).get_standardized_data(reference=x).shape
         == x.get_standardized_data(reference=x).shape
     )
+
+
+def test_lazy_heavy_imports() -> None:
+    heavy = ["bayes_opt", "hyperopt", "scipy.stats", "scipy.optimize", "sklearn", "pytest"]
+    code = f"import sys, nevergrad; print([m for m in {heavy!r} if m in sys.modules])"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=Path(ng.__file__).parents[1])
+    assert output.decode().strip() == "[]"
+    if importlib.util.find_spec("hyperopt") is not None:  # only registered if available
+        assert "HyperOpt" in registry
+        assert optlib.HyperOpt is registry["HyperOpt"]
@@ -35,6 +35,25 @@ def test_samplers(sampler_cls: tp.Type[sequences.Sampler]) -> None:
     assert max(output) < 1
 
 
+@testing.parametrized(
+    **{
+        f"{name}{'_scrambled' if scrambling else ''}": (sampler, scrambling)
+        for name, sampler in samplers.items()
+        for scrambling in ([False, True] if "Halton" in name or "Hammersley" in name else [False])
+    }
+)
+def test_sampler_draw_batch(sampler_cls: tp.Type[sequences.Sampler], scrambling: bool) -> None:
+    reference, sampler = (
+        sampler_cls(12, 40, scrambling=scrambling, random_state=np.random.RandomState(12))  # type: ignore
+        for _ in range(2)
+    )
+    expected = np.array([reference() for _ in range(40)])
+    output = np.concatenate([sampler.draw_batch(k) for k in [0, 1, 15, 24]], axis=0)
+    np.testing.assert_equal(sampler.index, 40)
+    np.testing.assert_array_equal(output, expected)
+    np.testing.assert_raises(AssertionError, sampler.draw_batch, 1)  # budget is over
+
+
 def test_sampler_draw() -> None:
     sampler = sequences.RandomSampler(5, 4)
     sampler.draw()
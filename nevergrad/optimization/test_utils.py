@@ -85,6 +85,44 @@ def test_archive_errors() -> None:
     np.testing.assert_raises(RuntimeError, archive.items)
 
 
+def test_array_archive() -> None:
+    param = ng.p.Array(shape=(2,))
+    rng = np.random.RandomState(12)
+    archive = utils.ArrayArchive()
+    points = rng.normal(size=(40, 2))
+    for k in range(200):
+        x = points[rng.randint(len(points))]
+        loss = float(rng.normal())
+        if x in archive:
+            value = archive[x]
+            value.add_evaluation(loss)
+        else:
+            value = utils.MultiValue(param, loss, reference=param)
+        archive[x] = value
+        for name in ["optimistic", "pessimistic", "average", "minimum"]:
+            expected = min(archive.values(), key=lambda v, n=name: v.get_estimation(n))  # type: ignore
+            assert archive.best(name) is expected
+    values = list(archive.values())
+    np.testing.assert_array_equal(archive.points, list(archive.keys_as_arrays()))
+    np.testing.assert_array_equal(archive.counts, [v.count for v in values])
+    for name in ["optimistic", "pessimistic", "average", "minimum"]:
+        np.testing.assert_array_equal(archive.estimations(name), [v.get_estimation(name) for v in values])
+    archive2 = pickle.loads(pickle.dumps(archive))
+    assert archive2.best("pessimistic").mean == archive.best("pessimistic").mean
+    subset = archive.subset(archive.means < 0)
+    assert len(subset) == sum(v.mean < 0 for v in values)
+    assert utils.ArrayArchive.from_archive(archive) is archive
+    # heaps do not grow with the number of updates
+    for _ in range(1000):
+        value = archive[points[0]]
+        value.add_evaluation(float(rng.normal()))
+        archive[points[0]] = value
+    assert all(len(heap) <= 3 * len(archive) + 1 for heap in archive._heaps.values())
+    for name in ["optimistic", "pessimistic", "average", "minimum"]:
+        expected = min(archive.values(), key=lambda v, n=name: v.get_estimation(n))  # type: ignore
+        assert archive.best(name).get_estimation(name) == expected.get_estimation(name)
+
+
 def test_pruning() -> None:
     param = ng.p.Scalar(init=12.0)
     archive: utils.Archive[utils.MultiValue] = utils.Archive()
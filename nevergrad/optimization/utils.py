@@ -4,6 +4,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import math
+import heapq
 import operator
 import numpy as np
 from nevergrad.parametrization import parameter as p
@@ -40,11 +41,38 @@ class MultiValue:
         # TODO May be safer to use a default variance which depends on y for scale invariance?
         self.variance = 1.0e6
         parameter.freeze()
-        self.parameter = parameter
+        self._parameter: tp.Optional[p.Parameter] = parameter
+        self._data: tp.Optional[np.ndarray] = None
         self._ref = reference
 
+    @classmethod
+    def from_data(cls, data: np.ndarray, y: float, *, reference: p.Parameter) -> "MultiValue":
+        """Creates a MultiValue from standardized data only, the corresponding
+        parameter is only instantiated if requested (see Optimizer.tell_batch)
+        """
+        mvalue = cls(reference, y, reference=reference)
+        mvalue._parameter = None
+        mvalue._data = np.array(data, copy=True, dtype=float)
+        return mvalue
+
+    @property
+    def parameter(self) -> p.Parameter:
+        if self._parameter is None:
+            assert self._data is not None
+            parameter = self._ref.spawn_child().set_standardized_data(self._data)
+            parameter.loss = self._minimum
+            parameter.freeze()
+            self._parameter = parameter
+        return self._parameter
+
+    @parameter.setter
+    def parameter(self, parameter: p.Parameter) -> None:
+        self._parameter = parameter
+
     @property
     def x(self) -> np.ndarray:  # for compatibility
+        if self._parameter is None and self._data is not None:
+            return self._data
         return self.parameter.get_standardized_data(reference=self._ref)
 
     @property
@@ -85,6 +113,8 @@ class MultiValue:
         self.variance = factor * (self.square - self.mean**2)
 
     def as_array(self, reference: p.Parameter) -> np.ndarray:
+        if self._parameter is None and reference is self._ref:
+            return self.x
         return self.parameter.get_standardized_data(reference=reference)
 
     def __repr__(self) -> str:
@@ -144,8 +174,8 @@ class SequentialExecutor:
     (just calls the function and returns a FinishedJob)
     """
 
-    def submit(self, fn: tp.Callable[..., tp.Any], *args: tp.Any, **kwargs: tp.Any) -> DelayedJob:
-        return DelayedJob(fn, *args, **kwargs)
+    def submit(self, __fn: tp.Callable[..., tp.Any], *args: tp.Any, **kwargs: tp.Any) -> DelayedJob:
+        return DelayedJob(__fn, *args, **kwargs)
 
 
 def _tobytes(x: tp.ArrayLike) -> bytes:
@@ -233,6 +263,170 @@ class Archive(tp.Generic[Y]):
         raise RuntimeError(_ERROR_STR)
 
 
+class ArrayArchive(Archive[MultiValue]):
+    """Archive of MultiValue which additionally mirrors the evaluation statistics into
+    contiguous float64 arrays (one row per point), so that algorithms can work on array
+    slices instead of converting bytes keys with np.frombuffer.
+    It also tracks the best point for each criterion through lazily updated heaps,
+    so that finding the best point after an update is O(log n) instead of a full scan.
+
+    Note
+    ----
+    - rows are in insertion order (which is also the order of values())
+    - the arrays are stored on top of the bytes-keyed dict of Archive, so this archive uses
+      more memory than Archive, in exchange of faster vectorized access.
+    - heaps are rebuilt when their outdated entries outnumber the points by more than
+      a factor 2, so that their size stays proportional to the number of points.
+
+    Warning
+    -------
+    The arrays and heaps are only updated when setting a value. MultiValue instances modified
+    in place (eg: through add_evaluation) must be set again (archive[x] = value), otherwise
+    the arrays and best points silently become outdated. Optimizer.tell takes care of this.
+    """
+
+    _CRITERIA = ("optimistic", "pessimistic", "average", "minimum")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._rows: tp.Dict[bytes, int] = {}
+        self._keys: tp.List[bytes] = []
+        self._points = np.zeros((0, 0), dtype=float)
+        self._stats = np.zeros((0, 5), dtype=float)  # mean, count, square, minimum, variance
+        self._versions: tp.List[int] = []
+        self._heaps: tp.Dict[str, tp.List[tp.Tuple[float, int, int]]] = {c: [] for c in self._CRITERIA}
+
+    @classmethod
+    def from_archive(cls, archive: Archive[MultiValue]) -> "ArrayArchive":
+        """Returns the archive itself if it is already an ArrayArchive,
+        or converts it to an ArrayArchive otherwise
+        """
+        if isinstance(archive, cls):
+            return archive
+        new = cls()
+        for b, v in archive.bytesdict.items():
+            new[np.frombuffer(b)] = v
+        return new
+
+    def __setitem__(self, x: tp.ArrayLike, value: MultiValue) -> None:
+        key = _tobytes(x)
+        row = self._rows.get(key, None)
+        if row is None:
+            row = len(self._keys)
+            if row >= self._points.shape[0]:
+                self._grow(np.array(x, copy=False).size)
+            self._points[row] = x
+            self._rows[key] = row
+            self._keys.append(key)
+            self._versions.append(0)
+        self.bytesdict[key] = value
+        self._stats[row] = (
+            value.mean,
+            value.count,
+            value.square,
+            value.get_estimation("minimum"),
+            value.variance,
+        )
+        self._versions[row] += 1
+        for name in self._CRITERIA:
+            heap = self._heaps[name]
+            if len(heap) > 3 * len(self._keys):  # outdated entries outnumber the points by more than 2x
+                self._rebuild_heap(name)
+            else:
+                heapq.heappush(heap, (value.get_estimation(name), row, self._versions[row]))
+
+    def _grow(self, dimension: int) -> None:
+        capacity = max(16, 2 * self._points.shape[0])
+        points = np.zeros((capacity, dimension), dtype=float)
+        stats = np.zeros((capacity, self._stats.shape[1]), dtype=float)
+        num = len(self._keys)
+        if num:
+            points[:num] = self._points[:num]
+            stats[:num] = self._stats[:num]
+        self._points, self._stats = points, stats
+
+    @property
+    def points(self) -> np.ndarray:
+        """Points of the archive, as a (num_points, dimension) array (read-only view)"""
+        out = self._points[: len(self._keys)]
+        out.flags.writeable = False
+        return out
+
+    def _column(self, index: int) -> np.ndarray:
+        out = self._stats[: len(self._keys), index]
+        out.flags.writeable = False
+        return out
+
+    @property
+    def means(self) -> np.ndarray:
+        return self._column(0)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._column(1)
+
+    @property
+    def squares(self) -> np.ndarray:
+        return self._column(2)
+
+    @property
+    def minimums(self) -> np.ndarray:
+        return self._column(3)
+
+    @property
+    def variances(self) -> np.ndarray:
+        return self._column(4)
+
+    def estimations(self, name: str) -> np.ndarray:
+        """Vectorized version of MultiValue.get_estimation for all the points of the archive"""
+        if name == "minimum":
+            return self.minimums
+        if name == "average":
+            return self.means
+        if name not in ("optimistic", "pessimistic"):
+            raise NotImplementedError
+        delta = 0.1 * np.sqrt(self.variances / (1 + self.counts))
+        return self.means - delta if name == "optimistic" else self.means + delta  # type: ignore
+
+    def best(self, name: str) -> MultiValue:
+        """Returns the MultiValue with the lowest estimation for the given criterion
+        (the first inserted one in case of ties)
+        """
+        heap = self._heaps[name]
+        while heap:
+            _, row, version = heap[0]
+            if version == self._versions[row]:
+                return self.bytesdict[self._keys[row]]
+            heapq.heappop(heap)  # outdated entry
+        raise RuntimeError("Archive is empty")
+
+    def subset(self, mask: np.ndarray) -> "ArrayArchive":
+        """Creates a new archive containing only the rows selected by the boolean mask"""
+        new = ArrayArchive()
+        for row in np.flatnonzero(mask):
+            key = self._keys[row]
+            new[self._points[row]] = self.bytesdict[key]
+        return new
+
+    def __getstate__(self) -> tp.Dict[str, tp.Any]:
+        state = dict(self.__dict__)
+        state["_heaps"] = None  # heaps can be rebuilt, no need to store outdated entries
+        return state
+
+    def __setstate__(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.__dict__.update(state)
+        self._heaps = {}
+        for name in self._CRITERIA:
+            self._rebuild_heap(name)
+
+    def _rebuild_heap(self, name: str) -> None:
+        """Rebuilds the heap of a criterion from the arrays, dropping all outdated entries"""
+        values = self.estimations(name)
+        heap = [(float(v), row, self._versions[row]) for row, v in enumerate(values)]
+        heapq.heapify(heap)
+        self._heaps[name] = heap
+
+
 class Pruning:
     """Callable for pruning archives in the optimizer class.
     See Optimizer.pruning attribute, called at each "tell".
@@ -263,21 +457,16 @@ class Pruning:
     def _prune(self, archive: Archive[MultiValue]) -> Archive[MultiValue]:
         self._num_prunings += 1
         # separate function to ease profiling
-        quantiles: tp.Dict[str, float] = {}
+        archive = ArrayArchive.from_archive(archive)
         threshold = float(self.min_len + 1) / len(archive)
-        names = ["optimistic", "pessimistic", "average"]
-        for name in names:
-            quantiles[name] = np.quantile(
-                [v.get_estimation(name) for v in archive.values()], threshold, interpolation="lower"
-            )
-        new_archive: Archive[MultiValue] = Archive()
-        new_archive.bytesdict = {
-            b: v
-            for b, v in archive.bytesdict.items()
-            if any(v.get_estimation(n) < quantiles[n] for n in names)
-        }  # strict comparison to make sure we prune even for values repeated maaany times
+        keep = np.zeros(len(archive), dtype=bool)
+        for name in ["optimistic", "pessimistic", "average"]:
+            values = archive.estimations(name)
+            quantile = np.quantile(values, threshold, interpolation="lower")  # type: ignore
+            # strict comparison to make sure we prune even for values repeated maaany times
+            keep |= values < quantile
         # this may remove all points though, but nevermind for now
-        return new_archive
+        return archive.subset(keep)
 
     @classmethod
     def sensible_default(cls, num_workers: int, dimension: int) -> "Pruning":
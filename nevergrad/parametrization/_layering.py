@@ -3,9 +3,10 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import os
 import uuid
-import copy
 import bisect
+import itertools
 from enum import Enum
 import numpy as np
 from nevergrad.common import errors
@@ -18,6 +19,29 @@ In = tp.TypeVar("In")
 Out = tp.TypeVar("Out")
 
 
+class _UidGenerator:
+    """Generates unique identifiers from a random prefix, drawn once per process,
+    followed by a counter. This is much cheaper than drawing a new uuid for each instance.
+    """
+
+    def __init__(self) -> None:
+        self._prefix = ""
+        self._counter: tp.Iterator[int] = itertools.count()
+        self.reset()
+
+    def reset(self) -> None:
+        self._prefix = uuid.uuid4().hex[:16]
+        self._counter = itertools.count()
+
+    def __call__(self) -> str:
+        return f"{self._prefix}{next(self._counter):x}"
+
+
+new_uid = _UidGenerator()
+if hasattr(os, "register_at_fork"):  # forked processes must not generate the same uids
+    os.register_at_fork(after_in_child=new_uid.reset)
+
+
 class Level(Enum):
     """Lower level is deeper in the structure"""
 
@@ -44,7 +68,7 @@ class Layered:
         self._layers = [self]
         self._layer_index = 0
         self._name: tp.Optional[str] = None
-        self.uid = uuid.uuid4().hex
+        self.uid = new_uid()
 
     def add_layer(self: L, other: "Layered") -> L:
         """Adds a layer which will modify the object behavior"""
@@ -113,7 +137,8 @@ class Layered:
 
     def copy(self: L) -> L:
         """Creates a new unattached layer with the same behavior"""
-        new = copy.copy(self)
+        new = self.__class__.__new__(self.__class__)  # shallow copy, without the copy module overhead
+        new.__dict__.update(self.__dict__)
         new._layers = [new]
         new._layer_index = 0
         if not self._layer_index:  # attach sublayers if root
@@ -3,7 +3,6 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-import uuid
 import warnings
 import numpy as np
 import nevergrad.common.typing as tp
@@ -12,6 +11,7 @@ from . import utils
 from ._layering import ValueProperty as ValueProperty
 from ._layering import Layered as Layered
 from ._layering import Level as Level
+from ._layering import new_uid
 
 
 # pylint: disable=no-value-for-parameter,pointless-statement,import-outside-toplevel
@@ -349,7 +349,7 @@ class Parameter(Layered):
         Use spawn_child instead to make sure to add the parenthood information.
         """
         child = super().copy()
-        child.uid = uuid.uuid4().hex
+        child.uid = new_uid()
         child._frozen = False
         child._subobjects = self._subobjects.new(child)
         child._meta = {}
@@ -368,7 +368,8 @@ class Parameter(Layered):
             container = dict(container) if isinstance(container, dict) else list(container)
             setattr(child, attribute, container)
         for key, val in self._subobjects.items():
-            container[key] = val.copy()
+            # constants (without layers) are immutable and can be shared with the child
+            container[key] = val if type(val) is Constant and len(val._layers) == 1 else val.copy()
         del child.value  # clear cache
         return child
 
@@ -385,6 +386,8 @@ class Parameter(Layered):
 
     def freeze(self) -> None:
         """Prevents the parameter from changing value again (through value, mutate etc...)"""
+        if self._frozen:
+            return  # subparameters are already frozen
         self._frozen = True
         self._subobjects.apply("freeze")
 
@@ -456,6 +459,9 @@ class Constant(Parameter):
             self.value = new_value  # check that it is equal
         return self  # no need to create another instance for a constant
 
+    def _set_parenthood(self, parent: tp.Optional[Parameter]) -> None:
+        pass  # constants are shared between parents and children, they have no lineage
+
     def recombine(self: P, *others: P) -> None:
         pass
 
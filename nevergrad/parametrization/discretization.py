@@ -5,7 +5,6 @@
 
 import warnings
 import numpy as np
-import scipy.stats
 import nevergrad.common.typing as tp
 
 
@@ -36,16 +35,20 @@ def threshold_discretization(x: tp.ArrayLike, arity: int = 2) -> tp.List[int]:
     if arity == 2:  # special case, to have 0 yield 0
         return (np.array(x) > 0).astype(int).tolist()  # type: ignore
     else:
-        return np.clip(arity * scipy.stats.norm.cdf(x), 0, arity - 1).astype(int).tolist()  # type: ignore
+        from scipy.special import ndtr  # gaussian cdf (scipy is slow to import)
+
+        return np.clip(arity * ndtr(x), 0, arity - 1).astype(int).tolist()  # type: ignore
 
 
 # The function below is the opposite of the function above.
 def inverse_threshold_discretization(indexes: tp.List[int], arity: int = 2) -> np.ndarray:
+    from scipy.special import ndtri  # gaussian ppf
+
     indexes_arr = np.array(indexes, copy=True)
     assert not np.any(np.isnan(indexes_arr))
     pdf_bin_size = 1 / arity
     # We take the center of each bin (in the pdf space)
-    x = scipy.stats.norm.ppf(indexes_arr * pdf_bin_size + (pdf_bin_size / 2))  # type: ignore
+    x = ndtri(indexes_arr * pdf_bin_size + (pdf_bin_size / 2))  # type: ignore
     nan_indices = np.where(np.isnan(x))
     x[nan_indices] = np.sign(indexes_arr[nan_indices] - (arity / 2.0)) * np.finfo(np.dtype("float")).max
     return x
@@ -56,10 +59,12 @@ def inverse_threshold_discretization(indexes: tp.List[int], arity: int = 2) -> n
 def noisy_inverse_threshold_discretization(
     indexes: tp.List[int], arity: int = 2, gen: tp.Any = None
 ) -> np.ndarray:
+    from scipy.special import ndtri  # gaussian ppf
+
     indexes_arr = np.array(indexes, copy=True)
     pdf_bin_size = 1 / arity
     # We take a random point in the bin.
-    return scipy.stats.norm.ppf(indexes_arr * pdf_bin_size + gen.rand() * pdf_bin_size)  # type: ignore
+    return ndtri(indexes_arr * pdf_bin_size + gen.rand() * pdf_bin_size)  # type: ignore
 
 
 def weight_for_reset(arity: int) -> float:
@@ -3,7 +3,9 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import abc
 import warnings
+import functools
 import contextlib
 import itertools
 import numpy as np
@@ -14,6 +16,7 @@ from . import _layering
 from . import _datalayers
 from . import data as pdata
 from . import choice as pchoice
+from . import discretization
 from . import transforms as trans
 
 
@@ -153,6 +156,123 @@ def _fully_bounded_layers(data: pdata.Data) -> tp.List[_datalayers.BoundLayer]:
     return layers
 
 
+class _Uncompilable(Exception):
+    """Raised when a parameter cannot be handled by a compiled conversion plan"""
+
+
+_Step = tp.Callable[[np.ndarray], np.ndarray]
+
+
+def _identity(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+class _DataPlan:
+    """Compiled conversion between batches of standardized data and batches of values of a Data
+    parameter, applying vectorized versions of its layers on all the points at once.
+    Batches have the number of points as first dimension.
+
+    Parameters
+    ----------
+    reference: Data
+        the reference of the standardized data
+    """
+
+    def __init__(self, reference: pdata.Data) -> None:
+        for method in ("_internal_set_standardized_data", "_internal_get_standardized_data"):
+            if getattr(type(reference), method) is not getattr(pdata.Data, method):
+                raise _Uncompilable(f"Custom {method} in {reference}")
+        self.shape = reference._value.shape
+        self.size = reference.dimension
+        self._sigma = np.array(reference.sigma.value, dtype=float)
+        self._reduced_offset = np.broadcast_to(reference._value / self._sigma, self.shape)
+        self._rng = reference.random_state
+        self._bounds = reference.bounds
+        self.scalar = False
+        self.random = False  # whether some layers sample randomly (see Codec)
+        # steps[k] are the forward and backward functions of layer k + 1 (layer 0 is the root)
+        self._steps = [self._compile_layer(layer) for layer in reference._layers[1:]]
+
+    def _compile_layer(self, layer: _layering.Layered) -> tp.Tuple[_Step, _Step]:
+        # pylint: disable=too-many-return-statements
+        cls = type(layer)
+        if cls in (_datalayers.Exponent, _datalayers.Power, _datalayers.Add, _datalayers.Multiply):
+            return layer.forward, layer.backward  # type: ignore
+        if cls is _datalayers.Bound:
+            return layer._transform.forward, layer._transform.backward  # type: ignore
+        if cls is _layering.Int:
+            assert isinstance(layer, _layering.Int)
+            self.random |= not layer.deterministic
+            return functools.partial(self._int_forward, layer), _identity
+        if cls is _datalayers.SoftmaxSampling:
+            assert isinstance(layer, _datalayers.SoftmaxSampling) and layer.arity is not None
+            self.random |= not layer.deterministic
+            forward = functools.partial(self._softmax_forward, layer.arity, layer.deterministic)
+            return forward, functools.partial(self._softmax_backward, layer.arity)
+        if cls is _datalayers.AngleOp:
+            return self._angle_forward, self._angle_backward
+        if cls is _layering._ScalarCasting:
+            self.scalar = True
+            return _identity, _identity
+        if cls is _layering.ArrayCasting or all(
+            getattr(cls, name) is getattr(_layering.Layered, name)
+            for name in ("_layered_get_value", "_layered_set_value")
+        ):
+            return _identity, _identity  # the layer does not modify the value (eg: mutations)
+        raise _Uncompilable(f"Unsupported layer {layer}")
+
+    def _int_forward(self, layer: _layering.Int, x: np.ndarray) -> np.ndarray:
+        if not layer.deterministic:
+            x = x + self._rng.rand(*x.shape) - 0.5
+        out = np.round(x).astype(int)
+        eps = 1e-12
+        if self._bounds[0] is not None:
+            out = np.maximum(_layering._to_int(self._bounds[0] + 0.5 - eps), out)
+        if self._bounds[1] is not None:
+            out = np.minimum(_layering._to_int(self._bounds[1] - 0.5 + eps), out)
+        return out
+
+    def _softmax_forward(self, arity: int, deterministic: bool, x: np.ndarray) -> np.ndarray:
+        encoder = discretization.Encoder(x.reshape(-1, arity), rng=self._rng)
+        return encoder.encode(deterministic=deterministic).reshape(x.shape[:-1])  # type: ignore
+
+    @staticmethod
+    def _softmax_backward(arity: int, x: np.ndarray) -> np.ndarray:
+        indices = np.array(x, dtype=int).reshape(x.shape[0], -1)
+        out = np.zeros(indices.shape + (arity,), dtype=float)
+        np.put_along_axis(out, indices[..., None], discretization.weight_for_reset(arity), axis=-1)
+        return out
+
+    @staticmethod
+    def _angle_forward(x: np.ndarray) -> np.ndarray:
+        return np.angle(x[:, 0, ...] + 1j * x[:, 1, ...])  # type: ignore
+
+    @staticmethod
+    def _angle_backward(x: np.ndarray) -> np.ndarray:
+        return np.stack([np.cos(x), np.sin(x)], axis=1)  # type: ignore
+
+    def forward(self, data: np.ndarray, layer_index: tp.Optional[int] = None) -> np.ndarray:
+        """Converts a (num_points, size) array of standardized data into the batch of the values
+        at the output of the provided layer (last one by default)
+        """
+        num = len(self._steps) if layer_index is None else layer_index
+        x = self._sigma * (data.reshape((-1,) + self.shape) + self._reduced_offset)
+        for forward, _ in self._steps[:num]:
+            x = forward(x)
+        return x
+
+    def backward(self, values: np.ndarray, layer_index: tp.Optional[int] = None) -> np.ndarray:
+        """Converts a batch of values at the output of the provided layer (last one by default)
+        into the (num_points, size) array of standardized data
+        """
+        num = len(self._steps) if layer_index is None else layer_index
+        x = values
+        for _, backward in reversed(self._steps[:num]):
+            x = backward(x)
+        x = np.array(x, dtype=float).reshape((-1,) + self.shape)
+        return (x / self._sigma - self._reduced_offset).reshape(-1, self.size)  # type: ignore
+
+
 class Normalizer:
     """Hacky way to sample in the space defined by the parametrization.
     Given an vector of values between 0 and 1,
@@ -189,6 +309,12 @@ class Normalizer:
             trans.ArctanBound(0, 1) if unbounded_transform is None else unbounded_transform
         )
         self.fully_bounded = all(bool(_fully_bounded_layers(data)) for data in self._ref_arrays)
+        self._plans: tp.List[tp.Optional[_DataPlan]] = []
+        for ref in self._ref_arrays:
+            try:
+                self._plans.append(_DataPlan(ref))
+            except _Uncompilable:
+                self._plans.append(None)  # converted point by point
 
     def _warn(self) -> None:
         warnings.warn(
@@ -197,11 +323,11 @@ class Normalizer:
         )
 
     def backward(self, x: tp.ArrayLike) -> np.ndarray:
-        """Transform from [0, 1] to standardized space"""
+        """Transform from [0, 1] to standardized space (x can be a point or a (n, dimension) batch)"""
         return self._apply(x, forward=False)
 
     def forward(self, x: tp.ArrayLike) -> np.ndarray:
-        """Transform from standardized space to [0, 1]"""
+        """Transform from standardized space to [0, 1] (x can be a point or a (n, dimension) batch)"""
         return self._apply(x, forward=True)
 
     def _apply(self, x: tp.ArrayLike, forward: bool = True) -> np.ndarray:
@@ -218,24 +344,247 @@ class Normalizer:
 
     def _apply_unsafe(self, x: np.ndarray, forward: bool = True) -> None:
         # modifies x in place
+        # x can also be a batch of points of shape (n, dimension)
         start = 0
         utrans = self.unbounded_transform.forward if forward else self.unbounded_transform.backward
-        for ref in self._ref_arrays:
+        points = x.reshape(-1, x.shape[-1])  # view on x
+        for ref, plan in zip(self._ref_arrays, self._plans):
             end = start + ref.dimension
             layers = _fully_bounded_layers(ref)
             if self._only_sampling:  # for samplers
                 layers = [lay for lay in layers if lay.uniform_sampling]
             if not layers:
-                x[start:end] = utrans(x[start:end])
-            else:
+                x[..., start:end] = utrans(x[..., start:end])
+            elif plan is not None:  # all points at once
                 layer_index = layers[-1]._layer_index
-                array = ref.spawn_child()
+                normalizer = layers[-1]._normalizer()
                 if forward:
-                    array.set_standardized_data(x[start:end])
-                    x[start:end] = array._layers[layer_index].get_normalized_value()[:]  # type: ignore
-
+                    values = plan.forward(points[:, start:end], layer_index=layer_index)
+                    points[:, start:end] = normalizer.forward(values).reshape(len(points), -1)
                 else:
-                    normalized = x[start:end].reshape(ref._value.shape)
-                    array._layers[layer_index].set_normalized_value(normalized)  # type: ignore
-                    x[start:end] = array.get_standardized_data(reference=ref)
+                    values = normalizer.backward(points[:, start:end].reshape((-1,) + plan.shape))
+                    points[:, start:end] = plan.backward(values, layer_index=layer_index)
+            else:
+                layer_index = layers[-1]._layer_index
+                for point in points:
+                    array = ref.spawn_child()
+                    if forward:
+                        array.set_standardized_data(point[start:end])
+                        point[start:end] = array._layers[layer_index].get_normalized_value()[:]  # type: ignore
+
+                    else:
+                        normalized = point[start:end].reshape(ref._value.shape)
+                        array._layers[layer_index].set_normalized_value(normalized)  # type: ignore
+                        point[start:end] = array.get_standardized_data(reference=ref)
+            start = end
+
+
+class Codec:
+    """Compiled conversion between batches of standardized data and values of a parametrization.
+    The parametrization is flattened once into a plan: each sub-parameter is assigned a slice of the
+    standardized data, Data parameters (including the indices of choices of constants) are converted
+    through vectorized versions of their layers for all the points at once, and values are then
+    assembled following the structure of the containers.
+    Parameters which cannot be compiled (custom parameters or layers, choices of parameters, constraint
+    layers...) and parameters which sample randomly (non-deterministic choices and integer casting)
+    are converted point by point through children of the reference, so that random draws happen
+    in the same order as with set_standardized_data.
+
+    Parameters
+    ----------
+    reference: Parameter
+        the reference for the standardized data (typically the parametrization of an optimizer)
+
+    Note
+    ----
+    The codec works on a frozen child of the reference, changes of the reference after the creation
+    of the codec are therefore not taken into account.
+
+    Example
+    -------
+    >>> param = ng.p.Dict(x=ng.p.Scalar(lower=0, upper=1), y=ng.p.Choice(["a", "b"]))
+    >>> codec = ng.p.helpers.Codec(param)
+    >>> values = codec.decode(np.random.normal(size=(100, param.dimension)))
+    >>> data = codec.encode(values)
+    """
+
+    def __init__(self, reference: core.Parameter) -> None:
+        reference.random_state  # pylint: disable=pointless-statement
+        self.reference = reference.spawn_child()
+        self.reference.freeze()
+        self.dimension = self.reference.dimension
+        self._root = _compile_node(self.reference)
+
+    def decode(self, data: tp.ArrayLike) -> tp.List[tp.Any]:
+        """Converts a (num_points, dimension) array of standardized data into the list of
+        the corresponding values
+        """
+        data = np.array(data, copy=False, dtype=float).reshape(-1, self.dimension)
+        return self._root.decode(data)
+
+    def encode(self, values: tp.Sequence[tp.Any]) -> np.ndarray:
+        """Converts a list of values into the (num_points, dimension) array of their standardized data"""
+        values = list(values)
+        if not values:
+            return np.zeros((0, self.dimension))
+        return self._root.encode(values)
+
+
+class _Node(abc.ABC):
+    """Node of the compiled plan of a Codec, converting (num_points, size) arrays
+    of standardized data from and into lists of values
+    """
+
+    def __init__(self, reference: core.Parameter) -> None:
+        self.size = reference.dimension
+
+    @abc.abstractmethod
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        pass
+
+    @abc.abstractmethod
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        pass
+
+
+class _ConstantNode(_Node):
+    def __init__(self, reference: core.Constant) -> None:
+        super().__init__(reference)
+        self._value = reference.value
+
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        return [self._value] * data.shape[0]
+
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        return np.zeros((len(values), 0))
+
+
+class _FallbackNode(_Node):
+    """Point by point conversion through children of the reference"""
+
+    def __init__(self, reference: core.Parameter) -> None:
+        super().__init__(reference)
+        self._reference = reference
+
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        return [self._reference.spawn_child().set_standardized_data(x).value for x in data]
+
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        data = [
+            self._reference.spawn_child(new_value=v).get_standardized_data(reference=self._reference)
+            for v in values
+        ]
+        return np.array(data, dtype=float).reshape(len(values), self.size)
+
+
+class _DataNode(_Node):
+    def __init__(self, reference: pdata.Data) -> None:
+        super().__init__(reference)
+        self._plan = _DataPlan(reference)
+        if self._plan.random:
+            raise _Uncompilable(f"Random layers in {reference}")
+
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        out = self._plan.forward(data)
+        if self._plan.scalar:
+            return out.ravel().tolist()  # type: ignore
+        return list(out)
+
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        return self._plan.backward(np.array(values, dtype=float))
+
+
+class _ContainerNode(_Node):
+    """Node for Tuple, Dict and Instrumentation (standardized data are ordered by key,
+    while values follow the order of the content)
+    """
+
+    def __init__(self, reference: container.Container) -> None:
+        super().__init__(reference)
+        self._tuple = isinstance(reference, container.Tuple)
+        self._keys = list(reference._content)
+        self._nodes = {key: _compile_node(p) for key, p in reference._content.items()}
+        self._slices: tp.Dict[tp.Any, slice] = {}
+        start = 0
+        for key in sorted(self._keys):
+            end = start + self._nodes[key].size
+            self._slices[key] = slice(start, end)
             start = end
+
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        columns = [self._nodes[k].decode(data[:, self._slices[k]]) for k in self._keys]
+        if self._tuple:
+            return list(zip(*columns)) if columns else [()] * data.shape[0]
+        return [dict(zip(self._keys, row)) for row in zip(*columns)] if columns else [{}] * data.shape[0]
+
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        data = np.zeros((len(values), self.size))
+        for k, key in enumerate(self._keys):
+            column = [v[k] if self._tuple else v[key] for v in values]
+            data[:, self._slices[key]] = self._nodes[key].encode(column)
+        return data
+
+
+class _ChoiceNode(_Node):
+    """Node for choices of constants, where only the indices are converted"""
+
+    def __init__(self, reference: pchoice.BaseChoice) -> None:
+        super().__init__(reference)
+        if isinstance(reference, pchoice.TransitionChoice) and reference._ref is not None:
+            reference = reference._ref  # unordered case: the reference is always centered
+        self._options = list(reference.choices)
+        if not all(isinstance(c, core.Constant) for c in self._options):
+            raise _Uncompilable("Only choices of constants can be compiled")
+        self._repetitions = reference._repetitions
+        self._values = [c.value for c in self._options]
+        self._indices = _DataPlan(reference.indices)
+        if self._indices.random:
+            raise _Uncompilable(f"Random sampling in {reference}")
+        start = 0
+        for key in sorted(reference._content):
+            if key == "indices":
+                self._slice = slice(start, start + reference.indices.dimension)
+            start += reference[key].dimension
+
+    def decode(self, data: np.ndarray) -> tp.List[tp.Any]:
+        indices = self._indices.forward(data[:, self._slice]).reshape(data.shape[0], -1)
+        if self._repetitions is None:
+            return [self._values[i] for i in indices[:, 0]]
+        return [tuple(self._values[i] for i in row) for row in indices]
+
+    def _index(self, value: tp.Any) -> int:
+        for k, option in enumerate(self._options):
+            try:
+                option.value = value  # raises if the value is different
+            except Exception:  # pylint: disable=broad-except
+                continue
+            return k
+        raise ValueError(f"Could not figure out where to put value {value}")
+
+    def encode(self, values: tp.List[tp.Any]) -> np.ndarray:
+        rep = 1 if self._repetitions is None else self._repetitions
+        values = [[v] for v in values] if self._repetitions is None else values
+        indices = np.array([[self._index(v) for v in row] for row in values], dtype=int).reshape(-1, rep)
+        data = np.zeros((len(values), self.size))
+        data[:, self._slice] = self._indices.backward(indices)
+        return data
+
+
+def _compile_node(reference: core.Parameter) -> _Node:
+    """Creates the node converting the standardized data of the reference, defaulting to
+    point by point conversion if it cannot be compiled
+    """
+    try:
+        if len(reference._layers) > 1 and not isinstance(reference, pdata.Data):
+            raise _Uncompilable(f"Layers on {reference}")
+        if type(reference) is core.Constant:  # pylint: disable=unidiomatic-typecheck
+            return _ConstantNode(reference)  # type: ignore
+        if type(reference) in (container.Tuple, container.Dict, container.Instrumentation):
+            return _ContainerNode(reference)  # type: ignore
+        if type(reference) in (pchoice.Choice, pchoice.TransitionChoice):
+            return _ChoiceNode(reference)  # type: ignore
+        if isinstance(reference, pdata.Data):
+            return _DataNode(reference)
+    except _Uncompilable:
+        pass
+    return _FallbackNode(reference)
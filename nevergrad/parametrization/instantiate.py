@@ -11,7 +11,6 @@ import contextlib
 from pathlib import Path
 import numpy as np
 import nevergrad.common.typing as tp
-from nevergrad.common import testing
 from . import utils
 
 
@@ -144,6 +143,8 @@ class FileTextFunction:
                 )
 
     def __call__(self, **kwargs: tp.Any) -> str:
+        from nevergrad.common import testing  # imports pytest
+
         testing.assert_set_equal(kwargs, self.parameters, err_msg="Wrong input parameters.")
         return Placeholder.sub(self._text, self.filepath.suffix, replacers=kwargs)
 
@@ -202,6 +203,8 @@ class FolderInstantiator:
         return [p for f in self.file_functions for p in f.placeholders]
 
     def instantiate_to_folder(self, outfolder: tp.Union[Path, str], kwargs: tp.Dict[str, tp.Any]) -> None:
+        from nevergrad.common import testing  # imports pytest
+
         testing.assert_set_equal(
             kwargs, {x.name for x in self.placeholders}, err_msg="Wrong input parameters."
         )
@@ -437,6 +437,25 @@ def test_parenthood() -> None:
     assert param_spawn[0][0].sigma.parents_uids == [sigma_uid]  # type: ignore
 
 
+def test_spawn_child_structure() -> None:
+    param = par.Instrumentation(par.Choice(["a", "b"]), x=par.Scalar(), y=12)
+    param.freeze()
+    value = param.value
+    children = [param.spawn_child() for _ in range(100)]
+    assert len({c.uid for c in children + [param]}) == 101
+    child = children[0]
+    assert child[1]["y"] is param[1]["y"]  # type: ignore  # constants are shared
+    assert child[0][0] is not param[0][0]  # type: ignore
+    assert child[0][0].choices[1] is param[0][0].choices[1]  # type: ignore
+    assert child[1]["y"].parents_uids == []  # type: ignore
+    assert not child[1]["x"]._frozen  # type: ignore
+    child.freeze()
+    assert child[1]["x"]._frozen  # type: ignore
+    child = param.spawn_child(new_value=(("b",), {"x": 3.0, "y": 12}))
+    assert child.value == (("b",), {"x": 3.0, "y": 12})
+    assert param.value == value
+
+
 def test_random_state_initialization() -> None:
     param = par.Dict(x=par.Choice(4), y=par.Choice(10))
     param.value  # pylint: disable=pointless-statement
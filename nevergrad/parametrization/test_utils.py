@@ -278,6 +278,51 @@ def test_scaler_fully_bounded(expected: float, param: p.Parameter) -> None:
     assert scaler.fully_bounded == expected
 
 
+def test_normalizer_batch() -> None:
+    ref = p.Tuple(p.Log(lower=0.01, upper=1), p.Scalar(lower=0, upper=1), p.Scalar(lower=-1, upper=1) % 0.5)
+    scaler = helpers.Normalizer(ref)
+    assert scaler._plans[-1] is None  # modulo layers are not compiled
+    data = np.random.normal(size=(10, ref.dimension))
+    out = scaler.forward(data)
+    np.testing.assert_almost_equal(out, [scaler.forward(x) for x in data])
+    np.testing.assert_almost_equal(scaler.backward(out), [scaler.backward(x) for x in out])
+
+
+@testing.parametrized(
+    data=("_DataNode", p.Array(shape=(2, 2)).set_bounds(-1, 2, method="arctan") * 3 + 1),
+    integer=("_DataNode", p.Scalar(lower=-1, upper=3).set_integer_casting()),
+    log=("_DataNode", p.Log(lower=0.001, upper=10)),
+    angles=("_DataNode", p.Angles(shape=(3,))),
+    choice=("_ChoiceNode", p.Choice(["a", "b", "c"], repetitions=2, deterministic=True)),
+    random_choice=("_FallbackNode", p.Choice(["a", "b", "c"], repetitions=2, deterministic=False)),
+    transition=("_ChoiceNode", p.TransitionChoice(range(5))),
+    unordered=("_ChoiceNode", p.TransitionChoice(["a", "b", "c"], ordered=False)),
+    nested=(
+        "_ContainerNode",
+        p.Instrumentation(
+            p.Scalar(),
+            12,
+            b=p.Dict(c=p.Choice([1, 2, 3], deterministic=True), d=p.Log(lower=0.1, upper=10), e=[3]),
+        ),
+    ),
+    fallback=("_FallbackNode", p.TransitionChoice([p.Array(shape=(2,)), p.Scalar()])),
+)
+def test_codec(node: str, param: p.Parameter) -> None:
+    codec = helpers.Codec(param)
+    assert type(codec._root).__name__ == node
+    data = np.random.normal(size=(12, param.dimension))
+    param.random_state.seed(12)  # random layers must sample identically
+    values = codec.decode(data)
+    param.random_state.seed(12)
+    children = [param.spawn_child().set_standardized_data(x) for x in data]
+    expected = [c.value for c in children]
+    assert repr(values) == repr(expected)  # also checks types of the values
+    encoded = codec.encode(values)
+    expected_data = [param.spawn_child(new_value=v).get_standardized_data(reference=param) for v in expected]
+    np.testing.assert_almost_equal(encoded, np.array(expected_data).reshape(encoded.shape))
+    assert codec.encode([]).shape == (0, param.dimension)
+
+
 # # # END OF CHECK # # #
 
 
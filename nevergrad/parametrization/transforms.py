@@ -6,7 +6,6 @@
 import uuid
 import itertools
 import numpy as np
-from scipy import stats
 import nevergrad.common.typing as tp
 from . import utils
 
@@ -143,7 +142,8 @@ class BoundTransform(Transform):  # pylint: disable=abstract-method
         self.shape: tp.Tuple[int, ...] = self.a_min.shape if self.a_min is not None else self.a_max.shape
 
     def _check_shape(self, x: np.ndarray) -> None:
-        for dims in itertools.zip_longest(x.shape, self.shape, fillvalue=1):
+        # dimensions are aligned from the end, as in numpy broadcasting (x can be a batch)
+        for dims in itertools.zip_longest(reversed(x.shape), reversed(self.shape), fillvalue=1):
             if dims[0] != dims[1] and not any(x == 1 for x in dims):  # same or broadcastable
                 raise ValueError(f"Shapes do not match: {self.shape} and {x.shape}")
 
@@ -286,6 +286,8 @@ class CumulativeDensity(BoundTransform):
         self.name = f"Cd({_f(lower)},{_f(upper)})"
         if density not in ("gaussian", "cauchy"):
             raise ValueError("Unknown density")
+        from scipy import stats  # slow to import, only imported when needed
+
         if density == "gaussian":
             self._forw = stats.norm.cdf
             self._back = stats.norm.ppf
@@ -221,28 +221,37 @@ class Subobjects(tp.Generic[X]):
 
     Note
     ----
-    The current implementation is rather inefficient and could probably be
-    improved a lot if this becomes critical
+    The keys of the subobjects are cached, and only recomputed when the size of the
+    container changes (replacing an item which is not a subobject by a subobject is
+    therefore not supported).
     """
 
     def __init__(self, obj: X, base: tp.Type[X], attribute: str) -> None:
         self.obj = obj
         self.cls = base
         self.attribute = attribute
+        self._keys: tp.Optional[tp.Tuple[tp.Any, ...]] = None
+        self._size = -1  # size of the container when the keys were cached
 
     def new(self, obj: X) -> "Subobjects[X]":
         """Creates a new instance with same configuratioon
         but for a new object.
         """
-        return Subobjects(obj, base=self.cls, attribute=self.attribute)
+        subobjects = Subobjects(obj, base=self.cls, attribute=self.attribute)
+        subobjects._keys, subobjects._size = self._keys, self._size  # same structure
+        return subobjects
 
     def items(self) -> tp.Iterator[tp.Tuple[tp.Any, X]]:
         """Returns a dict {key: subobject}"""
         container = getattr(self.obj, self.attribute)
         if not isinstance(container, (list, dict)):
             raise TypeError("Subcaller only work on list and dict")
-        iterator = enumerate(container) if isinstance(container, list) else container.items()
-        for key, val in iterator:
+        if self._keys is None or len(container) != self._size:
+            iterator = enumerate(container) if isinstance(container, list) else container.items()
+            self._keys = tuple(key for key, val in iterator if isinstance(val, self.cls))
+            self._size = len(container)
+        for key in self._keys:
+            val = container[key]
             if isinstance(val, self.cls):
                 yield key, val
 
@@ -258,6 +267,8 @@ class Subobjects(tp.Generic[X]):
         """Calls the named method with the provided input parameters (or their subobjects if
         from the base class!) on the subobjects.
         """
+        if not args and not kwargs:
+            return {key: getattr(subobj, method)() for key, subobj in self.items()}
         outputs: tp.Dict[tp.Any, tp.Any] = {}
         for key, subobj in self.items():
             subargs = [self._get_subobject(arg, key) for arg in args]